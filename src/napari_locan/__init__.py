@@ -7,6 +7,8 @@ napari-locan consists of the following modules:
    :toctree: generated/
 
    data_model
+   locan_io
+   process
    sample_data
    scripts
    widgets
@@ -14,7 +16,9 @@ napari-locan consists of the following modules:
 
 from __future__ import annotations
 
+import importlib
 import logging
+from typing import Any
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
@@ -79,77 +83,45 @@ from napari_locan.data_model.smlm_data import SmlmData
 
 smlm_data: SmlmData = SmlmData()
 
-# sample data
-
-from napari_locan.sample_data.sample_data import (
-    make_image_npc,
-    make_image_tubulin,
-    make_points_npc,
-    make_points_tubulin,
-)
-
-# widgets
-
-from napari_locan.widgets.widget_clustering import (
-    ClusteringQWidget,
-)
-from napari_locan.widgets.widget_filter_specifications import (
-    FilterSpecificationsQWidget,
-)
-from napari_locan.widgets.widget_io_save import (
-    SaveSmlmDataQWidget,
-)
-from napari_locan.widgets.widget_load import (
-    LoadQWidget,
-)
-from napari_locan.widgets.widget_napari_locan_project import (
-    NapariLocanProjectQWidget,
-)
-from napari_locan.widgets.widget_property_distribution import (
-    PropertyDistributionQWidget,
-)
-from napari_locan.widgets.widget_render_collection_2d import (
-    RenderCollection2dQWidget,
-)
-from napari_locan.widgets.widget_render_collection_features import (
-    RenderCollectionFeaturesQWidget,
-)
-from napari_locan.widgets.widget_render_features import (
-    RenderFeaturesQWidget,
-)
-from napari_locan.widgets.widget_render_image_2d import (
-    RenderImage2dQWidget,
-)
-from napari_locan.widgets.widget_render_image_3d import (
-    RenderImage3dQWidget,
-)
-from napari_locan.widgets.widget_render_points_2d import (
-    RenderPoints2dQWidget,
-)
-from napari_locan.widgets.widget_render_points_3d import (
-    RenderPoints3dQWidget,
-)
-from napari_locan.widgets.widget_roi import (
-    RoiQWidget,
-)
-from napari_locan.widgets.widget_run_script import (
-    RunScriptQWidget,
-)
-from napari_locan.widgets.widget_select import (
-    SelectQWidget,
-)
-from napari_locan.widgets.widget_show_data import (
-    ShowDataQWidget,
-)
-from napari_locan.widgets.widget_show_info import (
-    ShowInfoQWidget,
-)
-from napari_locan.widgets.widget_show_metadata import (
-    ShowMetadataQWidget,
-)
-from napari_locan.widgets.widget_show_properties import (
-    ShowPropertiesQWidget,
-)
-from napari_locan.widgets.widget_smlm_data import (
-    SmlmDataQWidget,
-)
+# sample data and widgets are imported on first access so that importing a
+# submodule, e.g. in a worker process, does not import napari
+
+_lazy_attributes: dict[str, str] = {
+    "make_image_npc": "napari_locan.sample_data.sample_data",
+    "make_image_tubulin": "napari_locan.sample_data.sample_data",
+    "make_points_npc": "napari_locan.sample_data.sample_data",
+    "make_points_tubulin": "napari_locan.sample_data.sample_data",
+    "ClusteringQWidget": "napari_locan.widgets.widget_clustering",
+    "FilterSpecificationsQWidget": "napari_locan.widgets.widget_filter_specifications",
+    "SaveSmlmDataQWidget": "napari_locan.widgets.widget_io_save",
+    "LoadQWidget": "napari_locan.widgets.widget_load",
+    "NapariLocanProjectQWidget": "napari_locan.widgets.widget_napari_locan_project",
+    "PropertyDistributionQWidget": "napari_locan.widgets.widget_property_distribution",
+    "RenderCollection2dQWidget": "napari_locan.widgets.widget_render_collection_2d",
+    "RenderCollectionFeaturesQWidget": "napari_locan.widgets.widget_render_collection_features",
+    "RenderFeaturesQWidget": "napari_locan.widgets.widget_render_features",
+    "RenderImage2dQWidget": "napari_locan.widgets.widget_render_image_2d",
+    "RenderImage3dQWidget": "napari_locan.widgets.widget_render_image_3d",
+    "RenderPoints2dQWidget": "napari_locan.widgets.widget_render_points_2d",
+    "RenderPoints3dQWidget": "napari_locan.widgets.widget_render_points_3d",
+    "RoiQWidget": "napari_locan.widgets.widget_roi",
+    "RunScriptQWidget": "napari_locan.widgets.widget_run_script",
+    "SelectQWidget": "napari_locan.widgets.widget_select",
+    "ShowDataQWidget": "napari_locan.widgets.widget_show_data",
+    "ShowInfoQWidget": "napari_locan.widgets.widget_show_info",
+    "ShowMetadataQWidget": "napari_locan.widgets.widget_show_metadata",
+    "ShowPropertiesQWidget": "napari_locan.widgets.widget_show_properties",
+    "SmlmDataQWidget": "napari_locan.widgets.widget_smlm_data",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _lazy_attributes[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(importlib.import_module(module_name), name)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_lazy_attributes])
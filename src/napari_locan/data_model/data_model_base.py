@@ -6,6 +6,12 @@ or other data structures.
 
 The interface provides methods to manipulate the data contents.
 
+Changes are tracked by a dirty flag that is set whenever
+`datasets_changed_signal` or `names_changed_signal` is emitted and reset once
+the data model is saved.
+A change of the selected index alone does not set the flag.
+Widgets that modify a dataset in place emit `datasets_changed_signal`.
+
 """
 
 from __future__ import annotations
@@ -48,6 +54,8 @@ class DataModel(QObject, ABC, metaclass=QABCMeta):  # type: ignore
         The selected data object
     name
         The selected data identifier
+    is_dirty
+        True if the data model has changed since `mark_clean` was called.
     """
 
     count: int = 0
@@ -65,6 +73,8 @@ class DataModel(QObject, ABC, metaclass=QABCMeta):  # type: ignore
         self._datasets: list[Any] = []
         self._names: list[str] = []
         self._index: int = -1
+        self._is_dirty: bool = True
+        self._connect_change_tracking()
         self.set_datasets_and_names(datasets=datasets, names=names)
 
     def __getstate__(self) -> dict[str, Any]:
@@ -81,6 +91,23 @@ class DataModel(QObject, ABC, metaclass=QABCMeta):  # type: ignore
         # Restore instance attributes.
         self.__dict__.update(state)
         super().__init__()
+        self._is_dirty = True
+        self._connect_change_tracking()
+
+    def _connect_change_tracking(self) -> None:
+        self.datasets_changed_signal.connect(self._mark_dirty)
+        self.names_changed_signal.connect(self._mark_dirty)
+
+    def _mark_dirty(self, *args: Any) -> None:
+        self._is_dirty = True
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._is_dirty
+
+    def mark_clean(self) -> None:
+        """Reset the dirty flag, e.g. after the data model was saved."""
+        self._is_dirty = False
 
     @property
     def datasets(self) -> list[Any]:
@@ -213,6 +240,35 @@ class DataModel(QObject, ABC, metaclass=QABCMeta):  # type: ignore
         self.names_changed_signal.emit(self.names)
         self.index_changed_signal.emit(self.index)
 
+    def append_items(
+        self,
+        datasets: list[Any],
+        names: list[str] | None = None,
+        set_index: bool = True,
+    ) -> None:
+        """
+        Append several items to the end of datasets with a single emission of
+        each signal and point index to the last new dataset if set_index is
+        true.
+        """
+        if names is None:
+            names = [f"{len(self._datasets) + i}" for i in range(1, len(datasets) + 1)]
+        elif len(datasets) != len(names):
+            raise ValueError(
+                "Datasets and names must correspond and be of same length."
+            )
+        if not datasets:
+            return
+
+        self._datasets.extend(datasets)
+        self._names.extend(names)
+        if set_index:
+            self._index = len(self.datasets) - 1
+        self.count += len(datasets)
+        self.datasets_changed_signal.emit(self.datasets)
+        self.names_changed_signal.emit(self.names)
+        self.index_changed_signal.emit(self.index)
+
     def delete_item(self) -> None:
         """
         Delete current dataset and set index to the previous dataset.
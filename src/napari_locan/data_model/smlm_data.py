@@ -7,19 +7,65 @@ The individual SMLM datasets are provided as :class:`locan.LocData` instances.
 SMLM data serves as data model for other napari-locan widgets to process or
 render the localization data. It is entirely independent of napari layers.
 Upon rendering a SMLM dataset a new image is created in a new napari layer.
+
+A spatial index on localization coordinates is built on demand for each
+SMLM dataset and cached for reuse in neighbor-based computations.
+The cached index is rebuilt when the indexed coordinates have changed and
+discarded when the dataset is replaced or deleted.
+Summary statistics for localization properties are cached in the same way.
+
+SMLM datasets can be represented by a
+:class:`napari_locan.locan_io.project.LocDataPlaceholder` that is loaded
+when the dataset is first selected.
+At most `max_resident` datasets that were loaded from placeholders are kept
+in memory; the least recently selected ones are replaced by their
+placeholders again.
+Datasets that were modified after loading are not replaced but kept in
+memory.
+
+Changes are tracked by a dirty flag that is set whenever datasets or names
+change and reset once the data is saved.
+A change of the selected index alone does not set the flag.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
+from collections import OrderedDict
 from typing import Any
 
 import locan as lc
+import numpy as np
 from qtpy.QtCore import QObject, Signal  # type: ignore[attr-defined]
 
+from napari_locan.locan_io.project import LocDataPlaceholder
+from napari_locan.process.column_version import ColumnVersion
+from napari_locan.process.property_statistics import PropertyStatistics
+from napari_locan.process.spatial_index import SpatialIndex
+
 logger = logging.getLogger(__name__)
 
 
+def _column_versions(locdata: lc.LocData) -> dict[str, ColumnVersion]:
+    """Versions of all columns to detect later modifications of locdata."""
+    dataframe = locdata.data
+    return {
+        str(column): ColumnVersion(values=dataframe[column])
+        for column in dataframe.columns
+    }
+
+
+def _column_versions_match(
+    locdata: lc.LocData, versions: dict[str, ColumnVersion]
+) -> bool:
+    """True if locdata has the same columns with unchanged values."""
+    dataframe = locdata.data
+    return [str(column) for column in dataframe.columns] == list(versions) and all(
+        version.matches(dataframe[column]) for column, version in versions.items()
+    )
+
+
 class SmlmData(QObject):  # type: ignore
     """
     Container for one or more LocData objects.
@@ -40,6 +86,11 @@ class SmlmData(QObject):  # type: ignore
         The selected LocData object
     locdata_name
         The selected LocData identifier
+    max_resident
+        Maximum number of datasets loaded from placeholders that are kept in
+        memory. Unlimited if None.
+    is_dirty
+        True if the data has changed since `mark_clean` was called.
     """
 
     index_changed_signal: Signal = Signal(int)
@@ -47,12 +98,27 @@ class SmlmData(QObject):  # type: ignore
 
     def __init__(
         self,
-        locdatas: list[lc.LocData] | None = None,
+        locdatas: list[lc.LocData | LocDataPlaceholder] | None = None,
         locdata_names: list[str] | None = None,
     ) -> None:
         super().__init__()
+        self._spatial_indices: dict[
+            tuple[int, tuple[str, ...]], tuple[lc.LocData, SpatialIndex]
+        ] = {}
+        self._property_statistics: dict[
+            tuple[int, str], tuple[lc.LocData, PropertyStatistics]
+        ] = {}
+        self._cache_lock = threading.Lock()
+        self._key_locks: dict[tuple[Any, ...], threading.Lock] = {}
+        self.max_resident: int | None = None
+        self._resident: OrderedDict[
+            int,
+            tuple[lc.LocData, LocDataPlaceholder, dict[str, ColumnVersion]],
+        ] = OrderedDict()
+        self._is_dirty: bool = True
+        self._connect_change_tracking()
         if locdatas is None and locdata_names is None:
-            self._locdatas: list[lc.LocData] = []
+            self._locdatas: list[lc.LocData | LocDataPlaceholder] = []
             self._locdata_names: list[str] = []
             self._index: int = -1
         elif locdata_names is None:
@@ -83,9 +149,36 @@ class SmlmData(QObject):  # type: ignore
         # Restore instance attributes.
         self.__dict__.update(state)
         super().__init__()
+        self._spatial_indices = {}
+        self._property_statistics = {}
+        self._cache_lock = threading.Lock()
+        self._key_locks = {}
+        self.max_resident = None
+        self._resident = OrderedDict()
+        self._is_dirty = True
+        self._connect_change_tracking()
+
+    def _connect_change_tracking(self) -> None:
+        self.locdata_names_changed_signal.connect(self._mark_dirty)
+
+    def _mark_dirty(self, *args: Any) -> None:
+        self._is_dirty = True
 
     @property
-    def locdatas(self) -> list[lc.LocData]:
+    def is_dirty(self) -> bool:
+        return self._is_dirty
+
+    def mark_clean(self) -> None:
+        """Reset the dirty flag, e.g. after the data was saved."""
+        self._is_dirty = False
+
+    @property
+    def locdatas(self) -> list[lc.LocData | LocDataPlaceholder]:
+        """
+        All localization datasets.
+
+        Datasets that are not loaded are represented by their placeholders.
+        """
         return self._locdatas
 
     @property
@@ -98,9 +191,9 @@ class SmlmData(QObject):  # type: ignore
 
     @index.setter
     def index(self, value: int) -> None:
-        if value > len(self.locdatas) - 1:
+        if value > len(self._locdatas) - 1:
             raise IndexError(
-                f"Index is larger than n_locdatas - 1: {len(self.locdatas) - 1}"
+                f"Index is larger than n_locdatas - 1: {len(self._locdatas) - 1}"
             )
         elif value < 0:
             self._index = -1
@@ -117,7 +210,7 @@ class SmlmData(QObject):  # type: ignore
         if self._index == -1:
             return None
         else:
-            return self._locdatas[self._index]
+            return self._get_locdata(self._index)
 
     @locdata.setter
     def locdata(self, item: lc.LocData) -> None:
@@ -129,6 +222,10 @@ class SmlmData(QObject):  # type: ignore
             )
         else:
             self._locdatas[self._index] = item
+            self._prune_spatial_indices()
+            self._prune_property_statistics()
+            self._prune_resident()
+            self._mark_dirty()
             self.index_changed_signal.emit(self._index)
 
     @property
@@ -169,13 +266,49 @@ class SmlmData(QObject):  # type: ignore
             self._locdatas.append(locdata)
             self._locdata_names.append(locdata_name)
         if set_index:
-            self._index = len(self.locdatas) - 1
+            self._index = len(self._locdatas) - 1
         else:
             self._index = current_index
 
         self.locdata_names_changed_signal.emit(self.locdata_names)
         self.index_changed_signal.emit(self.index)
 
+    def append_items(
+        self,
+        locdatas: list[lc.LocData],
+        locdata_names: list[str] | None = None,
+        set_index: bool = True,
+    ) -> None:
+        """
+        Append several LocData objects with a single emission of each signal.
+
+        Parameters
+        ----------
+        locdatas
+            The LocData objects to append.
+        locdata_names
+            Corresponding identifiers. If None, `locdata.meta.identifier`
+            is taken.
+        set_index
+            Set index to the last appended item.
+        """
+        if locdata_names is None:
+            locdata_names = [locdata.meta.identifier for locdata in locdatas]
+        elif len(locdatas) != len(locdata_names):
+            raise ValueError(
+                "locdatas and locdata_names must correspond and be of same length."
+            )
+        if not locdatas:
+            return
+
+        self._locdatas.extend(locdatas)
+        self._locdata_names.extend(locdata_names)
+        if set_index:
+            self._index = len(self._locdatas) - 1
+
+        self.locdata_names_changed_signal.emit(self.locdata_names)
+        self.index_changed_signal.emit(self.index)
+
     def delete_item(self) -> None:
         current_index = self.index
         try:
@@ -186,6 +319,10 @@ class SmlmData(QObject):  # type: ignore
                 "Index is out of range. No item available to be deleted."
             ) from exception
 
+        self._prune_spatial_indices()
+        self._prune_property_statistics()
+        self._prune_resident()
+
         if len(self._locdatas) == 0:
             self._index = -1
         elif current_index == 0:
@@ -200,5 +337,255 @@ class SmlmData(QObject):  # type: ignore
         self._locdatas = []
         self._locdata_names = []
         self._index = -1
+        with self._cache_lock:
+            self._spatial_indices = {}
+            self._property_statistics = {}
+            self._key_locks = {}
+        self._resident = OrderedDict()
         self.locdata_names_changed_signal.emit(self.locdata_names)
         self.index_changed_signal.emit(self.index)
+
+    def contains(self, locdata: lc.LocData) -> bool:
+        """True if locdata is one of the datasets without loading placeholders."""
+        return any(locdata is item for item in self._locdatas)
+
+    def is_loaded(self, index: int) -> bool:
+        """True if the dataset at index is not represented by a placeholder."""
+        return not isinstance(self._locdatas[index], LocDataPlaceholder)
+
+    def placeholder(self, index: int) -> LocDataPlaceholder | None:
+        """
+        The placeholder that represents the dataset at index or None if the
+        dataset was not loaded from a placeholder.
+        """
+        item = self._locdatas[index]
+        if isinstance(item, LocDataPlaceholder):
+            return item
+        resident = self._resident.get(id(item))
+        return None if resident is None else resident[1]
+
+    def resident_items(self) -> list[tuple[lc.LocData, LocDataPlaceholder]]:
+        """
+        Datasets that were loaded from placeholders and are unchanged since,
+        together with their placeholders.
+
+        Returns
+        -------
+        list[tuple[lc.LocData, LocDataPlaceholder]]
+            Datasets and placeholders from the least to the most recently
+            used dataset.
+        """
+        return [
+            (locdata, placeholder)
+            for locdata, placeholder, versions in self._resident.values()
+            if _column_versions_match(locdata, versions)
+        ]
+
+    def resolve(self, item: lc.LocData | LocDataPlaceholder) -> lc.LocData | None:
+        """
+        Get the dataset that is represented by item and load it if needed.
+
+        Parameters
+        ----------
+        item
+            One of the datasets or a placeholder that represents one of the
+            datasets.
+
+        Returns
+        -------
+        lc.LocData | None
+            The dataset or None if item does not represent one of the
+            datasets.
+        """
+        for index, item_ in enumerate(self._locdatas):
+            if item_ is item or (
+                isinstance(item, LocDataPlaceholder) and self.placeholder(index) is item
+            ):
+                return self._get_locdata(index)
+        return None
+
+    def _get_locdata(self, index: int) -> lc.LocData:
+        """Get the dataset at index and load it if it is a placeholder."""
+        item = self._locdatas[index]
+        if isinstance(item, LocDataPlaceholder):
+            locdata = item.load()
+            self._locdatas[index] = locdata
+            self._resident[id(locdata)] = (locdata, item, _column_versions(locdata))
+            self._evict()
+            return locdata
+        if id(item) in self._resident:
+            self._resident.move_to_end(id(item))
+        return item
+
+    def _evict(self) -> None:
+        """
+        Replace the least recently used datasets by their placeholders.
+
+        Datasets that were modified after loading are kept and no longer
+        represented by their placeholders.
+        """
+        if self.max_resident is None:
+            return
+        while len(self._resident) > max(self.max_resident, 1):
+            _, (locdata, placeholder, versions) = self._resident.popitem(last=False)
+            if _column_versions_match(locdata, versions):
+                for index, item in enumerate(self._locdatas):
+                    if item is locdata:
+                        self._locdatas[index] = placeholder
+            else:
+                logger.warning(
+                    "The dataset %s was modified after loading and is kept in "
+                    "memory.",
+                    locdata.meta.identifier,
+                )
+        self._prune_spatial_indices()
+        self._prune_property_statistics()
+
+    def _prune_resident(self) -> None:
+        """Discard resident datasets that are no longer available."""
+        ids = {id(item) for item in self._locdatas}
+        for key in [key for key in self._resident if key not in ids]:
+            del self._resident[key]
+
+    def spatial_index(
+        self,
+        locdata: lc.LocData | None = None,
+        loc_properties: list[str] | None = None,
+    ) -> SpatialIndex:
+        """
+        Get a spatial index for the localization coordinates of locdata.
+
+        The index is built on first request and cached for later requests.
+        It is rebuilt if the indexed coordinates have changed (also by
+        in-place modifications) and discarded once the locdata is replaced or
+        deleted.
+        The method can be called from a worker thread.
+        Concurrent requests for the same index wait for a single computation.
+
+        Parameters
+        ----------
+        locdata
+            The localization data to be indexed. If None, the selected
+            LocData object is taken.
+        loc_properties
+            The localization properties to be indexed. If None,
+            `locdata.coordinate_keys` are taken.
+
+        Returns
+        -------
+        SpatialIndex
+        """
+        if locdata is None:
+            locdata = self.locdata
+        if locdata is None:
+            raise ValueError("There is no smlm data available.")
+        if loc_properties is None:
+            loc_properties = list(locdata.coordinate_keys)
+        if not loc_properties:
+            raise ValueError("There are no coordinates available to be indexed.")
+
+        key = (id(locdata), tuple(loc_properties))
+        points = locdata.data[loc_properties].to_numpy()
+        with self._key_lock(("spatial_index", *key)):
+            with self._cache_lock:
+                item = self._spatial_indices.get(key)
+            if item is not None:
+                locdata_, spatial_index = item
+                # comparing the coordinates is cheap compared to building the
+                # tree
+                if locdata_ is locdata and np.array_equal(spatial_index.points, points):
+                    return spatial_index
+
+            spatial_index = SpatialIndex(points=points, loc_properties=loc_properties)
+            with self._cache_lock:
+                # the cache keeps a reference to locdata so that its id stays unique
+                if self.contains(locdata):
+                    self._spatial_indices[key] = (locdata, spatial_index)
+        return spatial_index
+
+    def _prune_spatial_indices(self) -> None:
+        """Discard spatial indices for locdatas that are no longer available."""
+        ids = {id(item) for item in self._locdatas}
+        with self._cache_lock:
+            self._spatial_indices = {
+                key: value
+                for key, value in self._spatial_indices.items()
+                if key[0] in ids
+            }
+            self._prune_key_locks(ids=ids)
+
+    def property_statistics(
+        self, loc_property: str, locdata: lc.LocData | None = None
+    ) -> PropertyStatistics:
+        """
+        Get summary statistics for a localization property of locdata.
+
+        The statistics are computed on first request and cached for later
+        requests.
+        They are recomputed if the localization property has changed (also
+        by in-place modifications) and discarded once the locdata is replaced
+        or deleted.
+        The method can be called from a worker thread.
+        Concurrent requests for the same statistics wait for a single
+        computation.
+
+        Parameters
+        ----------
+        loc_property
+            The localization property.
+        locdata
+            The localization data. If None, the selected LocData object is
+            taken.
+
+        Returns
+        -------
+        PropertyStatistics
+        """
+        if locdata is None:
+            locdata = self.locdata
+        if locdata is None:
+            raise ValueError("There is no smlm data available.")
+
+        key = (id(locdata), loc_property)
+        values = locdata.data[loc_property]
+        # statistics requested while being computed in another thread are
+        # waited for instead of being computed twice
+        with self._key_lock(("property_statistics", *key)):
+            with self._cache_lock:
+                item = self._property_statistics.get(key)
+            if item is not None:
+                locdata_, statistics = item
+                if locdata_ is locdata and statistics.is_valid(values):
+                    return statistics
+
+            statistics = PropertyStatistics(values=values, loc_property=loc_property)
+            with self._cache_lock:
+                # the cache keeps a reference to locdata so that its id stays unique
+                if self.contains(locdata):
+                    self._property_statistics[key] = (locdata, statistics)
+        return statistics
+
+    def _prune_property_statistics(self) -> None:
+        """Discard statistics for locdatas that are no longer available."""
+        ids = {id(item) for item in self._locdatas}
+        with self._cache_lock:
+            self._property_statistics = {
+                key: value
+                for key, value in self._property_statistics.items()
+                if key[0] in ids
+            }
+            self._prune_key_locks(ids=ids)
+
+    def _key_lock(self, key: tuple[Any, ...]) -> threading.Lock:
+        """
+        Lock for computing a cached item so that the item is computed once
+        if requested from several threads.
+        """
+        with self._cache_lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _prune_key_locks(self, ids: set[int]) -> None:
+        """Discard locks for locdatas that are no longer available."""
+        self._key_locks = {
+            key: value for key, value in self._key_locks.items() if key[1] in ids
+        }
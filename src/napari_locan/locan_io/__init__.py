@@ -0,0 +1,19 @@
+"""
+
+File input and output for napari-locan.
+
+The routines complement locan file io with procedures that are optimized
+for large SMLM datasets as handled by the napari-locan widgets.
+
+Submodules:
+-----------
+
+.. autosummary::
+   :toctree: ./
+
+   columnar_cache
+   load
+   project
+   roi_files
+   save
+"""
@@ -0,0 +1,306 @@
+"""
+Columnar binary cache for localization files.
+
+Parsing a large text-based localization file is slow and has to be repeated
+in each session.
+This module converts a parsed localization file into a columnar binary
+representation: one `.npy` file per column together with a metadata file
+that also holds the computed LocData properties.
+Later loads memory-map the column files so that localization data is paged
+in from disk on demand.
+
+Cached entries are kept in a cache directory and are addressed by the source
+file path, the file type and the load parameters.
+An entry is only used if modification time and size of the source file are
+unchanged.
+Localization data that is loaded from the cache is read-only and its
+properties are restored without recomputation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import locan as lc
+import numpy as np
+import pandas as pd
+import platformdirs
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_DIRECTORY: Path = (
+    Path(platformdirs.user_cache_dir("napari-locan")) / "localization_files"
+)
+
+FORMAT_VERSION: int = 2
+
+
+def restore_locdata(
+    dataframe: pd.DataFrame,
+    meta: lc.data.metadata_pb2.Metadata | bytes,
+    properties: dict[str, Any],
+) -> lc.LocData:
+    """
+    Create a LocData object from localization data together with metadata
+    and properties that were computed before.
+
+    In contrast to :meth:`locan.LocData.from_dataframe` the properties are
+    not recomputed.
+    The metadata is kept except for identifier and creation time that are
+    set for the new object.
+
+    Parameters
+    ----------
+    dataframe
+        Localization data.
+    meta
+        Metadata or metadata serialized as string of bytes.
+    properties
+        Properties of the LocData object from which dataframe was taken.
+
+    Returns
+    -------
+    lc.LocData
+    """
+    locdata = lc.LocData()
+    locdata.dataframe = dataframe
+    locdata.properties = dict(properties)
+    locdata.dimension = len(locdata.coordinate_keys)
+    # hulls are recomputed on access
+    locdata._bounding_box = None
+
+    if isinstance(meta, bytes):
+        meta_ = lc.data.metadata_pb2.Metadata()
+        meta_.ParseFromString(meta)
+    else:
+        meta_ = lc.data.metadata_pb2.Metadata()
+        meta_.CopyFrom(meta)
+    meta_.identifier = locdata.meta.identifier
+    meta_.creation_time.CopyFrom(locdata.meta.creation_time)
+    locdata.meta = meta_
+    return locdata
+
+
+class ColumnarCache:
+    """
+    Columnar binary cache for localization files.
+
+    Parameters
+    ----------
+    directory
+        Directory in which to keep the cached entries.
+        If None, CACHE_DIRECTORY in the user cache directory is taken.
+    max_bytes
+        Maximum size of all cached entries.
+
+    Attributes
+    ----------
+    directory
+        Directory in which to keep the cached entries.
+    max_bytes
+        Maximum size of all cached entries.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        max_bytes: int = 2**34,
+    ) -> None:
+        self.directory: Path = CACHE_DIRECTORY if directory is None else Path(directory)
+        self.max_bytes: int = max_bytes
+
+    def entry_directory(
+        self,
+        path: str | os.PathLike[str],
+        file_type: str,
+        kwargs: dict[str, Any] | None = None,
+    ) -> Path:
+        """
+        Directory for the cached entry of a localization file.
+
+        Parameters
+        ----------
+        path
+            File path of the localization file.
+        file_type
+            Indicator for the file type.
+        kwargs
+            Parameters for the load function.
+
+        Returns
+        -------
+        Path
+        """
+        key = json.dumps(
+            [str(Path(path).resolve()), file_type, kwargs or {}],
+            sort_keys=True,
+            default=str,
+        )
+        return (
+            self.directory / hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+        )
+
+    def load(
+        self,
+        path: str | os.PathLike[str],
+        file_type: str,
+        kwargs: dict[str, Any] | None = None,
+    ) -> lc.LocData | None:
+        """
+        Load localization data from the cache.
+
+        Parameters
+        ----------
+        path
+            File path of the localization file.
+        file_type
+            Indicator for the file type.
+        kwargs
+            Parameters for the load function.
+
+        Returns
+        -------
+        lc.LocData | None
+            Localization data with memory-mapped columns or None if no valid
+            entry is available.
+        """
+        entry_directory = self.entry_directory(path, file_type, kwargs)
+        try:
+            with open(entry_directory / "metadata.json") as file:
+                metadata = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Corrupted cache entry is deleted: %s", entry_directory)
+            shutil.rmtree(entry_directory, ignore_errors=True)
+            return None
+
+        stat = Path(path).stat()
+        if (
+            metadata.get("format_version") != FORMAT_VERSION
+            or metadata["mtime_ns"] != stat.st_mtime_ns
+            or metadata["size"] != stat.st_size
+        ):
+            shutil.rmtree(entry_directory, ignore_errors=True)
+            return None
+
+        columns = {
+            column_: np.load(
+                entry_directory / f"{index}.npy", mmap_mode="r", allow_pickle=False
+            )
+            for index, column_ in enumerate(metadata["columns"])
+        }
+        dataframe = pd.DataFrame(columns, copy=False)
+        locdata = restore_locdata(
+            dataframe=dataframe,
+            meta=(entry_directory / "meta.pb").read_bytes(),
+            properties=metadata["properties"],
+        )
+
+        # mark as recently used
+        os.utime(entry_directory / "metadata.json")
+        return locdata
+
+    def save(
+        self,
+        locdata: lc.LocData,
+        path: str | os.PathLike[str],
+        file_type: str,
+        kwargs: dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Save localization data as cache entry for a localization file.
+
+        Only LocData objects with numeric columns and without references are
+        cached.
+
+        Parameters
+        ----------
+        locdata
+            The localization data as loaded from path.
+        path
+            File path of the localization file.
+        file_type
+            Indicator for the file type.
+        kwargs
+            Parameters for the load function.
+
+        Returns
+        -------
+        bool
+            True if the entry was saved.
+        """
+        dataframe = locdata.data
+        if locdata.references is not None or not all(
+            dtype_.kind in "biuf" for dtype_ in dataframe.dtypes
+        ):
+            logger.info("Localization data is not cached: %s", path)
+            return False
+
+        stat = Path(path).stat()
+        metadata = {
+            "format_version": FORMAT_VERSION,
+            "source_path": str(path),
+            "file_type": file_type,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "columns": list(dataframe.columns),
+            "properties": {
+                key_: value_.item() if isinstance(value_, np.generic) else value_
+                for key_, value_ in locdata.properties.items()
+            },
+        }
+
+        entry_directory = self.entry_directory(path, file_type, kwargs)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write to temporary directory first to never expose incomplete entries
+        temporary_directory = Path(tempfile.mkdtemp(dir=self.directory))
+        try:
+            for index, column_ in enumerate(dataframe.columns):
+                np.save(
+                    temporary_directory / f"{index}.npy",
+                    dataframe[column_].to_numpy(),
+                    allow_pickle=False,
+                )
+            (temporary_directory / "meta.pb").write_bytes(
+                locdata.meta.SerializeToString()
+            )
+            with open(temporary_directory / "metadata.json", "w") as file:
+                json.dump(metadata, file)
+            shutil.rmtree(entry_directory, ignore_errors=True)
+            os.replace(temporary_directory, entry_directory)
+        except BaseException:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            raise
+        self._evict()
+        return True
+
+    def clear(self) -> None:
+        """Delete all cached entries."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries to keep within max_bytes."""
+        entries = []
+        for metadata_path in self.directory.glob("*/metadata.json"):
+            try:
+                n_bytes = sum(
+                    path_.stat().st_size for path_ in metadata_path.parent.iterdir()
+                )
+                entries.append((metadata_path.stat().st_mtime, n_bytes, metadata_path))
+            except FileNotFoundError:
+                continue
+        n_bytes_total = sum(entry[1] for entry in entries)
+        for _, n_bytes, metadata_path in sorted(entries):
+            if n_bytes_total <= self.max_bytes:
+                break
+            shutil.rmtree(metadata_path.parent, ignore_errors=True)
+            n_bytes_total -= n_bytes
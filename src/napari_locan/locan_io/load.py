@@ -0,0 +1,747 @@
+"""
+Load localization files with progress report and cancellation.
+
+Loading a large localization file through :func:`locan.load_locdata` is a
+single blocking call.
+This module provides a loader that reads text-based localization files
+through a file object that keeps track of the number of bytes read and that
+can be cancelled from another thread while reading.
+For other file types the progress is only available upon completion.
+
+Multiple files are loaded in parallel by a pool of processes.
+
+The loaded localization properties and their data types can be specified.
+For text-based files they are applied while parsing, which reduces memory
+requirement and load time for files with many columns.
+
+A filter condition can be applied while loading.
+Files of types in CHUNKED_FILE_SEPARATORS are then parsed in chunks of rows
+and only localizations that fulfill the condition are kept in memory.
+
+Parsed localization data can be kept in a
+:class:`napari_locan.locan_io.columnar_cache.ColumnarCache` from which later
+loads are served.
+
+Localization data that is requested repeatedly within a session, e.g. for
+regions of interest that refer to the same localization file, is kept by
+:class:`LocDataFileCache` so that the file is parsed only once.
+"""
+
+from __future__ import annotations
+
+import glob
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+import locan as lc
+import pandas as pd
+
+from napari_locan.locan_io.columnar_cache import ColumnarCache, restore_locdata
+
+logger = logging.getLogger(__name__)
+
+
+# file types that are read through a text file object by locan and the
+# corresponding text encoding (None for the locale encoding)
+TEXT_FILE_ENCODINGS: dict[str, str | None] = {
+    lc.FileType.CUSTOM.name: None,
+    lc.FileType.RAPIDSTORM.name: None,
+    lc.FileType.ELYRA.name: "latin-1",
+    lc.FileType.THUNDERSTORM.name: None,
+    lc.FileType.NANOIMAGER.name: None,
+}
+
+# file types with a single header line that are parsed in chunks by
+# pandas.read_csv and the corresponding column separator
+CHUNKED_FILE_SEPARATORS: dict[str, str] = {
+    lc.FileType.RAPIDSTORM.name: " ",
+    lc.FileType.THUNDERSTORM.name: ",",
+    lc.FileType.NANOIMAGER.name: ",",
+}
+
+
+def _condition_names(condition: str) -> set[str]:
+    """
+    Names in a query string that may refer to localization properties.
+
+    Parameters
+    ----------
+    condition
+        Query string for :meth:`pandas.DataFrame.query`.
+
+    Returns
+    -------
+    set[str]
+    """
+    return {
+        name_
+        for names_ in re.findall(r"`([^`]+)`|([A-Za-z_]\w*)", condition)
+        for name_ in names_
+        if name_
+    }
+
+
+class LoadCancelledError(Exception):
+    """Loading a file was cancelled."""
+
+
+class ProgressFile(io.RawIOBase):
+    """
+    Binary file object that can be cancelled while reading.
+
+    Parameters
+    ----------
+    path
+        File path.
+    cancel_event
+        Reading raises LoadCancelledError once the event is set.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        super().__init__()
+        self._file = open(path, mode="rb")  # noqa: SIM115
+        self.cancel_event = threading.Event() if cancel_event is None else cancel_event
+        # the position is tracked to be read from other threads without
+        # accessing the file object
+        self.position: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int | None:
+        if self.cancel_event.is_set():
+            raise LoadCancelledError("Loading was cancelled.")
+        n_bytes = self._file.readinto(buffer)
+        if n_bytes:
+            self.position += n_bytes
+        return n_bytes
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self.position = self._file.seek(offset, whence)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+class LocDataLoader:
+    """
+    Load a localization file and report the number of bytes read.
+
+    Parameters
+    ----------
+    path
+        File path for a localization file to load.
+    file_type
+        Indicator for the file type as name of :class:`locan.FileType`
+        or "ROI" for a roi file with reference to a localization file.
+    columnar_cache
+        Cache from which the localization data is loaded if available and
+        into which the localization data is saved after parsing.
+        Not used for roi files.
+    loc_properties
+        Localization properties to load. All if None.
+    dtypes
+        Mapping of localization properties to data types like
+        `{"position_x": "float32", "frame": "int32"}`.
+        If given, types are not converted by locan after parsing; float
+        properties that are not listed are parsed as float32.
+    condition
+        Query string for :meth:`pandas.DataFrame.query` to select
+        localizations like the filter condition of
+        :class:`napari_locan.data_model.filter_specifications.FilterSpecifications`.
+    chunk_size
+        Number of rows that are parsed at once when applying condition.
+    kwargs
+        Other parameters passed to :func:`locan.load_locdata`
+        or :func:`locan.load_locdata_from_roi_file`.
+
+    Attributes
+    ----------
+    path
+        File path for a localization file to load.
+    file_type
+        Indicator for the file type.
+    kwargs
+        Other parameters passed to the load function.
+    size
+        File size in bytes.
+    columnar_cache
+        Cache for parsed localization data.
+    loc_properties
+        Localization properties to load.
+    dtypes
+        Mapping of localization properties to data types.
+    condition
+        Query string to select localizations.
+    chunk_size
+        Number of rows that are parsed at once when applying condition.
+    is_cached
+        True if the localization data was loaded from columnar_cache.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        file_type: str,
+        columnar_cache: ColumnarCache | None = None,
+        loc_properties: Iterable[str] | None = None,
+        dtypes: dict[str, str] | None = None,
+        condition: str | None = None,
+        chunk_size: int = 1_000_000,
+        **kwargs: Any,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.file_type: str = file_type
+        self.columnar_cache: ColumnarCache | None = (
+            None if file_type == "ROI" else columnar_cache
+        )
+        self.loc_properties: list[str] | None = (
+            None if loc_properties is None else list(loc_properties)
+        )
+        self.dtypes: dict[str, str] | None = dtypes
+        self.condition: str | None = condition or None
+        self.chunk_size: int = chunk_size
+        self.is_cached: bool = False
+        self.kwargs: dict[str, Any] = kwargs
+        self.size: int = self.path.stat().st_size
+        self._cancel_event = threading.Event()
+        self._file: ProgressFile | None = None
+        self._bytes_read: int = 0
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes read from file."""
+        file = self._file
+        if file is not None:
+            self._bytes_read = max(self._bytes_read, file.position)
+        return self._bytes_read
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel loading."""
+        self._cancel_event.set()
+
+    def load(self) -> lc.LocData:
+        """
+        Load the localization file.
+
+        Returns
+        -------
+        lc.LocData
+            The loaded localization data.
+
+        Raises
+        ------
+        LoadCancelledError
+            If loading was cancelled.
+        """
+        if self.is_cancelled:
+            raise LoadCancelledError("Loading was cancelled.")
+
+        if self.columnar_cache is not None:
+            locdata = self.columnar_cache.load(
+                path=self.path, file_type=self.file_type, kwargs=self._cache_kwargs()
+            )
+            if locdata is not None:
+                self.is_cached = True
+                self._bytes_read = self.size
+                return locdata
+
+        if self.file_type == "ROI":
+            locdata = lc.load_locdata_from_roi_file(path=self.path, **self.kwargs)
+        elif self.condition is not None and self.file_type in CHUNKED_FILE_SEPARATORS:
+            locdata = self._load_text_file_chunked()
+        elif self.file_type in TEXT_FILE_ENCODINGS:
+            locdata = self._load_text_file()
+        else:
+            locdata = lc.load_locdata(
+                path=self.path, file_type=self.file_type, **self.kwargs
+            )
+
+        if self.file_type in CHUNKED_FILE_SEPARATORS:
+            condition = None
+        else:
+            condition = self.condition
+        if self.file_type in TEXT_FILE_ENCODINGS:
+            # columns that are only parsed for the condition are dropped
+            loc_properties = None if condition is None else self.loc_properties
+            dtypes = None
+        else:
+            loc_properties, dtypes = self.loc_properties, self.dtypes
+        if loc_properties is not None or dtypes or condition is not None:
+            locdata = project_locdata(
+                locdata=locdata,
+                loc_properties=loc_properties,
+                dtypes=dtypes,
+                condition=condition,
+            )
+
+        if self.is_cancelled:
+            raise LoadCancelledError("Loading was cancelled.")
+        self._bytes_read = self.size
+
+        if self.columnar_cache is not None:
+            self.columnar_cache.save(
+                locdata=locdata,
+                path=self.path,
+                file_type=self.file_type,
+                kwargs=self._cache_kwargs(),
+            )
+        return locdata
+
+    def _cache_kwargs(self) -> dict[str, Any]:
+        kwargs = dict(self.kwargs)
+        if self.loc_properties is not None:
+            kwargs["loc_properties"] = self.loc_properties
+        if self.dtypes:
+            kwargs["dtypes"] = self.dtypes
+        if self.condition is not None:
+            kwargs["condition"] = self.condition
+        return kwargs
+
+    def _read_csv_kwargs(self) -> dict[str, Any]:
+        """Parameters for :func:`pandas.read_csv` to project and type columns."""
+        kwargs: dict[str, Any] = {}
+        if self.loc_properties is not None:
+            loc_properties = set(self.loc_properties)
+            # columns in the condition are parsed in addition
+            if self.condition is not None:
+                loc_properties |= _condition_names(self.condition)
+            kwargs["usecols"] = lambda name: name in loc_properties
+        if self.dtypes:
+            kwargs["convert"] = False
+            kwargs["dtype"] = {
+                key: "float32"
+                for key, value in lc.PROPERTY_KEYS.items()
+                if value == "float"
+            }
+            kwargs["dtype"].update(self.dtypes)
+        return kwargs
+
+    def _open_text_file(self) -> io.TextIOWrapper:
+        self._file = ProgressFile(path=self.path, cancel_event=self._cancel_event)
+        return io.TextIOWrapper(
+            io.BufferedReader(self._file),
+            encoding=TEXT_FILE_ENCODINGS[self.file_type],
+        )
+
+    def _load_text_file(self) -> lc.LocData:
+        text_file = self._open_text_file()
+        text_file_repr = str(text_file)
+        try:
+            locdata = lc.load_locdata(
+                path=text_file,
+                file_type=self.file_type,
+                **self.kwargs,
+                **self._read_csv_kwargs(),
+            )
+        finally:
+            self._bytes_read = self.bytes_read
+            text_file.close()
+
+        # locan records the file object instead of the file path
+        locdata.meta.file.path = str(self.path)
+        for item in locdata.meta.history:
+            item.parameter = item.parameter.replace(text_file_repr, str(self.path))
+        return locdata
+
+    def _load_text_file_chunked(self) -> lc.LocData:
+        """Parse the file in chunks and keep rows that fulfill condition."""
+        assert self.condition is not None  # type narrowing # noqa: S101
+        kwargs = dict(self.kwargs)
+        nrows = kwargs.pop("nrows", None)
+        convert = kwargs.pop("convert", True)
+        read_csv_kwargs = self._read_csv_kwargs()
+        convert = read_csv_kwargs.pop("convert", convert)
+
+        # the header is parsed by locan
+        template = lc.load_locdata(path=self.path, file_type=self.file_type, nrows=0)
+
+        chunks = []
+        text_file = self._open_text_file()
+        try:
+            text_file.readline()
+            with pd.read_csv(
+                text_file,
+                sep=CHUNKED_FILE_SEPARATORS[self.file_type],
+                names=list(template.data.columns),
+                nrows=nrows,
+                chunksize=self.chunk_size,
+                **kwargs,
+                **read_csv_kwargs,
+            ) as reader:
+                for chunk in reader:
+                    chunk = chunk.query(self.condition)
+                    if self.loc_properties is not None:
+                        # drop columns that were only parsed for the condition
+                        chunk = chunk[
+                            [
+                                column_
+                                for column_ in chunk.columns
+                                if column_ in self.loc_properties
+                            ]
+                        ]
+                    chunks.append(chunk)
+        finally:
+            self._bytes_read = self.bytes_read
+            text_file.close()
+
+        dataframe = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        if convert:
+            dataframe = lc.convert_property_types(dataframe, types=lc.PROPERTY_KEYS)
+        locdata = lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+
+        locdata.meta.source = template.meta.source
+        locdata.meta.state = template.meta.state
+        locdata.meta.file.CopyFrom(template.meta.file)
+        locdata.meta.localization_properties.extend(
+            property_
+            for property_ in template.meta.localization_properties
+            if property_.name in dataframe.columns
+        )
+        del locdata.meta.history[:]
+        locdata.meta.history.add(
+            name=template.meta.history[0].name,
+            parameter=f"path={self.path}, nrows={nrows}",
+        )
+        locdata.meta.history.add(
+            name="select_by_condition", parameter=f"condition={self.condition}"
+        )
+        return locdata
+
+
+class LocDataFileCache:
+    """
+    Shared cache of localization data that is loaded from localization files.
+
+    Localization data is loaded through :class:`LocDataLoader` on first
+    request and kept for later requests as long as modification time and
+    size of the file are unchanged.
+    Concurrent requests for the same file wait for a single load.
+
+    Parameters
+    ----------
+    columnar_cache
+        Cache from which the localization data is loaded if available and
+        into which the localization data is saved after parsing.
+    max_items
+        Maximum number of localization datasets to keep.
+        The least recently used dataset is discarded first.
+
+    Attributes
+    ----------
+    columnar_cache
+        Cache for parsed localization data.
+    max_items
+        Maximum number of localization datasets to keep.
+    """
+
+    def __init__(
+        self, columnar_cache: ColumnarCache | None = None, max_items: int = 8
+    ) -> None:
+        self.columnar_cache: ColumnarCache | None = columnar_cache
+        self.max_items: int = max_items
+        self._items: OrderedDict[
+            tuple[str, str, str], tuple[tuple[int, int], lc.LocData]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple[str, str, str], threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def load(
+        self,
+        path: str | os.PathLike[str],
+        file_type: int | str | lc.FileType,
+        **kwargs: Any,
+    ) -> lc.LocData:
+        """
+        Load the localization file or take the localization data from cache.
+
+        Parameters
+        ----------
+        path
+            File path for a localization file to load.
+        file_type
+            Indicator for the file type as :class:`locan.FileType`, its name
+            or its value.
+        kwargs
+            Other parameters passed to :class:`LocDataLoader`.
+
+        Returns
+        -------
+        lc.LocData
+            The loaded localization data that is shared by all requests.
+        """
+        if isinstance(file_type, str):
+            file_type_ = lc.FileType[file_type.upper()].name
+        else:
+            file_type_ = lc.FileType(file_type).name
+        path_ = Path(path).resolve()
+        key = (str(path_), file_type_, json.dumps(kwargs, sort_keys=True, default=str))
+        stat = path_.stat()
+        state = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None and item[0] == state:
+                    self._items.move_to_end(key)
+                    return item[1]
+
+            locdata = LocDataLoader(
+                path=path_,
+                file_type=file_type_,
+                columnar_cache=self.columnar_cache,
+                **kwargs,
+            ).load()
+
+            with self._lock:
+                self._items[key] = (state, locdata)
+                self._items.move_to_end(key)
+                while len(self._items) > self.max_items:
+                    key_, _ = self._items.popitem(last=False)
+                    self._key_locks.pop(key_, None)
+        return locdata
+
+    def clear(self) -> None:
+        """Discard all localization data."""
+        with self._lock:
+            self._items.clear()
+
+
+def project_locdata(
+    locdata: lc.LocData,
+    loc_properties: Iterable[str] | None = None,
+    dtypes: dict[str, str] | None = None,
+    condition: str | None = None,
+) -> lc.LocData:
+    """
+    Select localization properties and convert their data types.
+    Optionally select localizations by condition.
+
+    Parameters
+    ----------
+    locdata
+        The localization data.
+    loc_properties
+        Localization properties to keep. All if None.
+    dtypes
+        Mapping of localization properties to data types.
+    condition
+        Query string for :meth:`pandas.DataFrame.query` to select
+        localizations.
+
+    Returns
+    -------
+    lc.LocData
+        New localization data with the metadata of locdata.
+    """
+    dataframe = locdata.data
+    if condition is not None:
+        dataframe = dataframe.query(condition).reset_index(drop=True)
+    if loc_properties is not None:
+        loc_properties = set(loc_properties)
+        dataframe = dataframe[
+            [column_ for column_ in dataframe.columns if column_ in loc_properties]
+        ]
+    if dtypes:
+        dataframe = dataframe.astype(
+            {key: value for key, value in dtypes.items() if key in dataframe.columns}
+        )
+    new_locdata = lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+
+    meta = lc.data.metadata_pb2.Metadata()
+    meta.CopyFrom(locdata.meta)
+    meta.identifier = new_locdata.meta.identifier
+    meta.creation_time.CopyFrom(new_locdata.meta.creation_time)
+    meta.element_count = new_locdata.meta.element_count
+    meta.frame_count = new_locdata.meta.frame_count
+    if condition is not None:
+        meta.history.add(name="select_by_condition", parameter=f"condition={condition}")
+    new_locdata.meta = meta
+    return new_locdata
+
+
+def expand_file_paths(
+    paths: str | os.PathLike[str] | Iterable[str | os.PathLike[str]],
+) -> list[Path]:
+    """
+    Expand file paths and glob patterns.
+
+    Parameters
+    ----------
+    paths
+        File paths or glob patterns.
+        A string may hold several paths separated by ";".
+
+    Returns
+    -------
+    list[Path]
+        Existing file paths in the given order with glob matches sorted.
+    """
+    if isinstance(paths, str):
+        paths = [path_.strip() for path_ in paths.split(";") if path_.strip()]
+    elif isinstance(paths, os.PathLike):
+        paths = [paths]
+
+    file_paths: list[Path] = []
+    for path_ in paths:
+        path_ = os.fspath(path_)
+        if glob.has_magic(path_):
+            file_paths.extend(
+                Path(match_)
+                for match_ in sorted(glob.glob(path_))
+                if Path(match_).is_file()
+            )
+        else:
+            file_paths.append(Path(path_))
+    return file_paths
+
+
+def _load_file(
+    path: Path,
+    file_type: str,
+    columnar_cache: ColumnarCache | None,
+    kwargs: dict[str, Any],
+) -> tuple[pd.DataFrame, bytes, dict[str, Any]]:
+    # executed in a worker process - the localization data is sent back as
+    # dataframe together with serialized metadata and the computed properties
+    # from which the LocData object is restored without recomputation
+    locdata = LocDataLoader(
+        path=path, file_type=file_type, columnar_cache=columnar_cache, **kwargs
+    ).load()
+    return locdata.data, locdata.meta.SerializeToString(), locdata.properties
+
+
+def iterate_load_locdata_files(
+    paths: Iterable[str | os.PathLike[str]],
+    file_type: str,
+    n_jobs: int = -1,
+    columnar_cache: ColumnarCache | None = None,
+    **kwargs: Any,
+) -> Generator[tuple[int, lc.LocData], None, None]:
+    """
+    Load localization files in parallel processes and yield each LocData
+    object as soon as it is available.
+
+    Files that are not yet loaded are cancelled when the generator is closed.
+    The generator then returns without waiting for files that are being
+    parsed; their worker processes finish in the background and the results
+    are discarded.
+
+    The worker processes only import locan and the napari-independent parts
+    of napari-locan.
+
+    Parameters
+    ----------
+    paths
+        File paths for localization files to load.
+    file_type
+        Indicator for the file type as name of :class:`locan.FileType`
+        or "ROI".
+    n_jobs
+        Number of processes (-1 for all processors).
+    columnar_cache
+        Cache for parsed localization data.
+    kwargs
+        Other parameters passed to the load function.
+
+    Yields
+    ------
+    tuple[int, lc.LocData]
+        Position of the file in paths and the loaded localization data.
+    """
+    file_paths = [Path(path_) for path_ in paths]
+    if not file_paths:
+        return
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(file_paths))
+
+    # processes are spawned since forking is unsafe in a running Qt application
+    executor = ProcessPoolExecutor(
+        max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        futures = {
+            executor.submit(_load_file, path_, file_type, columnar_cache, kwargs): index
+            for index, path_ in enumerate(file_paths)
+        }
+        for future in as_completed(futures):
+            dataframe, meta, properties = future.result()
+            yield futures[future], restore_locdata(
+                dataframe=dataframe, meta=meta, properties=properties
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_locdata_files(
+    paths: Iterable[str | os.PathLike[str]],
+    file_type: str,
+    n_jobs: int = -1,
+    columnar_cache: ColumnarCache | None = None,
+    **kwargs: Any,
+) -> list[lc.LocData]:
+    """
+    Load localization files in parallel processes.
+
+    Parameters
+    ----------
+    paths
+        File paths for localization files to load.
+    file_type
+        Indicator for the file type as name of :class:`locan.FileType`
+        or "ROI".
+    n_jobs
+        Number of processes (-1 for all processors).
+    columnar_cache
+        Cache for parsed localization data.
+    kwargs
+        Other parameters passed to the load function.
+
+    Returns
+    -------
+    list[lc.LocData]
+        The loaded localization data in the order of paths.
+    """
+    paths = list(paths)
+    locdatas: list[lc.LocData | None] = [None] * len(paths)
+    for index, locdata in iterate_load_locdata_files(
+        paths=paths,
+        file_type=file_type,
+        n_jobs=n_jobs,
+        columnar_cache=columnar_cache,
+        **kwargs,
+    ):
+        locdatas[index] = locdata
+    return locdatas  # type: ignore[return-value]
@@ -0,0 +1,748 @@
+"""
+Save and load napari-locan projects.
+
+A napari-locan project holds the state of the data models filter
+specifications, region specifications, roi specifications and SMLM data.
+
+A project is saved as directory with the following structure::
+
+    project.json
+    locdatas/<name>/meta.pb
+    locdatas/<name>/<i>.npz
+    locdatas/<name>/references/<j>/...
+
+The file `project.json` holds the specifications and the names, columns and
+directories of all localization datasets.
+A project is saved incrementally by :class:`ProjectWriter`: localization
+datasets that are unchanged in the project directory are kept and only the
+project file and new datasets are written.
+Each column of a localization dataset is kept as compressed numpy array in a
+separate file and the metadata is kept as serialized protobuf message.
+Column files are written and read in parallel threads.
+Collections keep their references in subdirectories and are recomputed
+from their references upon loading.
+Regions of localization datasets are kept by their representation.
+Selections are saved with their localization data and are independent of
+the selected dataset after loading.
+
+Projects can be loaded lazily.
+Then only the specifications and the names are loaded and each localization
+dataset is represented by a :class:`LocDataPlaceholder` that loads the
+localization data on demand.
+"""
+
+from __future__ import annotations
+
+import ast
+import base64
+import json
+import logging
+import os
+import shutil
+import uuid
+import weakref
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+PROJECT_FILE_NAME: str = "project.json"
+
+FORMAT_VERSION: int = 1
+
+
+def _selector_to_dict(selector: lc.Selector) -> dict[str, Any]:
+    return {
+        "loc_property": selector.loc_property,
+        "activate": selector.activate,
+        "lower_bound": selector.lower_bound,
+        "upper_bound": selector.upper_bound,
+    }
+
+
+def _region_from_node(node: ast.expr) -> Any:
+    """Evaluate a node of a region representation."""
+    if isinstance(node, ast.Call):
+        region_class: Any = (
+            getattr(lc, node.func.id, None) if isinstance(node.func, ast.Name) else None
+        )
+        if (
+            not (isinstance(region_class, type) and issubclass(region_class, lc.Region))
+            or node.keywords
+        ):
+            raise ValueError("Only regions can be constructed.")
+        return region_class(*[_region_from_node(arg) for arg in node.args])
+    if isinstance(node, ast.List):
+        return [_region_from_node(element) for element in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_region_from_node(element) for element in node.elts)
+    return ast.literal_eval(node)
+
+
+def region_from_repr(text: str) -> lc.Region:
+    """
+    Create a region from its representation.
+
+    Regions that are composed of other regions like
+    `MultiPolygon([Polygon(...), Polygon(...)])` are supported.
+
+    Parameters
+    ----------
+    text
+        Representation of a region like `Rectangle((0, 0), 1, 1, 0)`.
+
+    Returns
+    -------
+    lc.Region
+    """
+    try:
+        node = ast.parse(text.strip(), mode="eval").body
+        if not isinstance(node, ast.Call):
+            raise ValueError("Not a region.")
+        region = _region_from_node(node)
+    except (SyntaxError, ValueError, TypeError) as exception:
+        raise ValueError(f"No region is represented by {text}.") from exception
+    assert isinstance(region, lc.Region)  # type narrowing # noqa: S101
+    return region
+
+
+def _region_to_repr(region: lc.Region | None) -> str | None:
+    return None if region is None else repr(region)
+
+
+def _roi_to_dict(
+    roi: lc.Roi,
+    locdatas: list[lc.LocData | LocDataPlaceholder],
+    placeholders: list[LocDataPlaceholder | None] | None = None,
+) -> dict[str, Any]:
+    reference: dict[str, Any] | None
+    if placeholders is None:
+        placeholders = [None] * len(locdatas)
+    index = next(
+        (
+            index
+            for index, (locdata, placeholder) in enumerate(zip(locdatas, placeholders))
+            if roi.reference is locdata
+            or (roi.reference is not None and roi.reference is placeholder)
+        ),
+        None,
+    )
+    if roi.reference is None:
+        reference = None
+    elif index is not None:
+        reference = {"smlm_data_index": index}
+    else:
+        meta = (
+            roi.reference.meta
+            if isinstance(roi.reference, (lc.LocData, LocDataPlaceholder))
+            else roi.reference
+        )
+        reference = {"meta": base64.b64encode(meta.SerializeToString()).decode()}
+    return {
+        "reference": reference,
+        "region": repr(roi.region),
+        "loc_properties": roi.loc_properties,
+    }
+
+
+def _roi_from_dict(
+    item: dict[str, Any], locdatas: list[lc.LocData] | list[LocDataPlaceholder]
+) -> lc.Roi:
+    reference: lc.LocData | LocDataPlaceholder | lc.data.metadata_pb2.Metadata | None
+    if item["reference"] is None:
+        reference = None
+    elif "smlm_data_index" in item["reference"]:
+        reference = locdatas[item["reference"]["smlm_data_index"]]
+    else:
+        reference = lc.data.metadata_pb2.Metadata()
+        reference.ParseFromString(base64.b64decode(item["reference"]["meta"]))
+    return lc.Roi(
+        reference=reference,  # type: ignore[arg-type]
+        region=region_from_repr(item["region"]),
+        loc_properties=item["loc_properties"],
+    )
+
+
+def _column_array(series: pd.Series) -> npt.NDArray[Any]:  # type: ignore[type-arg]
+    array = series.to_numpy()
+    if array.dtype.kind == "O":
+        array = array.astype(str)
+    return array
+
+
+def _save_column(path: Path, array: npt.NDArray[Any]) -> None:
+    with open(path, "wb") as file:
+        np.savez_compressed(file, array)
+
+
+def _load_column(path: Path) -> npt.NDArray[Any]:
+    with np.load(path, allow_pickle=False) as npz_file:
+        array: npt.NDArray[Any] = npz_file["arr_0"]
+    return array
+
+
+def _prepare_locdata(
+    locdata: lc.LocData,
+    directory: Path,
+    tasks: list[tuple[Callable[..., Any], tuple[Any, ...]]],
+) -> dict[str, Any]:
+    """Collect the files to write for locdata and return its project item."""
+    directory.mkdir(parents=True)
+    tasks.append(
+        (Path.write_bytes, (directory / "meta.pb", locdata.meta.SerializeToString()))
+    )
+    if isinstance(locdata.references, list):
+        references = [
+            _prepare_locdata(
+                locdata=reference,
+                directory=directory / "references" / str(index),
+                tasks=tasks,
+            )
+            for index, reference in enumerate(locdata.references)
+        ]
+        return {
+            "columns": [],
+            "references": references,
+            "region": _region_to_repr(locdata.region),
+        }
+
+    # selection views are materialized once for all columns
+    data = locdata.data
+    columns = [str(column_) for column_ in data.columns]
+    for index, column_ in enumerate(data.columns):
+        tasks.append(
+            (
+                _save_column,
+                (directory / f"{index}.npz", _column_array(data[column_])),
+            )
+        )
+    return {
+        "columns": columns,
+        "references": None,
+        "region": _region_to_repr(locdata.region),
+    }
+
+
+def _metadata(
+    project: dict[str, dict[str, Any]], locdata_items: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Metadata for the project file."""
+    filter_specifications = project["filter_specifications"]
+    region_specifications = project["region_specifications"]
+    roi_specifications = project["roi_specifications"]
+    smlm_data = project["smlm_data"]
+    return {
+        "format_version": FORMAT_VERSION,
+        "filter_specifications": {
+            "datasets": [
+                {key: _selector_to_dict(value) for key, value in dataset.items()}
+                for dataset in filter_specifications["datasets"]
+            ],
+            "names": filter_specifications["names"],
+            "index": filter_specifications["index"],
+        },
+        "region_specifications": {
+            "datasets": [repr(region) for region in region_specifications["datasets"]],
+            "names": region_specifications["names"],
+            "index": region_specifications["index"],
+        },
+        "roi_specifications": {
+            "datasets": [
+                _roi_to_dict(
+                    roi=roi,
+                    locdatas=smlm_data["datasets"],
+                    placeholders=smlm_data.get("placeholders"),
+                )
+                for roi in roi_specifications["datasets"]
+            ],
+            "names": roi_specifications["names"],
+            "index": roi_specifications["index"],
+        },
+        "smlm_data": {
+            "datasets": locdata_items,
+            "names": smlm_data["names"],
+            "index": smlm_data["index"],
+        },
+    }
+
+
+class ProjectWriter:
+    """
+    Save a napari-locan project incrementally.
+
+    Localization datasets that are already kept in the project directory are
+    not written again.
+    These are datasets represented by a :class:`LocDataPlaceholder` of the
+    project and datasets that were written or registered before and whose
+    metadata is unchanged.
+    The project file is replaced once all new datasets are written and
+    datasets that are no longer part of the project are deleted afterwards.
+
+    Parameters
+    ----------
+    path
+        Project directory.
+    n_jobs
+        Number of threads to write files (-1 for all processors).
+
+    Attributes
+    ----------
+    path
+        Project directory.
+    n_jobs
+        Number of threads to write files.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], n_jobs: int = -1) -> None:
+        self.path: Path = Path(path)
+        self.n_jobs: int = n_jobs
+        self._placeholders: dict[
+            int, tuple[weakref.ref[lc.LocData], LocDataPlaceholder]
+        ] = {}
+
+    def register(self, locdata: lc.LocData, placeholder: LocDataPlaceholder) -> None:
+        """
+        Register locdata as being kept in the project directory.
+
+        Parameters
+        ----------
+        locdata
+            The localization dataset.
+        placeholder
+            Placeholder for the dataset in the project directory.
+        """
+        self._placeholders[id(locdata)] = (weakref.ref(locdata), placeholder)
+
+    def _is_within_project(self, placeholder: LocDataPlaceholder) -> bool:
+        return (
+            placeholder.directory.parent.resolve() == (self.path / "locdatas").resolve()
+            and (placeholder.directory / "meta.pb").is_file()
+        )
+
+    def _find_placeholder(
+        self, locdata: lc.LocData | LocDataPlaceholder
+    ) -> LocDataPlaceholder | None:
+        """Placeholder for locdata if it is unchanged in the project directory."""
+        if isinstance(locdata, LocDataPlaceholder):
+            return locdata if self._is_within_project(locdata) else None
+        try:
+            reference, placeholder = self._placeholders[id(locdata)]
+        except KeyError:
+            return None
+        if reference() is not locdata or not self._is_within_project(placeholder):
+            return None
+        meta_bytes = (placeholder.directory / "meta.pb").read_bytes()
+        if meta_bytes != locdata.meta.SerializeToString() or placeholder.item.get(
+            "region"
+        ) != _region_to_repr(locdata.region):
+            return None
+        return placeholder
+
+    def iterate_save(
+        self, project: dict[str, dict[str, Any]]
+    ) -> Generator[tuple[int, int], None, None]:
+        """
+        Save the project and yield the progress.
+
+        Parameters
+        ----------
+        project
+            Mapping with keys "filter_specifications", "region_specifications",
+            "roi_specifications" and "smlm_data".
+            Each value is a mapping with keys "datasets", "names" and "index".
+            SMLM datasets can be represented by :class:`LocDataPlaceholder`.
+            The value for "smlm_data" can have an additional key
+            "placeholders" with the placeholder from which each dataset was
+            loaded (or None) so that rois which refer to it are kept.
+
+        Yields
+        ------
+        tuple[int, int]
+            Number of written files and number of all files.
+        """
+        path = self.path
+        if path.exists() and not (path / PROJECT_FILE_NAME).is_file():
+            raise FileExistsError(f"{path} exists and is not a napari-locan project.")
+        n_jobs = self.n_jobs if self.n_jobs > 0 else os.cpu_count() or 1
+
+        tasks: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+        locdata_items = []
+        placeholders: list[tuple[lc.LocData | None, LocDataPlaceholder]] = []
+        new_directories: list[Path] = []
+        for locdata in project["smlm_data"]["datasets"]:
+            placeholder = self._find_placeholder(locdata)
+            if placeholder is None:
+                if isinstance(locdata, LocDataPlaceholder):
+                    locdata = locdata.load()
+                directory = path / "locdatas" / uuid.uuid4().hex
+                new_directories.append(directory)
+                item = _prepare_locdata(
+                    locdata=locdata, directory=directory, tasks=tasks
+                )
+                placeholder = LocDataPlaceholder(
+                    directory=directory, item=item, n_jobs=self.n_jobs
+                )
+            placeholders.append(
+                (
+                    None if isinstance(locdata, LocDataPlaceholder) else locdata,
+                    placeholder,
+                )
+            )
+            locdata_items.append(
+                {
+                    **placeholder.item,
+                    "directory": f"locdatas/{placeholder.directory.name}",
+                }
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(function, *args) for function, args in tasks]
+                for n_files, future in enumerate(as_completed(futures), start=1):
+                    future.result()
+                    yield n_files, len(tasks)
+
+            metadata = _metadata(project=project, locdata_items=locdata_items)
+            path.mkdir(parents=True, exist_ok=True)
+            temporary_file = path / (PROJECT_FILE_NAME + ".tmp")
+            with open(temporary_file, "w") as file:
+                json.dump(metadata, file, indent=1, default=float)
+            os.replace(temporary_file, path / PROJECT_FILE_NAME)
+        except BaseException:
+            for directory in new_directories:
+                shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        # delete datasets that are no longer part of the project
+        kept = {placeholder.directory.name for _, placeholder in placeholders}
+        if (path / "locdatas").is_dir():
+            for directory in (path / "locdatas").iterdir():
+                if directory.name not in kept:
+                    shutil.rmtree(directory, ignore_errors=True)
+            if not kept:
+                shutil.rmtree(path / "locdatas", ignore_errors=True)
+
+        self._placeholders = {}
+        for locdata_, placeholder in placeholders:
+            if locdata_ is not None:
+                self.register(locdata=locdata_, placeholder=placeholder)
+
+
+def iterate_save_project(
+    path: str | os.PathLike[str],
+    project: dict[str, dict[str, Any]],
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save a napari-locan project and yield the progress.
+
+    An existing project in path is replaced once all files are written.
+    Use :class:`ProjectWriter` to save a project repeatedly and write only
+    changed datasets.
+
+    Parameters
+    ----------
+    path
+        Project directory.
+    project
+        Mapping with keys "filter_specifications", "region_specifications",
+        "roi_specifications" and "smlm_data".
+        Each value is a mapping with keys "datasets", "names" and "index".
+    n_jobs
+        Number of threads to write files (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of written files and number of all files.
+    """
+    yield from ProjectWriter(path=path, n_jobs=n_jobs).iterate_save(project=project)
+
+
+def save_project(
+    path: str | os.PathLike[str],
+    project: dict[str, dict[str, Any]],
+    n_jobs: int = -1,
+) -> None:
+    """
+    Save a napari-locan project.
+
+    Parameters
+    ----------
+    path
+        Project directory.
+    project
+        Mapping with keys "filter_specifications", "region_specifications",
+        "roi_specifications" and "smlm_data".
+        Each value is a mapping with keys "datasets", "names" and "index".
+    n_jobs
+        Number of threads to write files (-1 for all processors).
+    """
+    for _ in iterate_save_project(path=path, project=project, n_jobs=n_jobs):
+        pass
+
+
+def _read_meta(path: Path) -> lc.data.metadata_pb2.Metadata:
+    meta = lc.data.metadata_pb2.Metadata()
+    meta.ParseFromString(path.read_bytes())
+    return meta
+
+
+def _read_arrays(
+    files: list[Path], n_jobs: int = -1
+) -> Generator[tuple[int, int], None, dict[Path, npt.NDArray[Any]]]:
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    arrays: dict[Path, npt.NDArray[Any]] = {}
+    if not files:
+        return arrays
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {
+            executor.submit(_load_column, file_path): file_path for file_path in files
+        }
+        for n_files, future in enumerate(as_completed(futures), start=1):
+            arrays[futures[future]] = future.result()
+            yield n_files, len(files)
+    return arrays
+
+
+def _collect_files(item: dict[str, Any], directory: Path, files: list[Path]) -> None:
+    if item["references"] is not None:
+        for index, reference in enumerate(item["references"]):
+            _collect_files(
+                item=reference,
+                directory=directory / "references" / str(index),
+                files=files,
+            )
+    files.extend(directory / f"{index}.npz" for index in range(len(item["columns"])))
+
+
+def _assemble_locdata(
+    item: dict[str, Any],
+    directory: Path,
+    arrays: dict[Path, npt.NDArray[Any]],
+) -> lc.LocData:
+    if item["references"] is not None:
+        references = [
+            _assemble_locdata(
+                item=reference,
+                directory=directory / "references" / str(index),
+                arrays=arrays,
+            )
+            for index, reference in enumerate(item["references"])
+        ]
+        locdata = lc.LocData.from_collection(locdatas=references)
+    else:
+        dataframe = pd.DataFrame(
+            {
+                column_: arrays[directory / f"{index}.npz"]
+                for index, column_ in enumerate(item["columns"])
+            },
+            copy=False,
+        )
+        locdata = lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+    locdata.meta = _read_meta(directory / "meta.pb")
+    if item.get("region") is not None:
+        locdata.region = region_from_repr(item["region"])
+    return locdata
+
+
+class LocDataPlaceholder:
+    """
+    Placeholder for a localization dataset in a project directory that is
+    loaded on demand.
+
+    Parameters
+    ----------
+    directory
+        Directory of the localization dataset within the project.
+    item
+        Project item of the localization dataset with keys "columns",
+        "references" and "region".
+    n_jobs
+        Number of threads to read files (-1 for all processors).
+
+    Attributes
+    ----------
+    directory
+        Directory of the localization dataset within the project.
+    item
+        Project item of the localization dataset.
+    n_jobs
+        Number of threads to read files.
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike[str], item: dict[str, Any], n_jobs: int = -1
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.item: dict[str, Any] = item
+        self.n_jobs: int = n_jobs
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(directory={self.directory})"
+
+    @property
+    def meta(self) -> lc.data.metadata_pb2.Metadata:
+        """Metadata of the localization dataset."""
+        return _read_meta(self.directory / "meta.pb")
+
+    def load(self) -> lc.LocData:
+        """
+        Load the localization dataset.
+
+        Returns
+        -------
+        lc.LocData
+        """
+        files: list[Path] = []
+        _collect_files(item=self.item, directory=self.directory, files=files)
+        iterator = _read_arrays(files=files, n_jobs=self.n_jobs)
+        while True:
+            try:
+                next(iterator)
+            except StopIteration as exception:
+                arrays: dict[Path, npt.NDArray[Any]] = exception.value
+                break
+        return _assemble_locdata(
+            item=self.item, directory=self.directory, arrays=arrays
+        )
+
+
+def iterate_load_project(
+    path: str | os.PathLike[str], n_jobs: int = -1, lazy: bool = False
+) -> Generator[tuple[int, int], None, dict[str, dict[str, Any]]]:
+    """
+    Load a napari-locan project and yield the progress.
+
+    Parameters
+    ----------
+    path
+        Project directory or the project file within.
+    n_jobs
+        Number of threads to read files (-1 for all processors).
+    lazy
+        If True, localization datasets are represented by
+        :class:`LocDataPlaceholder` objects and rois that refer to them keep
+        the placeholder as reference.
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of read files and number of all files.
+
+    Returns
+    -------
+    dict[str, dict[str, Any]]
+        Mapping with keys "filter_specifications", "region_specifications",
+        "roi_specifications" and "smlm_data".
+        Each value is a mapping with keys "datasets", "names" and "index".
+        The value for "smlm_data" has an additional key "placeholders"
+        with a :class:`LocDataPlaceholder` for each dataset.
+    """
+    path = Path(path)
+    if path.name == PROJECT_FILE_NAME:
+        path = path.parent
+    with open(path / PROJECT_FILE_NAME) as file:
+        metadata = json.load(file)
+    if metadata.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Project format version {metadata.get('format_version')} is not supported."
+        )
+
+    smlm_data = metadata["smlm_data"]
+    directories = [
+        path / item.get("directory", f"locdatas/{index}")
+        for index, item in enumerate(smlm_data["datasets"])
+    ]
+    placeholders = [
+        LocDataPlaceholder(directory=directory, item=item, n_jobs=n_jobs)
+        for item, directory in zip(smlm_data["datasets"], directories)
+    ]
+    locdatas: list[lc.LocData] | list[LocDataPlaceholder]
+    if lazy:
+        locdatas = list(placeholders)
+    else:
+        files: list[Path] = []
+        for item, directory in zip(smlm_data["datasets"], directories):
+            _collect_files(item=item, directory=directory, files=files)
+        arrays = yield from _read_arrays(files=files, n_jobs=n_jobs)
+        locdatas = [
+            _assemble_locdata(item=item, directory=directory, arrays=arrays)
+            for item, directory in zip(smlm_data["datasets"], directories)
+        ]
+
+    filter_specifications = metadata["filter_specifications"]
+    region_specifications = metadata["region_specifications"]
+    roi_specifications = metadata["roi_specifications"]
+    return {
+        "filter_specifications": {
+            "datasets": [
+                {key: lc.Selector(**value) for key, value in dataset.items()}
+                for dataset in filter_specifications["datasets"]
+            ],
+            "names": filter_specifications["names"],
+            "index": filter_specifications["index"],
+        },
+        "region_specifications": {
+            "datasets": [
+                region_from_repr(text) for text in region_specifications["datasets"]
+            ],
+            "names": region_specifications["names"],
+            "index": region_specifications["index"],
+        },
+        "roi_specifications": {
+            "datasets": [
+                _roi_from_dict(item=item, locdatas=locdatas)
+                for item in roi_specifications["datasets"]
+            ],
+            "names": roi_specifications["names"],
+            "index": roi_specifications["index"],
+        },
+        "smlm_data": {
+            "datasets": locdatas,
+            "names": smlm_data["names"],
+            "index": smlm_data["index"],
+            "placeholders": placeholders,
+        },
+    }
+
+
+def load_project(
+    path: str | os.PathLike[str], n_jobs: int = -1, lazy: bool = False
+) -> dict[str, dict[str, Any]]:
+    """
+    Load a napari-locan project.
+
+    Parameters
+    ----------
+    path
+        Project directory or the project file within.
+    n_jobs
+        Number of threads to read files (-1 for all processors).
+    lazy
+        If True, localization datasets are represented by
+        :class:`LocDataPlaceholder` objects.
+
+    Returns
+    -------
+    dict[str, dict[str, Any]]
+        Mapping with keys "filter_specifications", "region_specifications",
+        "roi_specifications" and "smlm_data".
+        Each value is a mapping with keys "datasets", "names" and "index".
+    """
+    iterator = iterate_load_project(path=path, n_jobs=n_jobs, lazy=lazy)
+    while True:
+        try:
+            next(iterator)
+        except StopIteration as exception:
+            project: dict[str, dict[str, Any]] = exception.value
+            return project
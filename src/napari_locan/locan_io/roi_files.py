@@ -0,0 +1,174 @@
+"""
+Load and save many roi files with progress report.
+
+Each region of interest is kept in a separate yaml file by
+:meth:`locan.Roi.to_yaml` and read by :meth:`locan.Roi.from_yaml`.
+This module loads or saves the roi files of a complete roi set, e.g. all
+roi files in a directory, in parallel threads and yields the progress so
+that widgets can load and save in a background thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from collections import Counter
+from collections.abc import Generator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import locan as lc
+
+from napari_locan.locan_io.project import LocDataPlaceholder
+
+logger = logging.getLogger(__name__)
+
+
+ROI_FILE_SUFFIX: str = ".yaml"
+
+
+def roi_file_paths(directory: str | os.PathLike[str]) -> list[Path]:
+    """
+    Roi files in directory.
+
+    Parameters
+    ----------
+    directory
+        Directory with roi files.
+
+    Returns
+    -------
+    list[Path]
+        Sorted file paths of all files with ROI_FILE_SUFFIX.
+    """
+    return sorted(
+        path_
+        for path_ in Path(directory).glob(f"*{ROI_FILE_SUFFIX}")
+        if path_.is_file()
+    )
+
+
+def roi_file_names(names: Sequence[str]) -> list[str]:
+    """
+    Unique file names for roi files from roi names.
+
+    Characters that are not letters, digits, "-", "_" or "." are replaced by
+    "_".
+    Names that are not unique (ignoring case) are suffixed with the lowest free
+    "_<number>".
+
+    Parameters
+    ----------
+    names
+        Names of the rois.
+
+    Returns
+    -------
+    list[str]
+        File names with ROI_FILE_SUFFIX.
+    """
+    stems = [re.sub(r"[^\w.-]", "_", name_) or "roi" for name_ in names]
+    # names are compared case-insensitive as on some file systems
+    counts = Counter(stem_.lower() for stem_ in stems)
+    # unique names are kept and the others are suffixed
+    used = {key for key, count in counts.items() if count == 1}
+    file_names = []
+    for stem_ in stems:
+        if counts[stem_.lower()] > 1:
+            number = 0
+            while f"{stem_}_{number}".lower() in used:
+                number += 1
+            stem_ = f"{stem_}_{number}"
+        used.add(stem_.lower())
+        file_names.append(f"{stem_}{ROI_FILE_SUFFIX}")
+    return file_names
+
+
+def iterate_load_rois(
+    paths: Sequence[str | os.PathLike[str]],
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, list[lc.Roi]]:
+    """
+    Load roi files in parallel threads and yield the progress.
+
+    Parameters
+    ----------
+    paths
+        File paths for roi files.
+    n_jobs
+        Number of threads (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of loaded files and number of all files.
+
+    Returns
+    -------
+    list[lc.Roi]
+        The rois in the order of paths.
+    """
+    if not paths:
+        return []
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    rois: list[lc.Roi | None] = [None] * len(paths)
+    with ThreadPoolExecutor(max_workers=min(n_jobs, len(paths))) as executor:
+        futures = {
+            executor.submit(lc.Roi.from_yaml, path=path_): index
+            for index, path_ in enumerate(paths)
+        }
+        for n_files, future in enumerate(as_completed(futures), start=1):
+            rois[futures[future]] = future.result()
+            yield n_files, len(futures)
+    return rois  # type: ignore[return-value]
+
+
+def iterate_save_rois(
+    rois: Sequence[lc.Roi],
+    paths: Sequence[str | os.PathLike[str]],
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save rois as roi files in parallel threads and yield the progress.
+
+    References to placeholders for SMLM datasets are saved as reference to
+    the localization file of the placeholder.
+
+    Parameters
+    ----------
+    rois
+        The rois to be saved.
+    paths
+        Corresponding file paths.
+    n_jobs
+        Number of threads (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of written files and number of all files.
+    """
+    if len(rois) != len(paths):
+        raise ValueError("rois and paths must correspond and be of same length.")
+    if not rois:
+        return
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    def save(roi: lc.Roi, path: str | os.PathLike[str]) -> None:
+        if isinstance(roi.reference, LocDataPlaceholder):
+            roi = lc.Roi(
+                reference=roi.reference.meta,
+                region=roi.region,
+                loc_properties=roi.loc_properties,
+            )
+        roi.to_yaml(path=path)
+
+    with ThreadPoolExecutor(max_workers=min(n_jobs, len(rois))) as executor:
+        futures = [executor.submit(save, roi, path) for roi, path in zip(rois, paths)]
+        for n_files, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            yield n_files, len(futures)
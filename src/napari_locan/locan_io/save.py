@@ -0,0 +1,314 @@
+"""
+Save localization data with progress report.
+
+Saving a large SMLM dataset through the locan save functions is a single
+blocking call.
+This module provides save functions that yield their progress so that
+widgets can save in a background thread.
+
+Text-based files (thunderSTORM and SMAP csv files) are written in blocks of
+rows: the blocks are formatted in parallel threads and written sequentially.
+Numeric blocks are formatted by a single string operation with a row
+template for all columns, which gives the same output as
+:meth:`pandas.DataFrame.to_csv` but is several times faster.
+Column names are mapped once and the localization data is not copied.
+ASDF files can be saved with zlib-compressed arrays.
+Several datasets are saved concurrently.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+from collections import deque
+from collections.abc import Callable, Generator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from asdf import AsdfFile
+from google.protobuf import json_format
+
+logger = logging.getLogger(__name__)
+
+
+# file types that can be saved and the corresponding file suffix
+FILE_SUFFIXES: dict[str, str] = {
+    lc.FileType.ASDF.name: ".asdf",
+    lc.FileType.SMAP.name: ".csv",
+    lc.FileType.SMLM.name: ".zip",
+    lc.FileType.THUNDERSTORM.name: ".csv",
+}
+
+# csv file types and the mapping of their column names to locan properties
+CSV_FILE_KEYS: dict[str, dict[str, str]] = {
+    lc.FileType.SMAP.name: lc.constants.SMAP_KEYS,
+    lc.FileType.THUNDERSTORM.name: lc.constants.THUNDERSTORM_KEYS,
+}
+
+
+def _check_file_path(path: str | os.PathLike[str], file_type: str) -> None:
+    if FILE_SUFFIXES.get(file_type) != Path(path).suffix:
+        raise TypeError(
+            "Selected file type cannot be saved. Check that file suffix is correct."
+        )
+
+
+def save_asdf(
+    locdata: lc.LocData,
+    path: str | os.PathLike[str],
+    compression: str | None = None,
+) -> None:
+    """
+    Save LocData attributes in an asdf file.
+
+    The file is identical to that of :func:`locan.save_asdf` except for the
+    optional compression of the binary arrays.
+
+    Parameters
+    ----------
+    locdata
+        The LocData object to be saved.
+    path
+        File path including file name to save to.
+    compression
+        Compression of the binary arrays (e.g. "zlib").
+        If None, the arrays are not compressed.
+    """
+    meta_json = json_format.MessageToJson(
+        locdata.meta, always_print_fields_with_no_presence=False
+    )
+    tree = {
+        "data": locdata.data.values,
+        "columns": list(locdata.data),
+        "properties": locdata.properties,
+        "meta": meta_json,
+    }
+    asdf_file = AsdfFile(tree)
+    if compression is None:
+        asdf_file.write_to(path)
+    else:
+        asdf_file.write_to(path, all_array_compression=compression)
+
+
+def _csv_columns(
+    locdata: lc.LocData, file_type: str
+) -> tuple[list[str], list[npt.NDArray[Any]]]:
+    """Column names of the csv file type and corresponding data arrays."""
+    keys = CSV_FILE_KEYS[file_type]
+    inverse_keys = {value: key for key, value in keys.items()}
+    names = []
+    arrays = []
+    for column_ in locdata.data.columns:
+        name = inverse_keys.get(column_, column_)
+        if file_type == lc.FileType.SMAP.name and name not in keys:
+            continue
+        names.append(name)
+        arrays.append(locdata.data[column_].to_numpy())
+    return names, arrays
+
+
+def _row_format(arrays: list[npt.NDArray[Any]]) -> str | None:
+    """Template for one row or None if not all columns are numeric."""
+    formats = []
+    for array in arrays:
+        if array.dtype.kind == "f":
+            formats.append("%.10g")
+        elif array.dtype.kind in "iu":
+            formats.append("%d")
+        else:
+            return None
+    return ",".join(formats) + os.linesep
+
+
+def format_csv_block(arrays: list[npt.NDArray[Any]]) -> bytes:
+    """
+    Format columns of localization data as csv rows.
+
+    Numeric columns without missing values are formatted at once with a
+    template for all rows.
+    Other columns are formatted by :meth:`pandas.DataFrame.to_csv`.
+
+    Parameters
+    ----------
+    arrays
+        Column arrays of equal length.
+
+    Returns
+    -------
+    bytes
+        The csv rows without header.
+    """
+    row_format = _row_format(arrays)
+    if row_format is None or any(
+        np.isnan(array).any() for array in arrays if array.dtype.kind == "f"
+    ):
+        text: str = pd.DataFrame(dict(enumerate(arrays)), copy=False).to_csv(
+            header=False, index=False, float_format="%.10g"
+        )
+    else:
+        n_rows = len(arrays[0]) if arrays else 0
+        values = itertools.chain.from_iterable(
+            zip(*[array.tolist() for array in arrays])
+        )
+        text = (row_format * n_rows) % tuple(values)
+    return text.encode()
+
+
+def iterate_save_csv(
+    locdata: lc.LocData,
+    path: str | os.PathLike[str],
+    file_type: str,
+    chunk_size: int = 200_000,
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save localization data in a thunderSTORM or SMAP csv file and yield the
+    progress.
+
+    Blocks of rows are formatted in parallel threads by
+    :func:`format_csv_block` and written in order.
+
+    Parameters
+    ----------
+    locdata
+        The LocData object to be saved.
+    path
+        File path including file name to save to.
+    file_type
+        Indicator for the file type; one of CSV_FILE_KEYS.
+    chunk_size
+        Number of rows in each block.
+    n_jobs
+        Number of threads to format rows (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of written rows and number of all rows.
+    """
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    names, arrays = _csv_columns(locdata=locdata, file_type=file_type)
+    n_rows = len(locdata.data)
+
+    with open(path, "wb") as file:
+        file.write((",".join(names) + os.linesep).encode())
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            # keep the number of formatted blocks in memory limited
+            pending: deque[tuple[int, Future[bytes]]] = deque()
+            for start in range(0, n_rows, chunk_size):
+                stop = min(start + chunk_size, n_rows)
+                block = [array[start:stop] for array in arrays]
+                pending.append((stop, executor.submit(format_csv_block, block)))
+                if len(pending) > 2 * n_jobs:
+                    n_written, future = pending.popleft()
+                    file.write(future.result())
+                    yield n_written, n_rows
+            while pending:
+                n_written, future = pending.popleft()
+                file.write(future.result())
+                yield n_written, n_rows
+
+
+def iterate_save_locdata(
+    locdata: lc.LocData,
+    path: str | os.PathLike[str],
+    file_type: str,
+    compress: bool = False,
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save localization data and yield the progress.
+
+    Parameters
+    ----------
+    locdata
+        The LocData object to be saved.
+    path
+        File path including file name to save to.
+    file_type
+        Indicator for the file type; one of FILE_SUFFIXES.
+    compress
+        Compress the arrays of ASDF files.
+    n_jobs
+        Number of threads to format csv files (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of written localizations and number of all localizations.
+    """
+    _check_file_path(path=path, file_type=file_type)
+    if file_type in CSV_FILE_KEYS:
+        yield from iterate_save_csv(
+            locdata=locdata, path=path, file_type=file_type, n_jobs=n_jobs
+        )
+        return
+
+    if file_type == lc.FileType.ASDF.name:
+        save_asdf(locdata=locdata, path=path, compression="zlib" if compress else None)
+    else:
+        lc.save_SMLM(locdata=locdata, path=path)
+    yield len(locdata), len(locdata)
+
+
+def iterate_save_locdatas(
+    locdatas: Sequence[lc.LocData | Callable[[], lc.LocData]],
+    paths: list[str | os.PathLike[str]],
+    file_type: str,
+    compress: bool = False,
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save several localization datasets concurrently and yield the progress.
+
+    Parameters
+    ----------
+    locdatas
+        The LocData objects to be saved or callables that return them, e.g.
+        to load a dataset only when it is saved.
+    paths
+        Corresponding file paths.
+    file_type
+        Indicator for the file type; one of FILE_SUFFIXES.
+    compress
+        Compress the arrays of ASDF files.
+    n_jobs
+        Number of threads to save files (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of written files and number of all files.
+    """
+    if len(locdatas) != len(paths):
+        raise ValueError("locdatas and paths must correspond and be of same length.")
+    for path in paths:
+        _check_file_path(path=path, file_type=file_type)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    def save(
+        locdata: lc.LocData | Callable[[], lc.LocData], path: str | os.PathLike[str]
+    ) -> None:
+        if not isinstance(locdata, lc.LocData):
+            locdata = locdata()
+        for _ in iterate_save_locdata(
+            locdata=locdata, path=path, file_type=file_type, compress=compress, n_jobs=1
+        ):
+            pass
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [
+            executor.submit(save, locdata, path)
+            for locdata, path in zip(locdatas, paths)
+        ]
+        for n_files, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            yield n_files, len(futures)
@@ -0,0 +1,24 @@
+"""
+
+Processing routines for napari-locan.
+
+The routines complement locan methods with procedures that are optimized
+for large SMLM datasets as handled by the napari-locan widgets.
+
+Submodules:
+-----------
+
+.. autosummary::
+   :toctree: ./
+
+   cluster_labels
+   column_version
+   filter_selection
+   group_properties
+   neighbor_distances
+   property_statistics
+   region_selection
+   result_cache
+   selection_view
+   spatial_index
+"""
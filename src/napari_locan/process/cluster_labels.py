@@ -0,0 +1,411 @@
+"""
+Compact cluster results as label arrays.
+
+Clustering procedures in locan yield a LocData collection with one LocData
+object per cluster.
+For a large number of clusters the creation of these objects is slow and
+memory-consuming.
+
+This module provides a compact alternative:
+each localization carries an integer cluster label (with -1 for noise) and
+per-cluster properties are computed for all clusters at once by the
+group-by engine in :mod:`napari_locan.process.group_properties`.
+Per-cluster LocData objects are only materialized on demand.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Callable
+from typing import Any
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from locan.configuration import N_JOBS
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+
+from napari_locan.process.group_properties import (
+    GroupBy,
+    label_segments,
+    property_keys,
+)
+from napari_locan.process.result_cache import ResultCache, hash_key
+from napari_locan.process.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+LABEL_KEY: str = "cluster_label"
+
+
+def cluster_properties(
+    locdata: lc.LocData,
+    label_key: str = LABEL_KEY,
+    coordinate_keys: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Compute properties for all clusters from the cluster label column.
+
+    The properties follow the naming in locan collections
+    as computed by :class:`napari_locan.process.group_properties.GroupBy`.
+
+    Parameters
+    ----------
+    locdata
+        Localization data with a column holding cluster labels.
+    label_key
+        Column name for cluster labels.
+    coordinate_keys
+        Coordinates to compute centroid and extent.
+        If None, `locdata.coordinate_keys` are used.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per cluster indexed by cluster label.
+    """
+    if coordinate_keys is None:
+        coordinate_keys = list(locdata.coordinate_keys)
+    group_by = GroupBy(labels=locdata.data[label_key].to_numpy())
+    properties = group_by.properties(
+        dataframe=locdata.data,
+        coordinate_keys=coordinate_keys,  # type: ignore[arg-type]
+    )
+    properties.index.name = label_key
+    return properties
+
+
+def cluster_property_keys(
+    locdata: lc.LocData,
+    label_key: str = LABEL_KEY,
+    coordinate_keys: list[str] | None = None,
+) -> list[str]:
+    """
+    Column names of the cluster properties as returned by
+    :func:`cluster_properties` after resetting the index.
+
+    Parameters
+    ----------
+    locdata
+        Localization data with a column holding cluster labels.
+    label_key
+        Column name for cluster labels.
+    coordinate_keys
+        Coordinates to compute centroid and extent.
+        If None, `locdata.coordinate_keys` are used.
+
+    Returns
+    -------
+    list[str]
+    """
+    if coordinate_keys is None:
+        coordinate_keys = list(locdata.coordinate_keys)
+    return [label_key] + property_keys(
+        columns=locdata.data.columns, coordinate_keys=coordinate_keys
+    )
+
+
+def dbscan_labels(
+    spatial_index: SpatialIndex, eps: float = 20, min_samples: int = 5
+) -> npt.NDArray[np.int32]:
+    """
+    Compute dbscan cluster labels from neighbor pairs in a spatial index.
+
+    Core points have at least `min_samples` neighbors within `eps`
+    (including the point itself).
+    Connected core points form clusters and border points are assigned to
+    the adjacent cluster with the lowest label.
+    Labels are numbered in the order of the first core point in each cluster
+    so that they are identical to those of :class:`sklearn.cluster.DBSCAN`.
+
+    Parameters
+    ----------
+    spatial_index
+        Spatial index on the localization properties used for clustering.
+    eps
+        The maximum distance between two samples for them to be considered as
+        in the same neighborhood.
+    min_samples
+        The number of samples in a neighborhood for a point to be considered
+        as a core point.
+        This includes the point itself.
+
+    Returns
+    -------
+    npt.NDArray[np.int32]
+        Cluster label for each point with -1 for noise.
+    """
+    n_points = len(spatial_index)
+    labels = np.full(n_points, -1, dtype=np.int32)
+    pairs = spatial_index.query_pairs(radius=eps)
+    n_neighbors = np.bincount(pairs.ravel(), minlength=n_points) + 1
+    is_core = n_neighbors >= min_samples
+    core_indices = np.flatnonzero(is_core)
+    if len(core_indices) == 0:
+        return labels
+
+    core_pairs = pairs[is_core[pairs[:, 0]] & is_core[pairs[:, 1]]]
+    graph = coo_matrix(
+        (np.ones(len(core_pairs), dtype=np.int8), (core_pairs[:, 0], core_pairs[:, 1])),
+        shape=(n_points, n_points),
+    )
+    _, components = connected_components(graph, directed=False)
+    _, first_indices, inverse = np.unique(
+        components[core_indices], return_index=True, return_inverse=True
+    )
+    ranks = np.argsort(np.argsort(first_indices))
+    labels[core_indices] = ranks[inverse]
+
+    # border points
+    border_pairs = np.concatenate(
+        [
+            pairs[is_core[pairs[:, 0]] & ~is_core[pairs[:, 1]]],
+            pairs[~is_core[pairs[:, 0]] & is_core[pairs[:, 1]]][:, ::-1],
+        ]
+    )
+    border_labels = np.full(n_points, np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(border_labels, border_pairs[:, 1], labels[border_pairs[:, 0]])
+    is_border = border_labels != np.iinfo(np.int32).max
+    labels[is_border] = border_labels[is_border]
+    return labels
+
+
+def compute_dbscan_labels(
+    locdata: lc.LocData,
+    eps: float = 20,
+    min_samples: int = 5,
+    loc_properties: list[str] | None = None,
+    spatial_index: SpatialIndex | Callable[[], SpatialIndex] | None = None,
+    result_cache: ResultCache | None = None,
+    **kwargs: Any,
+) -> npt.NDArray[np.int32]:
+    """
+    Compute dbscan cluster labels for the localizations in locdata.
+
+    Parameters
+    ----------
+    locdata
+        Localization data on which to perform the clustering.
+    eps
+        The maximum distance between two samples for them to be considered as
+        in the same neighborhood.
+    min_samples
+        The number of samples in a neighborhood for a point to be considered
+        as a core point.
+        This includes the point itself.
+    loc_properties
+        The LocData properties to be used for clustering. If None,
+        `locdata.coordinates` will be used.
+    spatial_index
+        A spatial index on the localization properties used for clustering.
+        If given, labels are computed by :func:`dbscan_labels` from the
+        index instead of building a new tree.
+        A callable is called to provide the index only when it is used,
+        e.g. in a thread worker.
+    result_cache
+        If given, labels are loaded from the cache for the same input
+        coordinates and parameters or stored in the cache after computation.
+    kwargs
+        Other parameters passed to `sklearn.cluster.DBSCAN`
+        if no spatial_index is given.
+
+    Returns
+    -------
+    npt.NDArray[np.int32]
+        Cluster label for each localization (noise is labelled -1).
+    """
+    if len(locdata) == 0:
+        return np.array([], dtype=np.int32)
+
+    if isinstance(spatial_index, SpatialIndex):
+        if len(spatial_index) != len(locdata):
+            raise ValueError("The spatial index does not correspond to locdata.")
+        points = spatial_index.points
+    elif loc_properties is None:
+        points = locdata.coordinates
+    else:
+        points = locdata.data[loc_properties].to_numpy()
+
+    labels: npt.NDArray[np.int32] | None = None
+    if result_cache is not None:
+        key = hash_key(
+            arrays=[np.asarray(points, dtype=np.float64)],
+            parameter=dict(method="dbscan", eps=eps, min_samples=min_samples, **kwargs),
+        )
+        labels = result_cache.get(key)
+        if labels is not None and len(labels) != len(locdata):
+            labels = None
+
+    if labels is None:
+        # a spatial index is only provided if labels are not in the cache
+        if callable(spatial_index):
+            spatial_index = spatial_index()
+            if len(spatial_index) != len(locdata):
+                raise ValueError("The spatial index does not correspond to locdata.")
+        if spatial_index is not None:
+            labels = dbscan_labels(
+                spatial_index=spatial_index, eps=eps, min_samples=min_samples
+            )
+        else:
+            labels = (
+                DBSCAN(eps=eps, min_samples=min_samples, n_jobs=N_JOBS, **kwargs)
+                .fit_predict(points)
+                .astype(np.int32)
+            )
+        if result_cache is not None:
+            result_cache.set(key, labels)
+    return labels
+
+
+def cluster_dbscan_labels(
+    locdata: lc.LocData,
+    eps: float = 20,
+    min_samples: int = 5,
+    loc_properties: list[str] | None = None,
+    label_key: str = LABEL_KEY,
+    spatial_index: SpatialIndex | Callable[[], SpatialIndex] | None = None,
+    result_cache: ResultCache | None = None,
+    **kwargs: Any,
+) -> tuple[lc.LocData, lc.LocData]:
+    """
+    Cluster localizations in locdata using the dbscan clustering algorithm
+    and keep the result as cluster labels.
+
+    Parameters
+    ----------
+    locdata
+        Localization data on which to perform the clustering.
+    eps
+        The maximum distance between two samples for them to be considered as
+        in the same neighborhood.
+    min_samples
+        The number of samples in a neighborhood for a point to be considered
+        as a core point.
+        This includes the point itself.
+    loc_properties
+        The LocData properties to be used for clustering. If None,
+        `locdata.coordinates` will be used.
+    label_key
+        Column name for cluster labels.
+    spatial_index
+        A spatial index on the localization properties used for clustering
+        (see :func:`compute_dbscan_labels`).
+    result_cache
+        If given, labels are loaded from the cache for the same input
+        coordinates and parameters or stored in the cache after computation.
+    kwargs
+        Other parameters passed to `sklearn.cluster.DBSCAN`
+        if no spatial_index is given.
+
+    Returns
+    -------
+    tuple[lc.LocData, lc.LocData]
+        A tuple with labels and cluster properties.
+        The first LocData object carries all localizations with an additional
+        int32 column `label_key` (noise is labelled -1).
+        The second LocData object carries one row with properties
+        for each cluster.
+    """
+    parameter = locals()
+
+    if len(locdata) == 0:
+        return lc.LocData(), lc.LocData()
+
+    labels = compute_dbscan_labels(
+        locdata=locdata,
+        eps=eps,
+        min_samples=min_samples,
+        loc_properties=loc_properties,
+        spatial_index=spatial_index,
+        result_cache=result_cache,
+        **kwargs,
+    )
+
+    # the label column is added without copying the localization data
+    data = locdata.data
+    dataframe = pd.DataFrame(
+        {
+            **{column_: data[column_] for column_ in data.columns},
+            label_key: pd.Series(labels, index=data.index, copy=False),
+        },
+        copy=False,
+    )
+    locdata_labels = lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+    locdata_labels.region = locdata.region
+
+    properties = cluster_properties(
+        locdata=locdata_labels, label_key=label_key, coordinate_keys=loc_properties
+    ).reset_index()
+    locdata_clusters = lc.LocData.from_dataframe(dataframe=properties)  # type: ignore[arg-type]
+
+    for locdata_ in [locdata_labels, locdata_clusters]:
+        del locdata_.meta.history[:]
+        locdata_.meta.history.add(
+            name=sys._getframe().f_code.co_name, parameter=str(parameter)
+        )
+
+    return locdata_labels, locdata_clusters
+
+
+def materialize_clusters(
+    locdata: lc.LocData,
+    label_key: str = LABEL_KEY,
+    labels: npt.ArrayLike | None = None,
+) -> tuple[lc.LocData, lc.LocData]:
+    """
+    Create noise and a LocData collection with one LocData per cluster
+    from the cluster labels.
+
+    Parameters
+    ----------
+    locdata
+        Localization data with a column holding cluster labels.
+        All selections refer to locdata.
+    label_key
+        Column name for cluster labels.
+    labels
+        Cluster label for each localization in locdata.
+        If given, labels are taken instead of the `label_key` column.
+
+    Returns
+    -------
+    tuple[lc.LocData, lc.LocData]
+        A tuple with noise and cluster as returned by
+        :func:`locan.cluster_dbscan`.
+    """
+    if labels is not None:
+        labels = np.asarray(labels)
+        if len(labels) != len(locdata):
+            raise ValueError("The labels do not correspond to locdata.")
+    elif label_key not in locdata.data.columns:
+        raise KeyError(f"The locdata does not carry cluster labels: {label_key}")
+    else:
+        labels = locdata.data[label_key].to_numpy()
+    segments = label_segments(labels)
+    index = locdata.data.index
+
+    selections = [
+        lc.LocData.from_selection(locdata=locdata, indices=index[indices_])
+        for indices_ in np.split(segments.order, segments.starts[1:])
+        if len(indices_)
+    ]
+    collection = lc.LocData.from_collection(selections)
+
+    noise_indices = np.flatnonzero(labels < 0)
+    if len(noise_indices):
+        locdata_noise = lc.LocData.from_selection(
+            locdata=locdata, indices=index[noise_indices]
+        )
+    else:
+        locdata_noise = lc.LocData()
+
+    if locdata_noise:
+        locdata_noise.region = locdata.region
+    if collection:
+        collection.region = locdata.region
+    return locdata_noise, collection
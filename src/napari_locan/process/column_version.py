@@ -0,0 +1,105 @@
+"""
+Detect modifications of localization data.
+
+Results that are computed from a column of localization data, like summary
+statistics or a sorted index, are cached as long as the column is unchanged.
+
+With copy-on-write, as enabled in pandas from version 3.0 on, a column
+cannot be modified in place while a reference to the pandas.Series is kept.
+Unchanged data is then detected by comparing the memory location of the
+column data.
+Otherwise, or for plain arrays, a column may be modified in place and
+unchanged data is detected by comparing a hash of the column content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# pandas always copies on write from version 3.0 on
+COPY_ON_WRITE: bool = int(pd.__version__.split(".")[0]) >= 3
+
+
+def content_hash(values: npt.ArrayLike) -> bytes:
+    """
+    Hash of the content of an array.
+
+    Parameters
+    ----------
+    values
+        The array.
+
+    Returns
+    -------
+    bytes
+    """
+    array = np.asarray(values)
+    if array.dtype.hasobject:
+        array = pd.util.hash_array(array.ravel())
+    array = np.ascontiguousarray(array)
+    hash_ = hashlib.blake2b(digest_size=16)
+    hash_.update(f"{array.shape}{array.dtype.str}".encode())
+    hash_.update(array.reshape(-1).view(np.uint8).data)
+    return hash_.digest()
+
+
+class ColumnVersion:
+    """
+    Version of a column of localization data to detect later modifications.
+
+    Parameters
+    ----------
+    values
+        The values of the column.
+    copy_on_write
+        True if a pandas.Series cannot be modified in place while a reference
+        is kept.
+    """
+
+    def __init__(
+        self,
+        values: pd.Series | npt.ArrayLike,  # type: ignore[type-arg]
+        copy_on_write: bool = COPY_ON_WRITE,
+    ) -> None:
+        array = np.asarray(values)
+        self._shape: tuple[int, ...] = array.shape
+        self._values: pd.Series | None = None  # type: ignore[type-arg]
+        self._hash: bytes | None = None
+        if copy_on_write and isinstance(values, pd.Series):
+            # the reference makes pandas copy on write and keeps the memory
+            # location from being reused
+            self._values = values
+        else:
+            self._hash = content_hash(array)
+
+    def matches(self, values: pd.Series | npt.ArrayLike) -> bool:  # type: ignore[type-arg]
+        """
+        True if values are unchanged.
+
+        Parameters
+        ----------
+        values
+            The current values of the column.
+
+        Returns
+        -------
+        bool
+        """
+        array = np.asarray(values)
+        if array.shape != self._shape:
+            return False
+        if self._values is None:
+            return content_hash(array) == self._hash
+        array_ = self._values.to_numpy()
+        return bool(
+            array.__array_interface__["data"] == array_.__array_interface__["data"]
+            or np.array_equal(array, array_, equal_nan=array.dtype.kind in "fc")
+        )
@@ -0,0 +1,543 @@
+"""
+Select localizations by filter specifications.
+
+Filter specifications are given as :class:`locan.Selector` objects each
+defining an interval for a single localization property.
+Selecting by :func:`locan.select_by_condition` turns the selectors into a
+condition string that is parsed and evaluated by :meth:`pandas.DataFrame.query`.
+
+This module compiles the selectors directly into boolean range masks that
+are combined for all selectors.
+The masks are computed for blocks of rows in parallel threads so that each
+block stays in cache while all selectors are evaluated.
+If numexpr is installed, the combined expression can be evaluated by
+numexpr instead.
+Several datasets are selected concurrently by
+:func:`iterate_select_by_selectors`.
+
+For interactive changes of the filter specifications :class:`FilterPreview`
+keeps a sorted index for each localization property.
+Then the number of selected localizations for a changed interval is found by
+binary search and the combined mask is only updated for localizations that
+enter or leave the changed interval.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from collections.abc import Callable, Generator, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from napari_locan.process.column_version import ColumnVersion
+from napari_locan.process.selection_view import SelectionView
+
+try:
+    import numexpr
+
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+logger = logging.getLogger(__name__)
+
+
+def _active_bounds(
+    locdata: lc.LocData, selectors: Iterable[lc.Selector]
+) -> list[tuple[npt.NDArray[Any], float, float]]:
+    """Column arrays and bounds for all active selectors."""
+    bounds = []
+    for selector in selectors:
+        if not selector.activate:
+            continue
+        if selector.loc_property not in locdata.data.columns:
+            raise KeyError(
+                f"Localization property {selector.loc_property} is not available."
+            )
+        bounds.append(
+            (
+                locdata.data[selector.loc_property].to_numpy(),
+                selector.lower_bound,
+                selector.upper_bound,
+            )
+        )
+    return bounds
+
+
+def _fill_mask(
+    mask: npt.NDArray[np.bool_],
+    bounds: list[tuple[npt.NDArray[Any], float, float]],
+    start: int,
+    stop: int,
+) -> None:
+    mask_ = mask[start:stop]
+    buffer = np.empty(stop - start, dtype=np.bool_)
+    for array, lower_bound, upper_bound in bounds:
+        np.greater(array[start:stop], lower_bound, out=buffer)
+        mask_ &= buffer
+        np.less(array[start:stop], upper_bound, out=buffer)
+        mask_ &= buffer
+
+
+def selection_mask(
+    locdata: lc.LocData,
+    selectors: Iterable[lc.Selector],
+    n_jobs: int = -1,
+    chunk_size: int = 1_000_000,
+    use_numexpr: bool | None = None,
+) -> npt.NDArray[np.bool_]:
+    """
+    Boolean mask for localizations within the intervals of all active
+    selectors.
+
+    As for :attr:`locan.Selector.condition` the interval bounds are excluded.
+
+    Parameters
+    ----------
+    locdata
+        Localization data from which to select.
+    selectors
+        Filter specifications for localization properties.
+    n_jobs
+        Number of threads to compute the mask (-1 for all processors).
+    chunk_size
+        Number of rows in each block that is processed by one thread.
+    use_numexpr
+        Evaluate the combined expression by numexpr.
+        If None, numexpr is used if installed and locdata has more than
+        chunk_size localizations.
+
+    Returns
+    -------
+    npt.NDArray[np.bool_]
+        Mask with shape (n_localizations,).
+    """
+    bounds = _active_bounds(locdata=locdata, selectors=selectors)
+    n_localizations = len(locdata.data)
+
+    if use_numexpr is None:
+        use_numexpr = HAS_NUMEXPR and n_localizations > chunk_size
+    if use_numexpr and bounds:
+        if not HAS_NUMEXPR:
+            raise ImportError("numexpr is required to use_numexpr.")
+        local_dict: dict[str, Any] = {}
+        expressions = []
+        for index, (array, lower_bound, upper_bound) in enumerate(bounds):
+            local_dict[f"x{index}"] = array
+            local_dict[f"l{index}"] = lower_bound
+            local_dict[f"u{index}"] = upper_bound
+            expressions.append(f"(x{index} > l{index}) & (x{index} < u{index})")
+        mask: npt.NDArray[np.bool_] = numexpr.evaluate(
+            " & ".join(expressions), local_dict=local_dict
+        )
+        return mask
+
+    mask = np.ones(n_localizations, dtype=np.bool_)
+    if not bounds:
+        return mask
+    starts = range(0, n_localizations, chunk_size)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    if len(starts) == 1 or n_jobs == 1:
+        for start in starts:
+            _fill_mask(mask, bounds, start, min(start + chunk_size, n_localizations))
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _fill_mask,
+                    mask,
+                    bounds,
+                    start,
+                    min(start + chunk_size, n_localizations),
+                )
+                for start in starts
+            ]
+            for future in futures:
+                future.result()
+    return mask
+
+
+def select_by_selectors(
+    locdata: lc.LocData,
+    selectors: Iterable[lc.Selector],
+    n_jobs: int = -1,
+    use_numexpr: bool | None = None,
+) -> SelectionView:
+    """
+    Select localizations within the intervals of all active selectors and
+    return a selection view as in :func:`locan.select_by_condition`.
+
+    The selection keeps only a mask into the rows of locdata
+    (see :class:`napari_locan.process.selection_view.SelectionView`).
+
+    Parameters
+    ----------
+    locdata
+        Localization data from which to select.
+    selectors
+        Filter specifications for localization properties.
+    n_jobs
+        Number of threads to compute the mask (-1 for all processors).
+    use_numexpr
+        Evaluate the combined expression by numexpr.
+        If None, numexpr is used if installed and locdata is large.
+
+    Returns
+    -------
+    SelectionView
+        A new instance of LocData referring to the selected localizations.
+    """
+    selectors = list(selectors)
+    parameter = {
+        "locdata": locdata,
+        "condition": lc.filter_condition(selectors=selectors),
+    }
+
+    mask = selection_mask(
+        locdata=locdata, selectors=selectors, n_jobs=n_jobs, use_numexpr=use_numexpr
+    )
+    new_locdata = SelectionView.from_mask(locdata=locdata, mask=mask)
+    new_locdata.meta.history.add(
+        name=sys._getframe().f_code.co_name, parameter=str(parameter)
+    )
+    return new_locdata
+
+
+def iterate_select_by_selectors(
+    locdatas: Sequence[lc.LocData | Callable[[], lc.LocData]],
+    selectors: Iterable[lc.Selector],
+    n_jobs: int = -1,
+) -> Generator[tuple[int, int], None, list[SelectionView]]:
+    """
+    Select localizations within the intervals of all active selectors for
+    several datasets concurrently and yield the progress.
+
+    Each dataset is processed by a single thread.
+    The selections are returned in the order of locdatas.
+
+    Parameters
+    ----------
+    locdatas
+        Localization data from which to select or callables that return
+        them, e.g. to load a dataset only when it is processed.
+    selectors
+        Filter specifications for localization properties.
+    n_jobs
+        Number of threads to process datasets (-1 for all processors).
+
+    Yields
+    ------
+    tuple[int, int]
+        Number of processed datasets and number of all datasets.
+
+    Returns
+    -------
+    list[SelectionView]
+        New instances of LocData referring to the selected localizations.
+    """
+    selectors = list(selectors)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    def select(locdata: lc.LocData | Callable[[], lc.LocData]) -> SelectionView:
+        if not isinstance(locdata, lc.LocData):
+            locdata = locdata()
+        # datasets are already processed in parallel threads
+        return select_by_selectors(
+            locdata=locdata, selectors=selectors, n_jobs=1, use_numexpr=False
+        )
+
+    new_locdatas: list[SelectionView] = []
+    if not locdatas:
+        return new_locdatas
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {
+            executor.submit(select, locdata): index
+            for index, locdata in enumerate(locdatas)
+        }
+        results: dict[int, SelectionView] = {}
+        for n_items, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            yield n_items, len(futures)
+    new_locdatas = [results[index] for index in range(len(locdatas))]
+    return new_locdatas
+
+
+class FilterPreview:
+    """
+    Preview of a selection by filter specifications for interactive changes
+    of the interval bounds.
+
+    A sorted index is computed for each localization property on first use.
+    The mask for each localization property is cached and only recomputed
+    if the interval for that property changes.
+    The combined mask for all selectors is kept together with the number of
+    selected localizations.
+    If only the interval of a single property changed since the last call,
+    the combined mask is updated for the localizations that enter or leave
+    that interval according to the sorted index.
+
+    A sorted index is rebuilt if the localization data of its property was
+    modified, as detected by :class:`napari_locan.process.column_version.ColumnVersion`.
+
+    Parameters
+    ----------
+    locdata
+        Localization data from which to select.
+
+    Attributes
+    ----------
+    locdata
+        Localization data from which to select.
+    """
+
+    def __init__(self, locdata: lc.LocData) -> None:
+        self.locdata: lc.LocData = locdata
+        self._sorted_indices: dict[
+            str, tuple[ColumnVersion, npt.NDArray[np.intp], npt.NDArray[Any]]
+        ] = {}
+        self._masks: dict[str, tuple[float, float, npt.NDArray[np.bool_]]] = {}
+        self._selection: (
+            tuple[dict[str, tuple[float, float]], npt.NDArray[np.bool_], int] | None
+        ) = None
+
+    def _column(self, loc_property: str) -> pd.Series:  # type: ignore[type-arg]
+        data = self.locdata.data
+        if loc_property not in data.columns:
+            raise KeyError(f"Localization property {loc_property} is not available.")
+        return data[loc_property]
+
+    def _sorted_index(
+        self, loc_property: str
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[Any]]:
+        column = self._column(loc_property)
+        values = column.to_numpy()
+        try:
+            version, order, sorted_values = self._sorted_indices[loc_property]
+        except KeyError:
+            pass
+        else:
+            if version.matches(values):
+                return order, sorted_values
+            # the localization data was modified
+            self._masks.pop(loc_property, None)
+            self._selection = None
+        order = np.argsort(values, kind="stable")
+        self._sorted_indices[loc_property] = (
+            ColumnVersion(values=column),
+            order,
+            values[order],
+        )
+        return order, values[order]
+
+    def _range(
+        self, loc_property: str, lower_bound: float, upper_bound: float
+    ) -> tuple[npt.NDArray[np.intp], int, int]:
+        """Sort order and positions of values within the open interval."""
+        order, sorted_values = self._sorted_index(loc_property)
+        start = int(np.searchsorted(sorted_values, lower_bound, side="right"))
+        stop = int(np.searchsorted(sorted_values, upper_bound, side="left"))
+        return order, start, max(start, stop)
+
+    def _within(
+        self,
+        indices: npt.NDArray[np.intp],
+        bounds: dict[str, tuple[float, float]],
+    ) -> npt.NDArray[np.bool_]:
+        """True for indices of localizations within all intervals."""
+        within = np.ones(len(indices), dtype=np.bool_)
+        for loc_property, (lower_bound, upper_bound) in bounds.items():
+            values = self._column(loc_property).to_numpy()[indices]
+            within &= (values > lower_bound) & (values < upper_bound)
+        return within
+
+    def property_mask(
+        self, loc_property: str, lower_bound: float, upper_bound: float
+    ) -> npt.NDArray[np.bool_]:
+        """
+        Boolean mask for localizations with `loc_property` within the open
+        interval.
+
+        Parameters
+        ----------
+        loc_property
+            Localization property
+        lower_bound
+            Lower bound of the interval
+        upper_bound
+            Upper bound of the interval
+
+        Returns
+        -------
+        npt.NDArray[np.bool_]
+        """
+        order, start, stop = self._range(loc_property, lower_bound, upper_bound)
+        try:
+            lower_bound_, upper_bound_, mask = self._masks[loc_property]
+            if lower_bound_ == lower_bound and upper_bound_ == upper_bound:
+                return mask
+        except KeyError:
+            pass
+        mask = np.zeros(len(order), dtype=np.bool_)
+        mask[order[start:stop]] = True
+        self._masks[loc_property] = (lower_bound, upper_bound, mask)
+        return mask
+
+    def _update_selection(
+        self,
+        mask: npt.NDArray[np.bool_],
+        loc_property: str,
+        previous_bounds: tuple[float, float],
+        bounds: dict[str, tuple[float, float]],
+    ) -> int:
+        """
+        Update mask in place for a changed interval of loc_property and
+        return the change in the number of selected localizations.
+        """
+        order, start_, stop_ = self._range(loc_property, *previous_bounds)
+        _, start, stop = self._range(loc_property, *bounds[loc_property])
+        leaving = np.concatenate(
+            [order[start_ : min(stop_, start)], order[max(start_, stop) : stop_]]
+        )
+        entering = np.concatenate(
+            [order[start : min(stop, start_)], order[max(start, stop_) : stop]]
+        )
+        n_leaving = int(np.count_nonzero(mask[leaving]))
+        mask[leaving] = False
+        other_bounds = {
+            key: value for key, value in bounds.items() if key != loc_property
+        }
+        entering = entering[self._within(entering, other_bounds)]
+        mask[entering] = True
+        return len(entering) - n_leaving
+
+    def _selected(
+        self, selectors: Iterable[lc.Selector]
+    ) -> tuple[npt.NDArray[np.bool_], int]:
+        """Combined mask and number of selected localizations."""
+        bounds = {
+            selector.loc_property: (selector.lower_bound, selector.upper_bound)
+            for selector in selectors
+            if selector.activate
+        }
+        # validate the sorted indices, which resets the selection if needed
+        for loc_property in bounds:
+            self._sorted_index(loc_property)
+
+        if self._selection is not None:
+            bounds_, mask, n_selected = self._selection
+            changed = [
+                key for key, value in bounds.items() if bounds_.get(key) != value
+            ]
+            if bounds_.keys() == bounds.keys() and len(changed) <= 1:
+                for loc_property in changed:
+                    n_selected += self._update_selection(
+                        mask=mask,
+                        loc_property=loc_property,
+                        previous_bounds=bounds_[loc_property],
+                        bounds=bounds,
+                    )
+                self._selection = (bounds, mask, n_selected)
+                return mask, n_selected
+
+        mask = np.ones(len(self.locdata.data), dtype=np.bool_)
+        for loc_property, (lower_bound, upper_bound) in bounds.items():
+            mask &= self.property_mask(loc_property, lower_bound, upper_bound)
+        n_selected = int(np.count_nonzero(mask))
+        self._selection = (bounds, mask, n_selected)
+        return mask, n_selected
+
+    def mask(self, selectors: Iterable[lc.Selector]) -> npt.NDArray[np.bool_]:
+        """
+        Boolean mask for localizations within the intervals of all active
+        selectors.
+
+        Parameters
+        ----------
+        selectors
+            Filter specifications for localization properties.
+
+        Returns
+        -------
+        npt.NDArray[np.bool_]
+        """
+        mask, _ = self._selected(selectors=selectors)
+        return mask.copy()
+
+    def count(self, selectors: Iterable[lc.Selector]) -> int:
+        """
+        Number of localizations within the intervals of all active selectors.
+
+        Parameters
+        ----------
+        selectors
+            Filter specifications for localization properties.
+
+        Returns
+        -------
+        int
+        """
+        active_selectors = [selector for selector in selectors if selector.activate]
+        if not active_selectors:
+            return len(self.locdata.data)
+        if len(active_selectors) == 1:
+            selector = active_selectors[0]
+            _, start, stop = self._range(
+                selector.loc_property, selector.lower_bound, selector.upper_bound
+            )
+            return stop - start
+        _, n_selected = self._selected(selectors=active_selectors)
+        return n_selected
+
+    def indices(
+        self, selectors: Iterable[lc.Selector], max_points: int | None = None
+    ) -> npt.NDArray[np.intp]:
+        """
+        Sorted indices of localizations within the intervals of all active
+        selectors.
+
+        The indices are taken from the sorted index of the active selector
+        with the smallest number of localizations within its interval.
+        Only these localizations are checked for the other selectors.
+
+        Parameters
+        ----------
+        selectors
+            Filter specifications for localization properties.
+        max_points
+            Maximum number of indices; every n-th index is taken for more
+            selected localizations.
+
+        Returns
+        -------
+        npt.NDArray[np.intp]
+        """
+        bounds = {
+            selector.loc_property: (selector.lower_bound, selector.upper_bound)
+            for selector in selectors
+            if selector.activate
+        }
+        if not bounds:
+            indices = np.arange(len(self.locdata.data))
+        else:
+            ranges = {
+                loc_property: self._range(loc_property, *bounds_)
+                for loc_property, bounds_ in bounds.items()
+            }
+            loc_property = min(ranges, key=lambda key: ranges[key][2] - ranges[key][1])
+            order, start, stop = ranges.pop(loc_property)
+            indices = order[start:stop]
+            del bounds[loc_property]
+            if bounds:
+                indices = indices[self._within(indices, bounds)]
+        if max_points is not None and len(indices) > max_points:
+            indices = indices[:: -(-len(indices) // max_points)]
+        return np.sort(indices)
@@ -0,0 +1,378 @@
+"""
+Compute properties for groups of localizations.
+
+Localization clusters or other groups are commonly represented as LocData
+collection with one LocData object per group.
+Properties for each group are then computed in python for one reference
+LocData object after the other.
+
+This module provides a group-by engine that computes the same properties for
+all groups at once from integer group labels.
+Localizations are sorted by label once and all reductions are carried out as
+segmented numpy reductions over the sorted localization data.
+
+The computed properties follow the naming and definitions of
+:class:`locan.LocData` properties:
+
+- `localization_count`: number of localizations
+- coordinates (e.g. `position_x`): (weighted) mean
+- `uncertainty_x`, `uncertainty_y`, `uncertainty_z`: (weighted) mean variance
+- `intensity`: sum
+- `local_background`: mean
+- `frame`: min
+- `region_measure_bb`, `localization_density_bb`, `subregion_measure_bb`:
+  bounding box measures
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class Segments(NamedTuple):
+    """
+    Localization indices grouped by label.
+
+    Attributes
+    ----------
+    labels
+        The unique non-negative labels in increasing order.
+    order
+        Positional indices of all labelled localizations sorted by label.
+    starts
+        Positions in `order` at which each label segment starts.
+    counts
+        Number of localizations for each label.
+    """
+
+    labels: npt.NDArray[np.int32]
+    order: npt.NDArray[np.intp]
+    starts: npt.NDArray[np.intp]
+    counts: npt.NDArray[np.intp]
+
+
+def label_segments(labels: npt.ArrayLike) -> Segments:
+    """
+    Sort localizations by label and determine the segment for each label.
+
+    Negative labels (noise) are excluded.
+
+    Parameters
+    ----------
+    labels
+        Integer label for each localization.
+
+    Returns
+    -------
+    Segments
+    """
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    first_labelled = np.searchsorted(sorted_labels, 0, side="left")
+    order = order[first_labelled:]
+    sorted_labels = sorted_labels[first_labelled:]
+    unique_labels, starts, counts = np.unique(
+        sorted_labels, return_index=True, return_counts=True
+    )
+    return Segments(
+        labels=unique_labels.astype(np.int32),
+        order=order,
+        starts=starts,
+        counts=counts,
+    )
+
+
+class GroupBy:
+    """
+    Group-by engine for localization data with integer group labels.
+
+    All reductions are computed for all groups at once.
+    Negative labels (noise) are excluded from all groups.
+
+    Parameters
+    ----------
+    labels
+        Integer label for each localization.
+
+    Attributes
+    ----------
+    segments
+        Localization indices grouped by label.
+    """
+
+    def __init__(self, labels: npt.ArrayLike) -> None:
+        self.segments: Segments = label_segments(labels)
+
+    @property
+    def labels(self) -> npt.NDArray[np.int32]:
+        return self.segments.labels
+
+    @property
+    def counts(self) -> npt.NDArray[np.intp]:
+        return self.segments.counts
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.segments.labels)
+
+    def _sorted(self, values: npt.ArrayLike) -> npt.NDArray[Any]:
+        return np.asarray(values)[self.segments.order]
+
+    def _broadcast(self, group_values: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """Repeat one value per group for each sorted localization."""
+        return np.repeat(group_values, self.segments.counts)
+
+    def sum(self, values: npt.ArrayLike) -> npt.NDArray[Any]:
+        if self.n_groups == 0:
+            return np.array([])
+        return np.add.reduceat(self._sorted(values), self.segments.starts)  # type: ignore[no-any-return]
+
+    def mean(self, values: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        return self.sum(values) / self.segments.counts  # type: ignore[no-any-return]
+
+    def min(self, values: npt.ArrayLike) -> npt.NDArray[Any]:
+        if self.n_groups == 0:
+            return np.array([])
+        return np.minimum.reduceat(self._sorted(values), self.segments.starts)  # type: ignore[no-any-return]
+
+    def max(self, values: npt.ArrayLike) -> npt.NDArray[Any]:
+        if self.n_groups == 0:
+            return np.array([])
+        return np.maximum.reduceat(self._sorted(values), self.segments.starts)  # type: ignore[no-any-return]
+
+    def weighted_mean_variance(
+        self, values: npt.ArrayLike, weights: npt.ArrayLike | None = None
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """
+        Compute the weighted mean and weighted mean variance for each group
+        as in :func:`locan.utils.statistics.weighted_mean_variance`.
+
+        Groups with a single localization have a variance of zero.
+        """
+        if self.n_groups == 0:
+            return np.array([]), np.array([])
+        values_ = self._sorted(values).astype(np.float64)
+        if weights is None:
+            weights_ = np.ones(values_.shape)
+        else:
+            weights_ = self._sorted(weights).astype(np.float64)
+        starts = self.segments.starts
+        counts = self.segments.counts
+
+        weights_sum = np.add.reduceat(weights_, starts)
+        weighted_mean = np.add.reduceat(weights_ * values_, starts) / weights_sum
+        weights_mean = weights_sum / counts
+
+        weighted_mean_ = self._broadcast(weighted_mean)
+        weights_mean_ = self._broadcast(weights_mean)
+        deviations = weights_ * values_ - weights_mean_ * weighted_mean_
+        weights_deviations = weights_ - weights_mean_
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = (
+                counts
+                / (counts - 1)
+                / weights_sum**2
+                * (
+                    np.add.reduceat(deviations**2, starts)
+                    - 2
+                    * weighted_mean
+                    * np.add.reduceat(weights_deviations * deviations, starts)
+                    + weighted_mean**2 * np.add.reduceat(weights_deviations**2, starts)
+                )
+            )
+        # negative values can result from floating point errors
+        variance = np.where((counts > 1) & (variance > 0), variance, 0)
+        return weighted_mean, variance
+
+    def bounding_boxes(
+        self, coordinates: npt.ArrayLike
+    ) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+        """
+        Compute minimum and maximum coordinates for each group.
+
+        Parameters
+        ----------
+        coordinates
+            Coordinates with shape (n_localizations, dimension).
+
+        Returns
+        -------
+        tuple[npt.NDArray[Any], npt.NDArray[Any]]
+            Minimum and maximum coordinates with shape (n_groups, dimension).
+        """
+        coordinates = np.asarray(coordinates)
+        if self.n_groups == 0:
+            return (
+                np.empty((0, coordinates.shape[1])),
+                np.empty((0, coordinates.shape[1])),
+            )
+        sorted_coordinates = coordinates[self.segments.order]
+        mins = np.minimum.reduceat(sorted_coordinates, self.segments.starts, axis=0)
+        maxs = np.maximum.reduceat(sorted_coordinates, self.segments.starts, axis=0)
+        return mins, maxs
+
+    def properties(
+        self, dataframe: pd.DataFrame, coordinate_keys: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Compute LocData properties for each group.
+
+        Parameters
+        ----------
+        dataframe
+            Localization data with one row per localization.
+        coordinate_keys
+            Coordinates to compute centroid, uncertainty and bounding box.
+            If None, all available position keys are used.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per group indexed by group label.
+        """
+        if coordinate_keys is None:
+            coordinate_keys = _position_keys(dataframe.columns)
+
+        properties: dict[str, npt.NDArray[Any]] = {}
+        properties["localization_count"] = self.segments.counts
+
+        for coordinate_key_, extension_ in zip(coordinate_keys, ["_x", "_y", "_z"]):
+            if "uncertainty" + extension_ in dataframe.columns:
+                uncertainty_key: str | None = "uncertainty" + extension_
+            elif "uncertainty" in dataframe.columns:
+                uncertainty_key = "uncertainty"
+            else:
+                uncertainty_key = None
+
+            if uncertainty_key is None:
+                weights = None
+            else:
+                with np.errstate(divide="ignore"):
+                    weights = np.power(1 / dataframe[uncertainty_key].to_numpy(), 2)
+            weighted_mean, variance = self.weighted_mean_variance(
+                values=dataframe[coordinate_key_].to_numpy(), weights=weights
+            )
+            properties[coordinate_key_] = weighted_mean
+            if uncertainty_key is not None:
+                # as in locan, a single localization keeps its uncertainty
+                single = self.segments.counts == 1
+                uncertainty = np.sqrt(variance)
+                uncertainty[single] = self.min(dataframe[uncertainty_key])[single]
+                properties["uncertainty" + extension_] = uncertainty
+            else:
+                properties["uncertainty" + extension_] = np.sqrt(variance)
+
+        if "intensity" in dataframe.columns:
+            properties["intensity"] = self.sum(dataframe["intensity"])
+        if "local_background" in dataframe.columns:
+            properties["local_background"] = self.mean(dataframe["local_background"])
+        if "frame" in dataframe.columns:
+            properties["frame"] = self.min(dataframe["frame"])
+
+        if coordinate_keys:
+            mins, maxs = self.bounding_boxes(dataframe[coordinate_keys].to_numpy())
+            extents = (maxs - mins).T
+            region_measure = np.prod(extents, axis=0)
+            properties["region_measure_bb"] = region_measure
+            with np.errstate(divide="ignore", invalid="ignore"):
+                properties["localization_density_bb"] = np.where(
+                    region_measure > 0, self.segments.counts / region_measure, np.nan
+                )
+            if len(coordinate_keys) == 2:
+                subregion_measure = 2 * extents.sum(axis=0)
+            elif len(coordinate_keys) == 3:
+                subregion_measure = 2 * (
+                    extents[0] * extents[1]
+                    + extents[1] * extents[2]
+                    + extents[0] * extents[2]
+                )
+            else:
+                subregion_measure = None
+            if subregion_measure is not None:
+                properties["subregion_measure_bb"] = np.where(
+                    subregion_measure > 0, subregion_measure, np.nan
+                )
+
+        return pd.DataFrame(properties, index=pd.Index(self.segments.labels))
+
+
+def _position_keys(columns: Iterable[str]) -> list[str]:
+    return [
+        key_ for key_ in ["position_x", "position_y", "position_z"] if key_ in columns
+    ]
+
+
+def property_keys(
+    columns: Iterable[str], coordinate_keys: list[str] | None = None
+) -> list[str]:
+    """
+    Names of the properties that :meth:`GroupBy.properties` computes for
+    localization data with the given columns.
+
+    Parameters
+    ----------
+    columns
+        Column names of the localization data.
+    coordinate_keys
+        Coordinates to compute centroid, uncertainty and bounding box.
+        If None, all available position keys are used.
+
+    Returns
+    -------
+    list[str]
+    """
+    columns = list(columns)
+    if coordinate_keys is None:
+        coordinate_keys = _position_keys(columns)
+    keys = ["localization_count"]
+    for coordinate_key_, extension_ in zip(coordinate_keys, ["_x", "_y", "_z"]):
+        keys.extend([coordinate_key_, "uncertainty" + extension_])
+    keys.extend(
+        key_ for key_ in ["intensity", "local_background", "frame"] if key_ in columns
+    )
+    if coordinate_keys:
+        keys.extend(["region_measure_bb", "localization_density_bb"])
+        if len(coordinate_keys) in (2, 3):
+            keys.append("subregion_measure_bb")
+    return keys
+
+
+def collection_labels(
+    collection: lc.LocData,
+) -> tuple[pd.DataFrame, npt.NDArray[np.int32]]:
+    """
+    Concatenate the localization data of all references in a LocData
+    collection and label each localization with the position of its
+    reference.
+
+    Parameters
+    ----------
+    collection
+        LocData collection with a list of references.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, npt.NDArray[np.int32]]
+        Localization data and group label for each localization.
+    """
+    if not isinstance(collection.references, list):
+        raise TypeError("Locdata must be a LocData collection.")
+    dataframes = [reference_.data for reference_ in collection.references]
+    if not dataframes:
+        return pd.DataFrame(), np.array([], dtype=np.int32)
+    labels = np.repeat(
+        np.arange(len(dataframes), dtype=np.int32),
+        [len(dataframe_) for dataframe_ in dataframes],
+    )
+    dataframe = pd.concat(dataframes, ignore_index=True)
+    return dataframe, labels
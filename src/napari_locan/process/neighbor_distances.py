@@ -0,0 +1,88 @@
+"""
+Compute nearest-neighbor distances.
+
+For large SMLM datasets a single KD-tree query for all localizations
+allocates temporary distance and index arrays for all localizations and
+neighbors at once.
+
+This module provides nearest-neighbor distances that are computed from a
+spatial index (:class:`napari_locan.process.spatial_index.SpatialIndex`) in
+chunks of localizations.
+Chunks are queried in parallel threads and only the distance to the k-th
+nearest neighbor is kept for each localization, which bounds the memory
+requirement to a single float32 array and the temporary arrays for the
+chunks being processed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+
+from napari_locan.process.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+def nearest_neighbor_distances(
+    spatial_index: SpatialIndex,
+    k: int = 1,
+    chunk_size: int = 100_000,
+    n_jobs: int = 1,
+) -> npt.NDArray[np.float32]:
+    """
+    Compute the distance to the k-th nearest neighbor for each point in
+    spatial_index.
+
+    Parameters
+    ----------
+    spatial_index
+        Spatial index on the localization coordinates.
+    k
+        Compute the distance to the k-th nearest neighbor.
+    chunk_size
+        Number of points that are queried at once.
+    n_jobs
+        Number of threads to query chunks in parallel
+        (-1 for all processors).
+
+    Returns
+    -------
+    npt.NDArray[np.float32]
+        Distance to the k-th nearest neighbor for each point.
+    """
+    if k < 1:
+        raise ValueError("k must be larger than 0.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be larger than 0.")
+
+    n_points = len(spatial_index)
+    distances = np.full(n_points, np.nan, dtype=np.float32)
+    if n_points <= k:
+        return distances
+
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    def query_chunk(start: int) -> None:
+        stop = min(start + chunk_size, n_points)
+        # the point itself is the first neighbor
+        distances_, _ = spatial_index.tree.query(
+            spatial_index.points[start:stop], k=[k + 1]
+        )
+        distances[start:stop] = distances_[:, 0]
+
+    starts = range(0, n_points, chunk_size)
+    if n_jobs == 1 or len(starts) == 1:
+        for start in starts:
+            query_chunk(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            # iterate to raise exceptions from threads
+            for _ in executor.map(query_chunk, starts):
+                pass
+    return distances
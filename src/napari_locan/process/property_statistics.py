@@ -0,0 +1,205 @@
+"""
+Summary statistics for localization properties.
+
+Widgets that offer localization properties for selection or display need
+the range, quantiles or the distribution of property values.
+Computing these from the localization data scans the full column each time
+a property is chosen.
+
+This module provides summary statistics that are computed once for each
+localization property together with a pre-binned histogram.
+The statistics can be cached and reused for the same dataset
+(see :meth:`napari_locan.data_model.smlm_data.SmlmData.property_statistics`).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from napari_locan.process.column_version import ColumnVersion
+
+logger = logging.getLogger(__name__)
+
+# quantiles as given by pandas.DataFrame.describe()
+QUANTILES: tuple[float, ...] = (0.25, 0.5, 0.75)
+
+# maximum number of bins for the pre-binned histogram
+HISTOGRAM_MAX_BINS: int = 1_000
+
+
+class PropertyStatistics:
+    """
+    Summary statistics and histogram for the values of a localization
+    property.
+
+    Parameters
+    ----------
+    values
+        The values of the localization property.
+        For a pandas.Series a :class:`ColumnVersion` is kept to detect later
+        modifications.
+    loc_property
+        The localization property that the values represent.
+
+    Attributes
+    ----------
+    loc_property
+        The localization property that the values represent.
+    count
+        Number of values that are not NaN.
+    mean
+        Mean of values.
+    std
+        Standard deviation of values (with one degree of freedom).
+    min
+        Minimum of values.
+    max
+        Maximum of values.
+    quantiles
+        Values at the quantiles given by `QUANTILES`.
+    counts
+        Histogram counts.
+    bin_edges
+        Histogram bin edges.
+    """
+
+    def __init__(
+        self,
+        values: pd.Series | npt.ArrayLike,  # type: ignore[type-arg]
+        loc_property: str = "",
+    ) -> None:
+        self.loc_property: str = loc_property
+        self._version = (
+            ColumnVersion(values=values) if isinstance(values, pd.Series) else None
+        )
+        values_ = np.asarray(values)
+        if not np.issubdtype(values_.dtype, np.number):
+            raise TypeError(
+                f"Localization property {loc_property} must have numeric values."
+            )
+        values_ = values_.astype(np.float64, copy=False)
+        nan_mask = np.isnan(values_)
+        if nan_mask.any():
+            values_ = values_[~nan_mask]
+
+        self.count: int = len(values_)
+        if self.count == 0:
+            self.mean: float = np.nan
+            self.std: float = np.nan
+            self.min: float = np.nan
+            self.max: float = np.nan
+            self.quantiles: npt.NDArray[np.float64] = np.full(len(QUANTILES), np.nan)
+            self.counts: npt.NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+            self.bin_edges: npt.NDArray[np.float64] = np.zeros(0)
+            return
+
+        self.mean = float(np.mean(values_))
+        self.std = float(np.std(values_, ddof=1)) if self.count > 1 else np.nan
+        # a single partition gives min, quantiles and max
+        quantiles = np.quantile(values_, [0, *QUANTILES, 1])
+        self.min = float(quantiles[0])
+        self.max = float(quantiles[-1])
+        self.quantiles = quantiles[1:-1]
+
+        self.counts, self.bin_edges = np.histogram(
+            values_, bins=self._n_bins(), range=(self.min, self.max)
+        )
+
+    def _n_bins(self) -> int:
+        """
+        Number of bins as given by the "auto" estimator of
+        `numpy.histogram_bin_edges` but at most `HISTOGRAM_MAX_BINS`.
+        """
+        range_ = self.max - self.min
+        if range_ == 0:
+            return 1
+        width = range_ / (np.log2(self.count) + 1)
+        iqr = self.quantiles[-1] - self.quantiles[0]
+        if iqr > 0:
+            width = min(width, 2 * iqr * self.count ** (-1 / 3))
+        return int(min(np.ceil(range_ / width), HISTOGRAM_MAX_BINS))
+
+    def is_valid(self, values: pd.Series) -> bool:  # type: ignore[type-arg]
+        """
+        True if the statistics were computed from values.
+
+        Modifications are detected as described in
+        :mod:`napari_locan.process.column_version`.
+
+        Parameters
+        ----------
+        values
+            The current values of the localization property.
+
+        Returns
+        -------
+        bool
+        """
+        if self._version is None:
+            return False
+        return self._version.matches(values)
+
+    def describe(self) -> pd.Series:  # type: ignore[type-arg]
+        """
+        Summary statistics as given by `pandas.Series.describe()`.
+
+        Returns
+        -------
+        pandas.Series
+        """
+        index = ["count", "mean", "std", "min"]
+        index += [f"{quantile:.0%}" for quantile in QUANTILES]
+        index += ["max"]
+        return pd.Series(
+            [self.count, self.mean, self.std, self.min, *self.quantiles, self.max],
+            index=index,
+            name=self.loc_property,
+            dtype=np.float64,
+        )
+
+
+def describe(statistics: Iterable[PropertyStatistics]) -> pd.DataFrame:
+    """
+    Summary statistics for several localization properties as given by
+    `pandas.DataFrame.describe()`.
+
+    Parameters
+    ----------
+    statistics
+        Statistics for the localization properties.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    series = [item.describe() for item in statistics]
+    if not series:
+        return pd.DataFrame()
+    return pd.concat(series, axis=1)
+
+
+def numeric_loc_properties(dataframe: pd.DataFrame) -> list[str]:
+    """
+    Localization properties with numeric values for which statistics can be
+    computed.
+
+    Parameters
+    ----------
+    dataframe
+        Localization data.
+
+    Returns
+    -------
+    list[str]
+    """
+    return [
+        str(column)
+        for column, dtype in dataframe.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype)
+        and not pd.api.types.is_bool_dtype(dtype)
+    ]
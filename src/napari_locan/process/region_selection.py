@@ -0,0 +1,311 @@
+"""
+Select localizations within regions.
+
+Localizations within a region are selected by testing all localization
+coordinates for being inside the region.
+For regions that cover a small part of the dataset, most of the tests are
+spent on localizations far outside the region.
+
+This module provides a selection that takes candidate localizations within
+the region's bounding box from a spatial index
+(:class:`napari_locan.process.spatial_index.SpatialIndex`) and tests only
+those for being inside the region.
+
+For many regions on the same dataset, :func:`select_by_regions` takes the
+localization coordinates and the spatial index once and tests only the
+candidates of each region with the vectorized `contains` method of the
+region.
+Instead of one LocData object per region, :func:`region_labels` keeps the
+result compact as an integer region label for each localization.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections.abc import Sequence
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from napari_locan.process.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+REGION_LABEL_KEY: str = "region_label"
+
+
+def select_by_region(
+    locdata: lc.LocData,
+    region: lc.Region,
+    loc_properties: list[str] | None = None,
+    reduce: bool = True,
+    spatial_index: SpatialIndex | None = None,
+) -> lc.LocData:
+    """
+    Select localizations from `locdata` that are within `region` and return
+    a new LocData object as in :meth:`locan.Roi.locdata`.
+
+    Parameters
+    ----------
+    locdata
+        Localization data that is tested for being inside the region.
+    region
+        Tested region
+    loc_properties
+        Localization properties to be tested.
+        If None, the localization coordinates that correspond to the region
+        dimension are taken.
+    reduce
+        Return the reduced LocData object or keep references alive.
+    spatial_index
+        A spatial index on `loc_properties` of locdata.
+        If given, only localizations within the region's bounding box are
+        tested.
+
+    Returns
+    -------
+    lc.LocData
+        A new instance of LocData with all localizations within region.
+    """
+    parameter = locals()
+
+    if not len(locdata):
+        logger.warning("Locdata is empty.")
+        return locdata
+
+    if loc_properties:
+        loc_properties_ = list(loc_properties)
+    else:
+        loc_properties_ = list(locdata.coordinate_keys[0 : region.dimension])
+
+    if spatial_index is None:
+        points = locdata.data[loc_properties_].to_numpy()
+        indices_inside = np.asarray(region.contains(points), dtype=np.intp)
+    else:
+        if len(spatial_index) != len(locdata):
+            raise ValueError("The spatial index does not correspond to locdata.")
+        if spatial_index.loc_properties != loc_properties_:
+            raise ValueError("The spatial index does not correspond to loc_properties.")
+        indices_inside = _indices_inside(spatial_index=spatial_index, region=region)
+
+    new_locdata = _new_locdata(
+        locdata=locdata,
+        index=locdata.data.index[indices_inside],
+        region=region,
+        loc_properties=loc_properties_,
+        reduce=reduce,
+    )
+    new_locdata.meta.history.add(
+        name=sys._getframe().f_code.co_name, parameter=str(parameter)
+    )
+    return new_locdata
+
+
+def select_by_regions(
+    locdata: lc.LocData,
+    regions: Sequence[lc.Region],
+    loc_properties: list[str] | None = None,
+    reduce: bool = True,
+    spatial_index: SpatialIndex | None = None,
+) -> list[lc.LocData]:
+    """
+    Select localizations from `locdata` within each of `regions` and return
+    new LocData objects as in :func:`select_by_region`.
+
+    The localization coordinates are taken once for all regions and a
+    spatial index is built if none is given.
+    For each region only the localizations within the region's bounding box
+    are tested.
+
+    Parameters
+    ----------
+    locdata
+        Localization data that is tested for being inside the regions.
+    regions
+        Tested regions that must all have the same dimension.
+    loc_properties
+        Localization properties to be tested.
+        If None, the localization coordinates that correspond to the region
+        dimension are taken.
+    reduce
+        Return the reduced LocData objects or keep references alive.
+    spatial_index
+        A spatial index on `loc_properties` of locdata.
+
+    Returns
+    -------
+    list[lc.LocData]
+        New instances of LocData with all localizations within each region.
+    """
+    if not regions:
+        return []
+    if not len(locdata):
+        logger.warning("Locdata is empty.")
+        return [locdata for _ in regions]
+    loc_properties_, spatial_index = _prepare_regions(
+        locdata=locdata,
+        regions=regions,
+        loc_properties=loc_properties,
+        spatial_index=spatial_index,
+    )
+
+    index = locdata.data.index
+    new_locdatas = []
+    for region in regions:
+        new_locdata = _new_locdata(
+            locdata=locdata,
+            index=index[_indices_inside(spatial_index=spatial_index, region=region)],
+            region=region,
+            loc_properties=loc_properties_,
+            reduce=reduce,
+        )
+        parameter = {
+            "locdata": locdata,
+            "region": region,
+            "loc_properties": loc_properties,
+            "reduce": reduce,
+            "spatial_index": spatial_index,
+        }
+        new_locdata.meta.history.add(name="select_by_region", parameter=str(parameter))
+        new_locdatas.append(new_locdata)
+    return new_locdatas
+
+
+def region_labels(
+    locdata: lc.LocData,
+    regions: Sequence[lc.Region],
+    loc_properties: list[str] | None = None,
+    labels: Sequence[int] | None = None,
+    label_key: str = REGION_LABEL_KEY,
+    spatial_index: SpatialIndex | None = None,
+) -> lc.LocData:
+    """
+    Label localizations from `locdata` by the region that they are in.
+
+    Localizations within overlapping regions carry the label of the first
+    region.
+
+    Parameters
+    ----------
+    locdata
+        Localization data that is tested for being inside the regions.
+    regions
+        Tested regions that must all have the same dimension.
+    loc_properties
+        Localization properties to be tested.
+        If None, the localization coordinates that correspond to the region
+        dimension are taken.
+    labels
+        Non-negative label for each region.
+        If None, the positions of the regions in `regions` are taken.
+    label_key
+        Column name for region labels.
+    spatial_index
+        A spatial index on `loc_properties` of locdata.
+
+    Returns
+    -------
+    lc.LocData
+        A new LocData object with all localizations and an additional
+        int32 column `label_key` (localizations outside all regions are
+        labelled -1).
+    """
+    parameter = locals()
+
+    if labels is None:
+        labels = range(len(regions))
+    elif len(labels) != len(regions):
+        raise ValueError("labels and regions must correspond and be of same length.")
+    elif any(label < 0 for label in labels):
+        raise ValueError("labels must not be negative.")
+
+    label_column = np.full(len(locdata), -1, dtype=np.int32)
+    if regions and len(locdata):
+        _, spatial_index = _prepare_regions(
+            locdata=locdata,
+            regions=regions,
+            loc_properties=loc_properties,
+            spatial_index=spatial_index,
+        )
+        # the first region is labelled last to take precedence
+        for label, region in reversed(list(zip(labels, regions))):
+            indices_inside = _indices_inside(spatial_index=spatial_index, region=region)
+            label_column[indices_inside] = label
+
+    # the label column is added without copying the localization data
+    data = locdata.data
+    dataframe = pd.DataFrame(
+        {
+            **{column_: data[column_] for column_ in data.columns},
+            label_key: pd.Series(label_column, index=data.index, copy=False),
+        },
+        copy=False,
+    )
+    new_locdata = lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+    new_locdata.region = locdata.region
+    new_locdata.meta.history.add(
+        name=sys._getframe().f_code.co_name, parameter=str(parameter)
+    )
+    return new_locdata
+
+
+def _prepare_regions(
+    locdata: lc.LocData,
+    regions: Sequence[lc.Region],
+    loc_properties: list[str] | None,
+    spatial_index: SpatialIndex | None,
+) -> tuple[list[str], SpatialIndex]:
+    """Check regions and provide loc_properties and a spatial index."""
+    dimensions = {region.dimension for region in regions}
+    if len(dimensions) != 1:
+        raise ValueError("All regions must have the same dimension.")
+
+    if loc_properties:
+        loc_properties_ = list(loc_properties)
+    else:
+        loc_properties_ = list(locdata.coordinate_keys[0 : dimensions.pop()])
+
+    if spatial_index is None:
+        spatial_index = SpatialIndex(
+            points=locdata.data[loc_properties_].to_numpy(),
+            loc_properties=loc_properties_,
+        )
+    elif len(spatial_index) != len(locdata):
+        raise ValueError("The spatial index does not correspond to locdata.")
+    elif spatial_index.loc_properties != loc_properties_:
+        raise ValueError("The spatial index does not correspond to loc_properties.")
+    return loc_properties_, spatial_index
+
+
+def _indices_inside(
+    spatial_index: SpatialIndex, region: lc.Region
+) -> npt.NDArray[np.intp]:
+    """Sorted indices of points in spatial_index that are inside region."""
+    candidates = spatial_index.query_bounding_box(bounds=region.bounds)  # type: ignore[arg-type]
+    indices_inside = candidates[
+        np.asarray(region.contains(spatial_index.points[candidates]), dtype=np.intp)
+    ]
+    indices_inside.sort()
+    return indices_inside
+
+
+def _new_locdata(
+    locdata: lc.LocData,
+    index: pd.Index,
+    region: lc.Region,
+    loc_properties: list[str],
+    reduce: bool,
+) -> lc.LocData:
+    new_locdata = lc.LocData.from_selection(locdata=locdata, indices=index)
+    if loc_properties == list(new_locdata.coordinate_keys):
+        new_locdata.region = region
+    else:
+        new_locdata.region = None
+
+    if reduce:
+        new_locdata.reduce()
+    return new_locdata
@@ -0,0 +1,163 @@
+"""
+Content-addressed cache for computation results.
+
+Computations like clustering are deterministic functions of the input
+localization data and the method parameters.
+Results are therefore stored on disk under a key that is computed as hash of
+the input data and the parameters.
+A repeated computation on the same data with the same parameters then loads
+the result from disk - also after reloading a project or restarting napari.
+
+Results are kept as numpy arrays in `.npy` files.
+The least recently used results are deleted once the cache exceeds a maximum
+size.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import platformdirs
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_DIRECTORY: Path = Path(platformdirs.user_cache_dir("napari-locan")) / "results"
+
+
+def hash_key(arrays: list[npt.ArrayLike], parameter: dict[str, Any]) -> str:
+    """
+    Compute a key from the content of arrays and parameters.
+
+    Parameters
+    ----------
+    arrays
+        Input data.
+    parameter
+        Method parameters that must be representable as string.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash value.
+    """
+    hash_ = hashlib.blake2b(digest_size=20)
+    for array_ in arrays:
+        array_ = np.ascontiguousarray(array_)
+        hash_.update(str((array_.dtype.str, array_.shape)).encode())
+        hash_.update(array_.reshape(-1).view(np.uint8).data)
+    hash_.update(json.dumps(parameter, sort_keys=True, default=str).encode())
+    return hash_.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache for numpy arrays that are addressed by a hash key.
+
+    Parameters
+    ----------
+    directory
+        Directory in which to keep the cached results.
+        If None, CACHE_DIRECTORY in the user cache directory is taken.
+    max_bytes
+        Maximum size of all cached results.
+
+    Attributes
+    ----------
+    directory
+        Directory in which to keep the cached results.
+    max_bytes
+        Maximum size of all cached results.
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike[str] | None = None, max_bytes: int = 2**30
+    ) -> None:
+        self.directory: Path = CACHE_DIRECTORY if directory is None else Path(directory)
+        self.max_bytes: int = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def get(self, key: str) -> npt.NDArray[Any] | None:
+        """
+        Load the result for key.
+
+        Parameters
+        ----------
+        key
+            Hash key as computed by :func:`hash_key`.
+
+        Returns
+        -------
+        npt.NDArray[Any] | None
+            The cached result or None if no result is available.
+        """
+        path = self._path(key)
+        try:
+            array: npt.NDArray[Any] = np.load(path, allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Corrupted cache file is deleted: %s", path)
+            path.unlink(missing_ok=True)
+            return None
+        # mark as recently used
+        os.utime(path)
+        return array
+
+    def set(self, key: str, array: npt.ArrayLike) -> None:
+        """
+        Store the result for key.
+
+        Parameters
+        ----------
+        key
+            Hash key as computed by :func:`hash_key`.
+        array
+            The result.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write to temporary file first to never expose incomplete files
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".tmp", dir=self.directory
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.save(file, np.asarray(array), allow_pickle=False)
+            os.replace(temporary_path, self._path(key))
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def clear(self) -> None:
+        """Delete all cached results."""
+        for path in self.directory.glob("*.npy"):
+            path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Delete least recently used results to keep within max_bytes."""
+        stats = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                stats.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        n_bytes = sum(stat_.st_size for _, stat_ in stats)
+        for path, stat_ in sorted(stats, key=lambda item: item[1].st_mtime):
+            if n_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            n_bytes -= stat_.st_size
@@ -0,0 +1,186 @@
+"""
+Selections that refer to the localization data of another dataset.
+
+A selection by :meth:`locan.LocData.from_selection` keeps a reference to
+the selected dataset together with the index labels of the selected
+localizations.
+Each access to :attr:`locan.LocData.data` then looks up the index labels and
+merges the result with an empty dataframe, and the construction of the
+selection does this several times for the computation of its properties.
+
+:class:`SelectionView` keeps a boolean mask into the rows of the selected
+dataset instead.
+The selected localization data is only materialized as a contiguous copy
+when it is accessed and is not kept alive afterwards.
+The copy is taken by the row positions of the selected localizations,
+which are determined once from the mask.
+Only the mask, i.e. one byte per localization of the selected dataset, and
+the positions of the selected localizations are held in memory for each
+selection.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, BinaryIO
+
+import locan as lc
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class SelectionView(lc.LocData):
+    """
+    LocData object that refers to selected localizations in another LocData
+    object by a boolean mask.
+
+    Use :meth:`from_mask` to create a selection view.
+    Besides the localization data being materialized on access it behaves
+    like a selection from :meth:`locan.LocData.from_selection`.
+
+    Attributes
+    ----------
+    references
+        The LocData object from which localizations are selected.
+    indices
+        Boolean mask with shape (n_localizations,) of references.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # the selected data is kept while properties are computed upon
+        # construction and released afterwards
+        self._data_cache: pd.DataFrame | None = None
+        self._positions: npt.NDArray[np.intp] | None = None
+        self._positions_mask: npt.NDArray[Any] | None = None
+        self._is_constructing: bool = True
+        try:
+            super().__init__(*args, **kwargs)
+        finally:
+            self._is_constructing = False
+            self._data_cache = None
+
+    @classmethod
+    def from_mask(
+        cls,
+        locdata: lc.LocData,
+        mask: npt.ArrayLike,
+        meta: (
+            lc.data.metadata_pb2.Metadata
+            | dict[str, Any]
+            | str
+            | bytes
+            | os.PathLike[Any]
+            | BinaryIO
+            | None
+        ) = None,
+    ) -> SelectionView:
+        """
+        Create a new selection view on locdata.
+
+        Parameters
+        ----------
+        locdata
+            Locdata object from which to select elements.
+        mask
+            Boolean mask with shape (n_localizations,) that is True for the
+            selected localizations.
+        meta
+            Metadata about the current dataset and its history.
+
+        Returns
+        -------
+        SelectionView
+        """
+        mask = np.asarray(mask, dtype=np.bool_)
+        n_localizations = len(locdata)
+        if mask.shape != (n_localizations,):
+            raise ValueError(
+                f"The mask must have shape ({n_localizations},) "
+                f"but has shape {mask.shape}."
+            )
+        return cls.from_selection(locdata=locdata, indices=mask, meta=meta)
+
+    @property
+    def is_view(self) -> bool:
+        """
+        True if the localization data is computed from the mask on the
+        referenced LocData object.
+        """
+        return (
+            isinstance(self.references, lc.LocData)
+            and isinstance(self.indices, np.ndarray)
+            and self.dataframe.empty
+        )
+
+    @property
+    def n_references(self) -> int:
+        """Number of localizations in the referenced LocData object."""
+        if not self.is_view:
+            return len(self)
+        assert isinstance(self.indices, np.ndarray)  # type narrowing # noqa: S101
+        return len(self.indices)
+
+    @property
+    def positions(self) -> npt.NDArray[np.intp]:
+        """
+        Row positions of the selected localizations in the referenced LocData
+        object.
+        """
+        if not self.is_view:
+            return np.arange(len(self))
+        assert isinstance(self.indices, np.ndarray)  # type narrowing # noqa: S101
+        # the positions are determined once for each mask
+        if self._positions is None or self._positions_mask is not self.indices:
+            self._positions = np.flatnonzero(self.indices)
+            self._positions_mask = self.indices
+        return self._positions
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        pandas.DataFrame: Return a copy of the selected localizations from
+        the referenced LocData object.
+        """
+        if not self.is_view:
+            return super().data
+        if self._data_cache is not None:
+            return self._data_cache
+        assert isinstance(self.references, lc.LocData)  # type narrowing # noqa: S101
+        data: pd.DataFrame = self.references.data.take(self.positions)
+        if self._is_constructing:
+            self._data_cache = data
+        return data
+
+    @property
+    def columns(self) -> pd.Index:
+        """Column names of the localization data without materializing it."""
+        if not self.is_view:
+            return self.data.columns
+        assert isinstance(self.references, lc.LocData)  # type narrowing # noqa: S101
+        if isinstance(self.references, SelectionView):
+            return self.references.columns
+        return self.references.data.columns
+
+    @property
+    def coordinate_keys(self) -> list[str]:
+        columns = self.columns
+        return [
+            label_ for label_ in lc.PropertyKey.coordinate_keys() if label_ in columns
+        ]
+
+    @property
+    def uncertainty_keys(self) -> list[str]:
+        columns = self.columns
+        return [
+            label_ for label_ in lc.PropertyKey.uncertainty_keys() if label_ in columns
+        ]
+
+    def __len__(self) -> int:
+        if not self.is_view:
+            return super().__len__()
+        assert isinstance(self.indices, np.ndarray)  # type narrowing # noqa: S101
+        return int(np.count_nonzero(self.indices))
@@ -0,0 +1,145 @@
+"""
+Spatial index for localization data.
+
+Clustering, region selection and nearest-neighbor analysis all rely on
+neighbor queries on localization coordinates.
+Building the underlying KD-tree is the dominant cost for repeated queries on
+the same dataset.
+
+This module provides a spatial index that wraps a KD-tree together with the
+indexed points and offers the neighbor queries needed by napari-locan
+widgets.
+The index is built once and can be cached and reused for the same dataset
+(see :meth:`napari_locan.data_model.smlm_data.SmlmData.spatial_index`).
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+
+class SpatialIndex:
+    """
+    KD-tree index on localization coordinates.
+
+    Parameters
+    ----------
+    points
+        Coordinates with shape (n_points, dimension).
+    loc_properties
+        The localization properties that the points represent.
+
+    Attributes
+    ----------
+    points
+        A copy of the indexed coordinates that is not affected by later
+        modifications of the localization data.
+    loc_properties
+        The localization properties that the points represent.
+    tree
+        The KD-tree built on points.
+    """
+
+    def __init__(
+        self, points: npt.ArrayLike, loc_properties: list[str] | None = None
+    ) -> None:
+        self.points: npt.NDArray[np.float64] = np.array(points, dtype=np.float64)
+        if self.points.ndim != 2:
+            raise TypeError("Points must have shape (n_points, dimension).")
+        self.loc_properties: list[str] = (
+            [] if loc_properties is None else list(loc_properties)
+        )
+        self.tree: cKDTree = cKDTree(self.points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.points.shape[1])
+
+    def query(
+        self, k: int = 1, points: npt.ArrayLike | None = None, n_jobs: int = 1
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]:
+        """
+        Find the k nearest neighbors.
+
+        Parameters
+        ----------
+        k
+            Number of nearest neighbors.
+        points
+            Query points. If None, the indexed points are queried and each
+            point is excluded as its own neighbor.
+        n_jobs
+            Number of parallel workers (-1 for all processors).
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]
+            Distances and indices with shape (n_query_points, k).
+        """
+        if points is None:
+            distances, indices = self.tree.query(self.points, k=k + 1, workers=n_jobs)
+            distances, indices = distances[:, 1:], indices[:, 1:]
+        else:
+            distances, indices = self.tree.query(
+                np.asarray(points), k=[*range(1, k + 1)], workers=n_jobs
+            )
+        return distances, indices
+
+    def query_bounding_box(self, bounds: npt.ArrayLike) -> npt.NDArray[np.intp]:
+        """
+        Find all points within an axis-aligned bounding box.
+
+        Parameters
+        ----------
+        bounds
+            Bounding box as (min_x, min_y, ..., max_x, max_y, ...).
+
+        Returns
+        -------
+        npt.NDArray[np.intp]
+            Sorted indices of all points within the bounding box.
+        """
+        bounds = np.asarray(bounds, dtype=np.float64)
+        mins, maxs = bounds[: self.dimension], bounds[self.dimension :]
+        if len(self) == 0:
+            return np.array([], dtype=np.intp)
+        center = (mins + maxs) / 2
+        half_width = np.max(maxs - mins) / 2
+        # square box in Chebyshev metric that covers the bounding box
+        candidates = np.asarray(
+            self.tree.query_ball_point(center, r=half_width, p=np.inf),
+            dtype=np.intp,
+        )
+        candidates_points = self.points[candidates]
+        inside = np.all(
+            (candidates_points >= mins) & (candidates_points <= maxs), axis=1
+        )
+        return np.sort(candidates[inside])
+
+    def query_pairs(self, radius: float) -> npt.NDArray[np.intp]:
+        """
+        Find all pairs of points within a distance of radius.
+
+        Parameters
+        ----------
+        radius
+            Maximum distance between neighbors.
+
+        Returns
+        -------
+        npt.NDArray[np.intp]
+            Index pairs (i, j) with i < j and shape (n_pairs, 2).
+        """
+        pairs: npt.NDArray[np.intp] = self.tree.query_pairs(
+            r=radius, output_type="ndarray"
+        )
+        return pairs
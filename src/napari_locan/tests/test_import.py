@@ -1,4 +1,17 @@
+import subprocess
+import sys
+
+
 def test_import():
     import napari_locan
 
     assert napari_locan.__version__
+
+
+def test_import_without_napari():
+    # worker processes import submodules without importing napari
+    code = (
+        "import sys; import napari_locan.locan_io.load; "
+        "assert 'napari' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
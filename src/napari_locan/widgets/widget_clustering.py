@@ -3,9 +3,20 @@ Compute localization clusters.
 
 QWidget plugin for clustering SMLM data.
 More advanced clustering routines are available through locan-based scripts.
+
+Cluster results are either kept as LocData collection with one LocData object
+per cluster or, more compact, as cluster labels for each localization
+together with a table of cluster properties.
+The compact result is computed from the spatial index that is cached for each
+SMLM dataset.
+Cluster labels can be kept in an on-disk result cache so that clustering the
+same localization coordinates with the same parameters is not recomputed.
 """
 
+from __future__ import annotations
+
 import logging
+from functools import partial
 from typing import Any
 
 import locan as lc
@@ -13,6 +24,7 @@ from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QHBoxLayout,
     QLabel,
@@ -25,6 +37,13 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.cluster_labels import (
+    LABEL_KEY,
+    cluster_dbscan_labels,
+    compute_dbscan_labels,
+    materialize_clusters,
+)
+from napari_locan.process.result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +53,7 @@ class ClusteringQWidget(QWidget):  # type: ignore
         super().__init__()
         self.viewer = napari_viewer
         self.smlm_data = smlm_data
+        self.result_cache = ResultCache()
 
         self._add_cluster_method_combobox()
         self._add_loc_properties_selection()
@@ -158,19 +178,47 @@ class ClusteringQWidget(QWidget):  # type: ignore
         self._parameter_definitions_layout.addWidget(self._min_points_label)
         self._parameter_definitions_layout.addWidget(self._min_points_spin_box)
 
+        self._compact_result_check_box = QCheckBox("Compact result")
+        self._compact_result_check_box.setToolTip(
+            "Keep cluster labels and a table of cluster properties instead of "
+            "one LocData object per cluster."
+        )
+        self._compact_result_check_box.setChecked(False)
+
+        self._result_cache_check_box = QCheckBox("Use result cache")
+        self._result_cache_check_box.setToolTip(
+            "Load cluster labels from the on-disk result cache if the same "
+            "coordinates were clustered with the same parameters before; "
+            "store new cluster labels in the cache otherwise."
+        )
+        self._result_cache_check_box.setChecked(False)
+
+        self._compact_result_layout = QHBoxLayout()
+        self._compact_result_layout.addWidget(self._compact_result_check_box)
+        self._compact_result_layout.addWidget(self._result_cache_check_box)
+
     def _add_buttons(self) -> None:
         self._compute_button = QPushButton("Compute")
         self._compute_button.setToolTip("Run the clustering procedure.")
         self._compute_button.clicked.connect(self._compute_button_on_click)
 
+        self._materialize_button = QPushButton("Materialize")
+        self._materialize_button.setToolTip(
+            "Create noise and cluster collection from the cluster labels "
+            "in the selected SMLM dataset."
+        )
+        self._materialize_button.clicked.connect(self._materialize_button_on_click)
+
         self._buttons_layout = QHBoxLayout()
         self._buttons_layout.addWidget(self._compute_button)
+        self._buttons_layout.addWidget(self._materialize_button)
 
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
         layout.addLayout(self._cluster_method_layout)
         layout.addLayout(self._loc_properties_layout)
         layout.addLayout(self._parameter_definitions_layout)
+        layout.addLayout(self._compact_result_layout)
         layout.addLayout(self._buttons_layout)
         self.setLayout(layout)
 
@@ -182,11 +230,45 @@ class ClusteringQWidget(QWidget):  # type: ignore
 
         eps_ = self._eps_spin_box.value()
         min_samples_ = self._min_points_spin_box.value()
+        # the spatial index is only built if labels are not in the result cache
+        locdata = self.smlm_data.locdata
+        spatial_index = partial(self.smlm_data.spatial_index, locdata=locdata)
+
+        if self._compact_result_check_box.isChecked():
+            with progress() as progress_bar:
+                progress_bar.set_description("Running cluster_dbscan_labels")
+                labels, clust = cluster_dbscan_labels(
+                    locdata=locdata,  # type: ignore[arg-type]
+                    eps=eps_,
+                    min_samples=min_samples_,
+                    spatial_index=spatial_index,
+                    result_cache=self._get_result_cache(),
+                )
+                self._append_cluster_labels(labels=labels, clust=clust)
+            return
+
+        if self._result_cache_check_box.isChecked():
+            with progress() as progress_bar:
+                progress_bar.set_description("Running cluster_dbscan_labels")
+                noise, clust = _cluster_dbscan_cached(
+                    locdata=locdata,
+                    eps=eps_,
+                    min_samples=min_samples_,
+                    spatial_index=spatial_index,
+                    result_cache=self.result_cache,
+                )
+                self.smlm_data.append_item(
+                    locdata=noise, locdata_name=noise.meta.identifier + "-noise"
+                )
+                self.smlm_data.append_item(
+                    locdata=clust, locdata_name=clust.meta.identifier + "-cluster"
+                )
+            return
 
         with progress() as progress_bar:
             progress_bar.set_description("Running cluster_dbscan")
             noise, clust = lc.cluster_dbscan(
-                locdata=self.smlm_data.locdata, eps=eps_, min_samples=min_samples_  # type: ignore[arg-type]
+                locdata=locdata, eps=eps_, min_samples=min_samples_  # type: ignore[arg-type]
             )
             self.smlm_data.append_item(
                 locdata=noise, locdata_name=noise.meta.identifier + "-noise"
@@ -213,10 +295,37 @@ class ClusteringQWidget(QWidget):  # type: ignore
                 locdata=clust, locdata_name=clust.meta.identifier + "-cluster"
             )
 
-        worker = _cluster_dbscan_worker(
-            locdata=self.smlm_data.locdata, eps=eps_, min_samples=min_samples_
-        )
-        worker.returned.connect(worker_return)
+        def worker_return_labels(return_value: tuple[lc.LocData, lc.LocData]) -> None:
+            labels, clust = return_value
+            self._append_cluster_labels(labels=labels, clust=clust)
+
+        # the spatial index is built in the worker thread
+        locdata = self.smlm_data.locdata
+        spatial_index = partial(self.smlm_data.spatial_index, locdata=locdata)
+
+        if self._compact_result_check_box.isChecked():
+            worker = _cluster_dbscan_labels_worker(
+                locdata=locdata,
+                eps=eps_,
+                min_samples=min_samples_,
+                spatial_index=spatial_index,
+                result_cache=self._get_result_cache(),
+            )
+            worker.returned.connect(worker_return_labels)
+        elif self._result_cache_check_box.isChecked():
+            worker = _cluster_dbscan_cached_worker(
+                locdata=locdata,
+                eps=eps_,
+                min_samples=min_samples_,
+                spatial_index=spatial_index,
+                result_cache=self.result_cache,
+            )
+            worker.returned.connect(worker_return)
+        else:
+            worker = _cluster_dbscan_worker(
+                locdata=self.smlm_data.locdata, eps=eps_, min_samples=min_samples_
+            )
+            worker.returned.connect(worker_return)
         worker.start()
 
     def _compute_button_on_click(self) -> None:
@@ -224,6 +333,40 @@ class ClusteringQWidget(QWidget):  # type: ignore
         # the thread worker seems to take >3x longer:
         # self._compute_button_on_click_thread_worker()
 
+    def _get_result_cache(self) -> ResultCache | None:
+        if self._result_cache_check_box.isChecked():
+            return self.result_cache
+        else:
+            return None
+
+    def _append_cluster_labels(self, labels: lc.LocData, clust: lc.LocData) -> None:
+        # the labelled locdata is appended last to become the selected item
+        self.smlm_data.append_item(
+            locdata=clust, locdata_name=clust.meta.identifier + "-cluster-properties"
+        )
+        self.smlm_data.append_item(
+            locdata=labels, locdata_name=labels.meta.identifier + "-cluster-labels"
+        )
+
+    def _materialize_button_on_click(self) -> None:
+        locdata = self.smlm_data.locdata
+        if locdata is None:
+            raise ValueError("There is no smlm data available.")
+        if LABEL_KEY not in locdata.data.columns:
+            raise KeyError(
+                f"The SMLM dataset does not carry cluster labels: {LABEL_KEY}"
+            )
+
+        with progress() as progress_bar:
+            progress_bar.set_description("Materializing clusters")
+            noise, clust = materialize_clusters(locdata=locdata)
+            self.smlm_data.append_item(
+                locdata=noise, locdata_name=noise.meta.identifier + "-noise"
+            )
+            self.smlm_data.append_item(
+                locdata=clust, locdata_name=clust.meta.identifier + "-cluster"
+            )
+
     def _get_message_feedback(self) -> bool:
         n_localizations = len(self.smlm_data.locdata)  # type: ignore
         if n_localizations < 10_000:
@@ -242,7 +385,28 @@ class ClusteringQWidget(QWidget):  # type: ignore
         return run_computation
 
 
-@thread_worker(progress={"desc": "Running cluster_dbscan"})  # type: ignore[misc]
+@thread_worker(progress={"desc": "Running cluster_dbscan"})  # type: ignore[misc, untyped-decorator]
 def _cluster_dbscan_worker(**kwargs: Any) -> tuple[lc.LocData, lc.LocData]:
     return_value = lc.cluster_dbscan(**kwargs)
     return return_value  # type: ignore[no-any-return]
+
+
+@thread_worker(progress={"desc": "Running cluster_dbscan_labels"})  # type: ignore[misc, untyped-decorator]
+def _cluster_dbscan_labels_worker(**kwargs: Any) -> tuple[lc.LocData, lc.LocData]:
+    return_value = cluster_dbscan_labels(**kwargs)
+    return return_value
+
+
+def _cluster_dbscan_cached(**kwargs: Any) -> tuple[lc.LocData, lc.LocData]:
+    """Compute noise and cluster collection from (cached) cluster labels."""
+    labels = compute_dbscan_labels(**kwargs)
+    if len(labels) == 0:
+        return lc.LocData(), lc.LocData()
+    # selections refer to the clustered dataset and not to the labels
+    return materialize_clusters(locdata=kwargs["locdata"], labels=labels)
+
+
+@thread_worker(progress={"desc": "Running cluster_dbscan_labels"})  # type: ignore[misc, untyped-decorator]
+def _cluster_dbscan_cached_worker(**kwargs: Any) -> tuple[lc.LocData, lc.LocData]:
+    return_value = _cluster_dbscan_cached(**kwargs)
+    return return_value
@@ -2,15 +2,28 @@
 Save SMLM data files.
 
 A QWidget plugin to save data from the SMLM data model.
+
+Saving runs in a background thread
+(see :mod:`napari_locan.locan_io.save`).
+ASDF files can be saved with compressed arrays.
+All SMLM datasets can be saved at once into files that are named after the
+given file path and the dataset names.
 """
 
+from __future__ import annotations
+
 import logging
+import re
+from collections.abc import Callable, Generator
 from pathlib import Path
 
 import locan as lc
+import napari
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QFileDialog,
     QHBoxLayout,
@@ -23,6 +36,12 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import LocDataPlaceholder
+from napari_locan.locan_io.save import (
+    FILE_SUFFIXES,
+    iterate_save_locdata,
+    iterate_save_locdatas,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +51,12 @@ class SaveSmlmDataQWidget(QWidget):  # type: ignore
         super().__init__()
         self.viewer = napari_viewer
         self.smlm_data = smlm_data
+        self._progress_bar: progress | None = None
 
         self._add_file_type()
         self._add_file_path()
         # self._add_kwargs_edit()
+        self._add_options()
         self._add_buttons()
         self._set_layout()
 
@@ -83,6 +104,22 @@ class SaveSmlmDataQWidget(QWidget):  # type: ignore
     #     self._kwargs_edit_layout.addWidget(self._kwargs_edit_label)
     #     self._kwargs_edit_layout.addWidget(self._kwargs_edit)
 
+    def _add_options(self) -> None:
+        self._compress_check_box = QCheckBox("Compress")
+        self._compress_check_box.setToolTip("Compress the binary arrays of ASDF files.")
+        self._compress_check_box.setChecked(False)
+
+        self._save_all_check_box = QCheckBox("Save all items")
+        self._save_all_check_box.setToolTip(
+            "Save all SMLM datasets into files named after the file path and "
+            "the dataset names."
+        )
+        self._save_all_check_box.setChecked(False)
+
+        self._options_layout = QHBoxLayout()
+        self._options_layout.addWidget(self._compress_check_box)
+        self._options_layout.addWidget(self._save_all_check_box)
+
     def _add_buttons(self) -> None:
         self._save_button = QPushButton("Save SMLM data")
         self._save_button.setToolTip("Save the selected SMLM dataset.")
@@ -93,6 +130,7 @@ class SaveSmlmDataQWidget(QWidget):  # type: ignore
         layout.addLayout(self._file_type_layout)
         layout.addLayout(self._file_path_layout)
         # layout.addLayout(self._kwargs_edit_layout)
+        layout.addLayout(self._options_layout)
         layout.addWidget(self._save_button)
         self.setLayout(layout)
 
@@ -123,20 +161,98 @@ class SaveSmlmDataQWidget(QWidget):  # type: ignore
         # expr = ast.parse(f"dict({text}\n)", mode="eval")
         # kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in expr.body.keywords}  # type: ignore
 
-        with progress() as progress_bar:
-            progress_bar.set_description("Saving data")
-            if file_type == lc.FileType.ASDF.name and file_path.suffix == ".asdf":
-                lc.save_asdf(locdata=self.smlm_data.locdata, path=file_path)  # type: ignore[arg-type]
-            elif file_type == lc.FileType.SMAP.name and file_path.suffix == ".csv":
-                lc.save_SMAP_csv(locdata=self.smlm_data.locdata, path=file_path)  # type: ignore[arg-type]
-            elif file_type == lc.FileType.SMLM.name and file_path.suffix == ".zip":
-                lc.save_SMLM(locdata=self.smlm_data.locdata, path=file_path)  # type: ignore[arg-type]
-            elif (
-                file_type == lc.FileType.THUNDERSTORM.name
-                and file_path.suffix == ".csv"
-            ):
-                lc.save_thunderstorm_csv(locdata=self.smlm_data.locdata, path=file_path)  # type: ignore[arg-type]
-            else:
-                raise TypeError(
-                    "Selected file type cannot be saved. Check that file suffix is correct."
+        if FILE_SUFFIXES.get(file_type) != file_path.suffix:
+            raise TypeError(
+                "Selected file type cannot be saved. Check that file suffix is correct."
+            )
+
+        locdatas: list[lc.LocData | Callable[[], lc.LocData]]
+        if self._save_all_check_box.isChecked():
+            # placeholders are loaded one by one while saving
+            locdatas = [
+                item.load if isinstance(item, LocDataPlaceholder) else item
+                for item in self.smlm_data.locdatas
+            ]
+            paths = [
+                file_path.with_name(
+                    f"{file_path.stem}_{index}_"
+                    f"{_file_name_part(locdata_name)}{file_path.suffix}"
                 )
+                for index, locdata_name in enumerate(self.smlm_data.locdata_names)
+            ]
+        elif self.smlm_data.locdata is None:
+            raise ValueError("There is no smlm data available.")
+        else:
+            locdatas = [self.smlm_data.locdata]
+            paths = [file_path]
+
+        self._progress_bar = progress(total=0)
+        self._progress_bar.set_description("Saving data")
+        self._save_button.setEnabled(False)
+
+        def worker_return() -> None:
+            napari.utils.notifications.show_info(
+                f"Saved {len(paths)} file(s) to {file_path.parent}."
+            )
+
+        worker = _save_worker(
+            locdatas=locdatas,
+            paths=paths,
+            file_type=file_type,
+            compress=self._compress_check_box.isChecked(),
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(f"Saving failed: {exception}")
+
+        worker.yielded.connect(self._update_progress)
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _update_progress(self, n_items_and_total: tuple[int, int]) -> None:
+        n_items, n_total = n_items_and_total
+        if self._progress_bar is not None:
+            self._progress_bar.total = n_total
+            self._progress_bar.update(n_items - self._progress_bar.n)
+
+    def _finish_progress(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._save_button.setEnabled(True)
+
+
+def _file_name_part(text: str) -> str:
+    """Replace characters that are not suitable for file names."""
+    return re.sub(r"[^\w.-]+", "_", text)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _save_worker(
+    locdatas: list[lc.LocData | Callable[[], lc.LocData]],
+    paths: list[Path],
+    file_type: str,
+    compress: bool = False,
+) -> Generator[tuple[int, int], None, None]:
+    """
+    Save a single dataset and yield the number of written localizations or
+    save several datasets and yield the number of written files.
+    """
+    if len(locdatas) == 1:
+        locdata = locdatas[0]
+        if not isinstance(locdata, lc.LocData):
+            locdata = locdata()
+        yield from iterate_save_locdata(
+            locdata=locdata, path=paths[0], file_type=file_type, compress=compress
+        )
+    else:
+        yield from iterate_save_locdatas(
+            locdatas=locdatas,
+            paths=list(paths),
+            file_type=file_type,
+            compress=compress,
+        )
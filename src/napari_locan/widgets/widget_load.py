@@ -3,16 +3,35 @@ Load SMLM data files.
 
 A QWidget plugin to load SMLM data files into the SMLM data model.
 A new SMLM dataset will be created.
+
+Files are loaded in a background thread that reports progress by the number
+of bytes read (for text-based file types) and that can be cancelled.
+The SMLM dataset is added to SmlmData once loading has finished.
+
+In multi-file mode a list of file paths or glob patterns is loaded in a pool
+of processes and all SMLM datasets are added to SmlmData at once.
 """
 
+from __future__ import annotations
+
 import ast
 import logging
+import os
+import threading
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
+from typing import Any
 
 import locan as lc
+import napari
+import numpy as np
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QFileDialog,
     QHBoxLayout,
@@ -23,20 +42,40 @@ from qtpy.QtWidgets import (
     QWidget,
 )
 
-from napari_locan import smlm_data
+from napari_locan import filter_specifications, smlm_data
+from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.columnar_cache import ColumnarCache
+from napari_locan.locan_io.load import (
+    LoadCancelledError,
+    LocDataLoader,
+    expand_file_paths,
+    iterate_load_locdata_files,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class LoadQWidget(QWidget):  # type: ignore
-    def __init__(self, napari_viewer: Viewer, smlm_data: SmlmData = smlm_data):
+    def __init__(
+        self,
+        napari_viewer: Viewer,
+        smlm_data: SmlmData = smlm_data,
+        filter_specifications: FilterSpecifications = filter_specifications,
+    ):
         super().__init__()
         self.viewer = napari_viewer
         self.smlm_data = smlm_data
+        self.filter_specifications = filter_specifications
+        self._loader: LocDataLoader | None = None
+        self._cancel_event: threading.Event | None = None
+        self._progress_bar: progress | None = None
+        self.columnar_cache = ColumnarCache()
 
         self._add_file_type()
         self._add_file_path()
+        self._add_projection_edits()
+        self._add_condition_edit()
         self._add_kwargs_edit()
         self._add_buttons()
         self._set_layout()
@@ -59,6 +98,10 @@ class LoadQWidget(QWidget):  # type: ignore
     def _add_file_path(self) -> None:
         self._file_path_label = QLabel("File path:")
         self._file_path_edit = QLineEdit()
+        self._file_path_edit.setToolTip(
+            "File path - or in multi-file mode file paths and glob patterns "
+            "separated by ';'."
+        )
         self._file_path_select_button = QPushButton("Select")
         self._file_path_select_button.setToolTip("Select a file path.")
         self._file_path_select_button.clicked.connect(
@@ -76,6 +119,69 @@ class LoadQWidget(QWidget):  # type: ignore
         self._file_path_layout.addWidget(self._file_path_select_button)
         self._file_path_layout.addWidget(self._file_path_delete_button)
 
+        self._multiple_files_check_box = QCheckBox("Multiple files")
+        self._multiple_files_check_box.setToolTip(
+            "Load multiple files in parallel processes."
+        )
+        self._multiple_files_check_box.setChecked(False)
+
+        self._columnar_cache_check_box = QCheckBox("Use columnar cache")
+        self._columnar_cache_check_box.setToolTip(
+            "Keep parsed files as memory-mapped binary columns in the cache "
+            "directory and load unchanged files from there."
+        )
+        self._columnar_cache_check_box.setChecked(False)
+
+        self._multiple_files_layout = QHBoxLayout()
+        self._multiple_files_layout.addWidget(self._multiple_files_check_box)
+        self._multiple_files_layout.addWidget(self._columnar_cache_check_box)
+
+    def _add_projection_edits(self) -> None:
+        self._loc_properties_edit_label = QLabel("Properties:")
+        self._loc_properties_edit = QLineEdit()
+        self._loc_properties_edit.setPlaceholderText("all")
+        self._loc_properties_edit.setToolTip(
+            "Localization properties to load separated by ',' like "
+            "'position_x, position_y, frame, intensity'."
+        )
+
+        self._loc_properties_edit_layout = QHBoxLayout()
+        self._loc_properties_edit_layout.addWidget(self._loc_properties_edit_label)
+        self._loc_properties_edit_layout.addWidget(self._loc_properties_edit)
+
+        self._dtypes_edit_label = QLabel("Data types:")
+        self._dtypes_edit = QLineEdit()
+        self._dtypes_edit.setPlaceholderText("default")
+        self._dtypes_edit.setToolTip(
+            "Data types for localization properties like "
+            "'position_x=float32, frame=int32, channel=uint16'. "
+            "Other float properties are loaded as float32."
+        )
+
+        self._dtypes_edit_layout = QHBoxLayout()
+        self._dtypes_edit_layout.addWidget(self._dtypes_edit_label)
+        self._dtypes_edit_layout.addWidget(self._dtypes_edit)
+
+    def _add_condition_edit(self) -> None:
+        self._condition_edit_label = QLabel("Filter condition:")
+        self._condition_edit = QLineEdit()
+        self._condition_edit.setPlaceholderText("none")
+        self._condition_edit.setToolTip(
+            "Keep only localizations that fulfill the condition like "
+            "'100 < position_x < 200'. Text files are filtered while reading "
+            "in chunks."
+        )
+        self._condition_get_button = QPushButton("Get")
+        self._condition_get_button.setToolTip(
+            "Take the condition of the current filter specification."
+        )
+        self._condition_get_button.clicked.connect(self._condition_get_button_on_click)
+
+        self._condition_edit_layout = QHBoxLayout()
+        self._condition_edit_layout.addWidget(self._condition_edit_label)
+        self._condition_edit_layout.addWidget(self._condition_edit)
+        self._condition_edit_layout.addWidget(self._condition_get_button)
+
     def _add_kwargs_edit(self) -> None:
         self._kwargs_edit_label = QLabel("**kwargs:")
         self._kwargs_edit = QLineEdit()
@@ -90,15 +196,39 @@ class LoadQWidget(QWidget):  # type: ignore
         self._load_button.setToolTip("Load the selected file as new SMLM dataset.")
         self._load_button.clicked.connect(self._load_button_on_click)
 
+        self._cancel_button = QPushButton("Cancel")
+        self._cancel_button.setToolTip("Cancel loading the file.")
+        self._cancel_button.setEnabled(False)
+        self._cancel_button.clicked.connect(self._cancel_button_on_click)
+
+        self._buttons_layout = QHBoxLayout()
+        self._buttons_layout.addWidget(self._load_button)
+        self._buttons_layout.addWidget(self._cancel_button)
+
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
         layout.addLayout(self._file_type_layout)
         layout.addLayout(self._file_path_layout)
+        layout.addLayout(self._multiple_files_layout)
+        layout.addLayout(self._loc_properties_edit_layout)
+        layout.addLayout(self._dtypes_edit_layout)
+        layout.addLayout(self._condition_edit_layout)
         layout.addLayout(self._kwargs_edit_layout)
-        layout.addWidget(self._load_button)
+        layout.addLayout(self._buttons_layout)
         self.setLayout(layout)
 
     def _file_path_select_button_on_click(self) -> None:
+        if self._multiple_files_check_box.isChecked():
+            fnames_ = QFileDialog.getOpenFileNames(
+                None,
+                "message",
+                "",
+                filter="",
+            )
+            fnames = fnames_[0] if isinstance(fnames_, tuple) else fnames_
+            self._file_path_edit.setText("; ".join(str(fname) for fname in fnames))
+            return
+
         fname_ = QFileDialog.getOpenFileName(
             None,
             "message",
@@ -113,7 +243,16 @@ class LoadQWidget(QWidget):  # type: ignore
     def _file_path_delete_button_on_click(self) -> None:
         self._file_path_edit.clear()
 
+    def _condition_get_button_on_click(self) -> None:
+        self._condition_edit.setText(self.filter_specifications.filter_condition)
+
     def _load_button_on_click(self) -> None:
+        if self._multiple_files_check_box.isChecked():
+            if not self._file_path_edit.text():
+                self._file_path_select_button_on_click()
+            self._load_files_thread_worker()
+            return
+
         if not self._file_path_edit.text():
             self._file_path_select_button_on_click()
         else:
@@ -128,18 +267,193 @@ class LoadQWidget(QWidget):  # type: ignore
             fname = fname_[0] if isinstance(fname_, tuple) else str(fname_)
             self._file_path_edit.setText(fname)
 
-        file_path = self._file_path_edit.text()
-        file_type = self._file_type_combobox.currentText()
+        self._load_thread_worker()
 
+    def _get_kwargs(self) -> dict[str, Any]:
         text = self._kwargs_edit.text()
         expr = ast.parse(f"dict({text}\n)", mode="eval")
         kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in expr.body.keywords}  # type: ignore
+        loc_properties = self._get_loc_properties()
+        if loc_properties is not None:
+            kwargs["loc_properties"] = loc_properties
+        dtypes = self._get_dtypes()
+        if dtypes:
+            kwargs["dtypes"] = dtypes
+        condition = self._condition_edit.text().strip()
+        if condition:
+            kwargs["condition"] = condition
+        return kwargs
+
+    def _get_loc_properties(self) -> list[str] | None:
+        loc_properties = [
+            item_.strip().strip("'\"")
+            for item_ in self._loc_properties_edit.text().split(",")
+            if item_.strip()
+        ]
+        return loc_properties or None
+
+    def _get_dtypes(self) -> dict[str, str]:
+        text = self._dtypes_edit.text()
+        expr = ast.parse(f"dict({text}\n)", mode="eval")
+        # data types are accepted as names or as string literals
+        dtypes = {
+            kw.arg: str(
+                np.dtype(
+                    kw.value.id
+                    if isinstance(kw.value, ast.Name)
+                    else ast.literal_eval(kw.value)
+                )
+            )
+            for kw in expr.body.keywords  # type: ignore
+        }
+        return dtypes
+
+    def _get_columnar_cache(self) -> ColumnarCache | None:
+        if self._columnar_cache_check_box.isChecked():
+            return self.columnar_cache
+        return None
+
+    def _get_loader(self) -> LocDataLoader:
+        return LocDataLoader(
+            path=self._file_path_edit.text(),
+            file_type=self._file_type_combobox.currentText(),
+            columnar_cache=self._get_columnar_cache(),
+            **self._get_kwargs(),
+        )
+
+    def _append_locdata(
+        self, locdata: lc.LocData, file_path: str | os.PathLike[str]
+    ) -> None:
+        locdata_name = locdata.meta.identifier + "-" + str(Path(file_path).name)
+        self.smlm_data.append_item(locdata=locdata, locdata_name=locdata_name)
+
+    def _load_thread_worker(self) -> None:
+        if self._is_loading():
+            raise RuntimeError("A file is being loaded.")
+        self._loader = self._get_loader()
+        # the file path field may be edited while loading
+        file_path = self._loader.path
+        self._progress_bar = progress(total=self._loader.size)
+        self._progress_bar.set_description("Loading data")
+        self._load_button.setEnabled(False)
+        self._cancel_button.setEnabled(True)
+
+        def worker_yielded(bytes_read: int) -> None:
+            if self._progress_bar is not None:
+                self._progress_bar.update(bytes_read - self._progress_bar.n)
+
+        def worker_return(locdata: lc.LocData | None) -> None:
+            if locdata is None:
+                napari.utils.notifications.show_info("Loading was cancelled.")
+            else:
+                self._append_locdata(locdata=locdata, file_path=file_path)
+
+        worker = _load_worker(loader=self._loader)
+        worker.yielded.connect(worker_yielded)
+        worker.returned.connect(worker_return)
+        worker.finished.connect(self._load_finished)
+        worker.start()
 
-        with progress() as progress_bar:
-            progress_bar.set_description("Loading data")
-            if file_type == "ROI":
-                locdata = lc.load_locdata_from_roi_file(path=file_path, **kwargs)
+    def _load_files_thread_worker(self) -> None:
+        if self._is_loading():
+            raise RuntimeError("A file is being loaded.")
+        file_paths = expand_file_paths(self._file_path_edit.text())
+        if not file_paths:
+            raise FileNotFoundError("There are no files to load.")
+        file_type = self._file_type_combobox.currentText()
+        kwargs = self._get_kwargs()
+
+        self._cancel_event = threading.Event()
+        self._progress_bar = progress(total=len(file_paths))
+        self._progress_bar.set_description("Loading files")
+        self._load_button.setEnabled(False)
+        self._cancel_button.setEnabled(True)
+
+        def worker_yielded(n_files: int) -> None:
+            if self._progress_bar is not None:
+                self._progress_bar.update(n_files - self._progress_bar.n)
+
+        def worker_return(locdatas: list[lc.LocData] | None) -> None:
+            if locdatas is None:
+                napari.utils.notifications.show_info("Loading was cancelled.")
+            else:
+                locdata_names = [
+                    locdata.meta.identifier + "-" + file_path.name
+                    for locdata, file_path in zip(locdatas, file_paths)
+                ]
+                self.smlm_data.append_items(
+                    locdatas=locdatas, locdata_names=locdata_names
+                )
+
+        worker = _load_files_worker(
+            file_paths=file_paths,
+            file_type=file_type,
+            cancel_event=self._cancel_event,
+            columnar_cache=self._get_columnar_cache(),
+            **kwargs,
+        )
+        worker.yielded.connect(worker_yielded)
+        worker.returned.connect(worker_return)
+        worker.finished.connect(self._load_finished)
+        worker.start()
+
+    def _is_loading(self) -> bool:
+        return self._loader is not None or self._cancel_event is not None
+
+    def _load_finished(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._loader = None
+        self._cancel_event = None
+        self._load_button.setEnabled(True)
+        self._cancel_button.setEnabled(False)
+
+    def _cancel_button_on_click(self) -> None:
+        if self._loader is not None:
+            self._loader.cancel()
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _load_worker(
+    loader: LocDataLoader, interval: float = 0.1
+) -> Generator[int, None, lc.LocData | None]:
+    """Load file in a separate thread and yield the number of bytes read."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(loader.load)
+        while True:
+            try:
+                locdata = future.result(timeout=interval)
+            except FutureTimeoutError:
+                yield loader.bytes_read
+            except LoadCancelledError:
+                return None
             else:
-                locdata = lc.load_locdata(path=file_path, file_type=file_type, **kwargs)
-            locdata_name = locdata.meta.identifier + "-" + str(Path(file_path).name)
-            self.smlm_data.append_item(locdata=locdata, locdata_name=locdata_name)
+                yield loader.bytes_read
+                return locdata
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _load_files_worker(
+    file_paths: list[Path],
+    file_type: str,
+    cancel_event: threading.Event,
+    **kwargs: Any,
+) -> Generator[int, None, list[lc.LocData] | None]:
+    """Load files in a process pool and yield the number of loaded files."""
+    locdatas: list[lc.LocData | None] = [None] * len(file_paths)
+    iterator = iterate_load_locdata_files(
+        paths=file_paths, file_type=file_type, **kwargs
+    )
+    try:
+        for n_files, (index, locdata) in enumerate(iterator, start=1):
+            if cancel_event.is_set():
+                return None
+            locdatas[index] = locdata
+            yield n_files
+    finally:
+        # cancels files that are not yet loaded
+        iterator.close()
+    return locdatas  # type: ignore[return-value]
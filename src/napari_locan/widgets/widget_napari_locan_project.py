@@ -9,20 +9,42 @@ which currently includes the following data models
 3) roi_specifications
 4) smlm_data
 
-The data is serialized by the pickle module using protocol 5.
+A project is saved as directory with compressed column arrays for each
+localization dataset and the specifications as small metadata file
+(see :mod:`napari_locan.locan_io.project`).
+Saving and loading runs in a background thread.
+Projects can be loaded lazily so that SMLM datasets are only loaded when
+they are selected; the number of loaded datasets kept in memory is limited.
+
+Once a project is saved or loaded, it can be saved automatically at a
+given interval.
+Autosave runs only if a data model has changed and writes only the project
+file and the SMLM datasets that are not yet kept in the project directory.
+
+Projects from previous versions that were serialized by the pickle module
+using protocol 5 can still be loaded and saved.
 """
 
+from __future__ import annotations
+
 import logging
 import pickle
+from collections.abc import Generator
 from pathlib import Path
 from typing import Any
 
+import napari
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
+from qtpy.QtCore import QTimer  # type: ignore[attr-defined]
 from qtpy.QtWidgets import (
+    QCheckBox,
     QFileDialog,
     QHBoxLayout,
+    QLabel,
     QPushButton,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
 )
@@ -37,6 +59,11 @@ from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.region_specifications import RegionSpecifications
 from napari_locan.data_model.roi_specifications import RoiSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import (
+    PROJECT_FILE_NAME,
+    ProjectWriter,
+    iterate_load_project,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +83,62 @@ class NapariLocanProjectQWidget(QWidget):  # type: ignore
         self.region_specifications = region_specifications
         self.roi_specifications = roi_specifications
         self.smlm_data = smlm_data
+        self._progress_bar: progress | None = None
+        self._is_busy: bool = False
+        self._project_writer: ProjectWriter | None = None
 
+        self._add_lazy_loading()
+        self._add_autosave()
         self._add_buttons()
         self._set_layout()
 
+    def _add_lazy_loading(self) -> None:
+        self._lazy_check_box = QCheckBox("Lazy loading")
+        self._lazy_check_box.setToolTip(
+            "Load SMLM datasets of a project when they are first selected."
+        )
+        self._lazy_check_box.setChecked(False)
+
+        self._max_resident_label = QLabel("Max. loaded datasets:")
+        self._max_resident_spin_box = QSpinBox()
+        self._max_resident_spin_box.setToolTip(
+            "Maximum number of lazily loaded SMLM datasets kept in memory. "
+            "The least recently selected datasets are released first."
+        )
+        self._max_resident_spin_box.setRange(1, 1000)
+        self._max_resident_spin_box.setValue(5)
+
+        self._lazy_layout = QHBoxLayout()
+        self._lazy_layout.addWidget(self._lazy_check_box)
+        self._lazy_layout.addWidget(self._max_resident_label)
+        self._lazy_layout.addWidget(self._max_resident_spin_box)
+
+    def _add_autosave(self) -> None:
+        self._autosave_check_box = QCheckBox("Autosave")
+        self._autosave_check_box.setToolTip(
+            "Save changes to the last saved or loaded project at the given "
+            "interval. Only changed SMLM datasets are written."
+        )
+        self._autosave_check_box.setChecked(False)
+        self._autosave_check_box.stateChanged.connect(self._update_autosave_timer)
+
+        self._autosave_interval_label = QLabel("Interval [s]:")
+        self._autosave_interval_spin_box = QSpinBox()
+        self._autosave_interval_spin_box.setToolTip("Time between autosaves.")
+        self._autosave_interval_spin_box.setRange(1, 3600)
+        self._autosave_interval_spin_box.setValue(60)
+        self._autosave_interval_spin_box.valueChanged.connect(
+            self._update_autosave_timer
+        )
+
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.timeout.connect(self._autosave_timer_on_timeout)
+
+        self._autosave_layout = QHBoxLayout()
+        self._autosave_layout.addWidget(self._autosave_check_box)
+        self._autosave_layout.addWidget(self._autosave_interval_label)
+        self._autosave_layout.addWidget(self._autosave_interval_spin_box)
+
     def _add_buttons(self) -> None:
         self._new_button = QPushButton("New")
         self._new_button.setToolTip("Clear all and start new napari-locan project.")
@@ -80,6 +159,8 @@ class NapariLocanProjectQWidget(QWidget):  # type: ignore
 
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
+        layout.addLayout(self._lazy_layout)
+        layout.addLayout(self._autosave_layout)
         layout.addLayout(self._buttons_layout)
         self.setLayout(layout)
 
@@ -89,16 +170,55 @@ class NapariLocanProjectQWidget(QWidget):  # type: ignore
         self.roi_specifications.delete_all()
         self.smlm_data.delete_all()
 
+    def _update_autosave_timer(self) -> None:
+        if self._autosave_check_box.isChecked():
+            self._autosave_timer.start(self._autosave_interval_spin_box.value() * 1000)
+        else:
+            self._autosave_timer.stop()
+
+    def _autosave_timer_on_timeout(self) -> None:
+        if self._is_busy or self._project_writer is None or not self._is_dirty():
+            return
+        self._save_thread_worker(path=self._project_writer.path, autosave=True)
+
+    def _data_models(self) -> list[Any]:
+        return [
+            self.filter_specifications,
+            self.region_specifications,
+            self.roi_specifications,
+            self.smlm_data,
+        ]
+
+    def _is_dirty(self) -> bool:
+        return any(data_model.is_dirty for data_model in self._data_models())
+
+    def _mark_clean(self) -> None:
+        for data_model in self._data_models():
+            data_model.mark_clean()
+
+    def _mark_dirty(self) -> None:
+        for data_model in self._data_models():
+            data_model._mark_dirty()
+
     def _load_button_on_click(self) -> None:
         fname_ = QFileDialog.getOpenFileName(
             None,
-            "Load napari_locan project from pickle file",
+            "Load napari_locan project",
             "",
-            filter="Pickle file (*.pickle)",
+            filter=f"napari-locan project ({PROJECT_FILE_NAME});;"
+            "Pickle file (*.pickle)",
             # kwargs: parent, message, directory, filter
             # but kw_names are different for different qt_bindings
         )
         file_path = fname_[0] if isinstance(fname_, tuple) else str(fname_)
+        if not file_path:
+            return
+        if Path(file_path).suffix == ".pickle":
+            self._load_pickle(file_path=file_path)
+        else:
+            self._load_thread_worker(path=file_path)
+
+    def _load_pickle(self, file_path: str | Path) -> None:
         with progress() as progress_bar:
             progress_bar.set_description("Loading data")
             with open(file_path, "rb") as file:
@@ -106,20 +226,155 @@ class NapariLocanProjectQWidget(QWidget):  # type: ignore
         self._unpack_napari_locan_state(napari_locan_state=napari_locan_state)
 
     def _save_button_on_click(self) -> None:
-        napari_locan_state = self._pack_napari_locan_state()
-
         file_dialog = QFileDialog()
         file_dialog.setFileMode(QFileDialog.AnyFile)  # type: ignore[attr-defined]
         file_path_return = file_dialog.getSaveFileName(
-            caption="Provide file name and path to save current project.",
-            filter="Pickle file (*.pickle)",
+            caption="Provide directory name and path to save current project.",
+            filter="napari-locan project directory (*);;Pickle file (*.pickle)",
         )
+        if not file_path_return[0]:
+            return
         file_path = Path(file_path_return[0])
-        if file_path:
-            with progress() as progress_bar:
-                progress_bar.set_description("Saving data")
-                with open(file_path, "wb") as file:
-                    pickle.dump(napari_locan_state, file, protocol=5)
+        if file_path.suffix == ".pickle":
+            self._save_pickle(file_path=file_path)
+        else:
+            self._save_thread_worker(path=file_path)
+
+    def _save_pickle(self, file_path: str | Path) -> None:
+        napari_locan_state = self._pack_napari_locan_state()
+        with progress() as progress_bar:
+            progress_bar.set_description("Saving data")
+            with open(file_path, "wb") as file:
+                pickle.dump(napari_locan_state, file, protocol=5)
+
+    def _start_progress(self, description: str | None) -> None:
+        self._is_busy = True
+        if description is not None:
+            self._progress_bar = progress(total=0)
+            self._progress_bar.set_description(description)
+        self._load_button.setEnabled(False)
+        self._save_button.setEnabled(False)
+        self._new_button.setEnabled(False)
+
+    def _update_progress(self, n_files_and_total: tuple[int, int]) -> None:
+        n_files, n_total = n_files_and_total
+        if self._progress_bar is not None:
+            self._progress_bar.total = n_total
+            self._progress_bar.update(n_files - self._progress_bar.n)
+
+    def _finish_progress(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._is_busy = False
+        self._load_button.setEnabled(True)
+        self._save_button.setEnabled(True)
+        self._new_button.setEnabled(True)
+
+    def _get_project_writer(self, path: str | Path) -> ProjectWriter:
+        if self._project_writer is None or self._project_writer.path != Path(path):
+            self._project_writer = ProjectWriter(path=path)
+        # unchanged datasets loaded from placeholders are kept in the project
+        # directory
+        for locdata, placeholder in self.smlm_data.resident_items():
+            self._project_writer.register(locdata=locdata, placeholder=placeholder)
+        return self._project_writer
+
+    def _save_thread_worker(self, path: str | Path, autosave: bool = False) -> None:
+        project = self._pack_project()
+        project_writer = self._get_project_writer(path=path)
+        # changes during saving are recorded for the next save
+        self._mark_clean()
+        self._start_progress(description=None if autosave else "Saving project")
+
+        def worker_return() -> None:
+            if autosave:
+                logger.info("Project was saved to %s.", path)
+            else:
+                napari.utils.notifications.show_info(f"Project was saved to {path}.")
+
+        worker = _save_project_worker(project_writer=project_writer, project=project)
+        worker.yielded.connect(self._update_progress)
+        worker.returned.connect(worker_return)
+        worker.errored.connect(self._mark_dirty)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _load_thread_worker(self, path: str | Path) -> None:
+        self._start_progress(description="Loading project")
+        worker = _load_project_worker(path=path, lazy=self._lazy_check_box.isChecked())
+        worker.yielded.connect(self._update_progress)
+
+        def worker_return(project: dict[str, dict[str, Any]]) -> None:
+            self._unpack_project(project=project)
+            project_path = Path(path)
+            if project_path.name == PROJECT_FILE_NAME:
+                project_path = project_path.parent
+            self._project_writer = ProjectWriter(path=project_path)
+            smlm_data = project["smlm_data"]
+            for locdata, placeholder in zip(
+                smlm_data["datasets"], smlm_data["placeholders"]
+            ):
+                if locdata is not placeholder:
+                    self._project_writer.register(
+                        locdata=locdata, placeholder=placeholder
+                    )
+            self._mark_clean()
+
+        worker.returned.connect(worker_return)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _pack_project(self) -> dict[str, dict[str, Any]]:
+        project: dict[str, dict[str, Any]] = {}
+        for key, data_model in [
+            ("filter_specifications", self.filter_specifications),
+            ("region_specifications", self.region_specifications),
+            ("roi_specifications", self.roi_specifications),
+        ]:
+            project[key] = {
+                "datasets": list(data_model.datasets),
+                "names": list(data_model.names),
+                "index": data_model.index,
+            }
+        # placeholders are kept to not load datasets for saving
+        project["smlm_data"] = {
+            "datasets": list(self.smlm_data.locdatas),
+            "names": list(self.smlm_data.locdata_names),
+            "index": self.smlm_data.index,
+            "placeholders": [
+                self.smlm_data.placeholder(index)
+                for index in range(len(self.smlm_data.locdatas))
+            ],
+        }
+        return project
+
+    def _unpack_project(self, project: dict[str, dict[str, Any]]) -> None:
+        napari_locan_state: dict[str, Any] = {
+            "filter_specifications": FilterSpecifications(
+                datasets=project["filter_specifications"]["datasets"],
+                names=project["filter_specifications"]["names"],
+            ),
+            "region_specifications": RegionSpecifications(
+                datasets=project["region_specifications"]["datasets"],
+                names=project["region_specifications"]["names"],
+            ),
+            "roi_specifications": RoiSpecifications(
+                datasets=project["roi_specifications"]["datasets"],
+                names=project["roi_specifications"]["names"],
+            ),
+            "smlm_data": SmlmData(
+                locdatas=project["smlm_data"]["datasets"],
+                locdata_names=project["smlm_data"]["names"],
+            ),
+        }
+        for key, state in napari_locan_state.items():
+            state._index = project[key]["index"]
+        if self._lazy_check_box.isChecked():
+            self.smlm_data.max_resident = self._max_resident_spin_box.value()
+        else:
+            self.smlm_data.max_resident = None
+        self._unpack_napari_locan_state(napari_locan_state=napari_locan_state)
 
     def _pack_napari_locan_state(self) -> dict[str, Any]:
         napari_locan_state: dict[str, Any] = {}
@@ -181,5 +436,25 @@ class NapariLocanProjectQWidget(QWidget):  # type: ignore
         self.smlm_data._locdatas = napari_locan_state["smlm_data"]._locdatas
         self.smlm_data._locdata_names = napari_locan_state["smlm_data"]._locdata_names
         self.smlm_data._index = napari_locan_state["smlm_data"]._index
+        self.smlm_data._prune_spatial_indices()
+        self.smlm_data._prune_property_statistics()
+        self.smlm_data._prune_resident()
         self.smlm_data.locdata_names_changed_signal.emit(self.smlm_data._locdata_names)
         self.smlm_data.index_changed_signal.emit(self.smlm_data._index)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _save_project_worker(
+    project_writer: ProjectWriter, project: dict[str, dict[str, Any]]
+) -> Generator[tuple[int, int], None, None]:
+    """Save project and yield the number of written files."""
+    yield from project_writer.iterate_save(project=project)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _load_project_worker(
+    path: str | Path, lazy: bool = False
+) -> Generator[tuple[int, int], None, dict[str, dict[str, Any]]]:
+    """Load project and yield the number of read files."""
+    project = yield from iterate_load_project(path=path, lazy=lazy)
+    return project
@@ -1,29 +1,53 @@
 """
 Show localization property distribution.
 
-A QWidget plugin to show localization property distributions
+A QWidget plugin to show localization property distributions.
+For SMLM datasets with cluster labels the distribution of cluster properties
+can be shown, which are computed for all clusters at once.
+Alternatively, the distribution of nearest-neighbor distances is computed
+from the spatial index of the SMLM dataset in chunks of localizations and
+in a background thread.
+The distribution of localization properties is shown from the pre-binned
+histogram that is cached for the SMLM dataset
+(see :meth:`napari_locan.data_model.smlm_data.SmlmData.property_statistics`).
 """
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from functools import partial
 from typing import Any
 
 import locan as lc
+import napari
+import numpy as np
+import numpy.typing as npt
+from locan.configuration import N_JOBS
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from napari_matplotlib.base import BaseNapariMPLWidget
 from qtpy.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QHBoxLayout,
     QLabel,
     QPushButton,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
 )
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.cluster_labels import (
+    LABEL_KEY,
+    cluster_properties,
+    cluster_property_keys,
+)
+from napari_locan.process.neighbor_distances import nearest_neighbor_distances
+from napari_locan.process.spatial_index import SpatialIndex
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +62,11 @@ class PropertyDistributionQWidget(QWidget):  # type: ignore[misc]
         super().__init__(parent=parent)
         self.viewer = napari_viewer
         self.smlm_data = smlm_data
+        self._progress_bar: progress | None = None
 
         self._add_loc_property_selector()
+        self._add_cluster_properties_check_box()
+        self._add_nearest_neighbor_widgets()
         self._add_plot_widget()
         self._add_buttons()
 
@@ -64,6 +91,42 @@ class PropertyDistributionQWidget(QWidget):  # type: ignore[misc]
         self._loc_property_selector_layout.addWidget(self._loc_property_label)
         self._loc_property_selector_layout.addWidget(self._loc_property_combobox)
 
+    def _add_cluster_properties_check_box(self) -> None:
+        self._cluster_properties_check_box = QCheckBox("Cluster properties")
+        self._cluster_properties_check_box.setToolTip(
+            "Show distribution of cluster properties computed from the cluster "
+            f"labels in column {LABEL_KEY}."
+        )
+        self._cluster_properties_check_box.setChecked(False)
+        self._cluster_properties_check_box.stateChanged.connect(
+            self._cluster_properties_check_box_on_changed
+        )
+
+        self._cluster_properties_layout = QHBoxLayout()
+        self._cluster_properties_layout.addWidget(self._cluster_properties_check_box)
+
+    def _add_nearest_neighbor_widgets(self) -> None:
+        self._nearest_neighbor_check_box = QCheckBox("Nearest-neighbor distances")
+        self._nearest_neighbor_check_box.setToolTip(
+            "Show distribution of distances to the k-th nearest neighbor "
+            "instead of a localization property."
+        )
+        self._nearest_neighbor_check_box.setChecked(False)
+        self._nearest_neighbor_check_box.stateChanged.connect(
+            self._loc_property_combobox_on_changed
+        )
+
+        self._k_label = QLabel("k:")
+        self._k_spin_box = QSpinBox()
+        self._k_spin_box.setToolTip("Compute distance to the k-th nearest neighbor.")
+        self._k_spin_box.setRange(1, 1_000)
+        self._k_spin_box.setValue(1)
+
+        self._nearest_neighbor_layout = QHBoxLayout()
+        self._nearest_neighbor_layout.addWidget(self._nearest_neighbor_check_box)
+        self._nearest_neighbor_layout.addWidget(self._k_label)
+        self._nearest_neighbor_layout.addWidget(self._k_spin_box)
+
     def _connect_loc_property_selector(self) -> None:
         self.smlm_data.index_changed_signal.connect(
             self._loc_property_combobox_slot_for_smlm_data_index
@@ -99,19 +162,45 @@ class PropertyDistributionQWidget(QWidget):  # type: ignore[misc]
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
         layout.addLayout(self._loc_property_selector_layout)
+        layout.addLayout(self._cluster_properties_layout)
+        layout.addLayout(self._nearest_neighbor_layout)
         layout.addLayout(self._plot_widget_layout)
         layout.addLayout(self._buttons_layout)
         self.setLayout(layout)
 
+    def _get_cluster_locdata(self) -> lc.LocData:
+        """Return LocData with one row of properties for each cluster."""
+        locdata = self.smlm_data.locdata
+        if locdata is None or LABEL_KEY not in locdata.data.columns:
+            raise KeyError(
+                f"The SMLM dataset does not carry cluster labels: {LABEL_KEY}"
+            )
+        dataframe = cluster_properties(locdata=locdata).reset_index()
+        return lc.LocData.from_dataframe(dataframe=dataframe)  # type: ignore[arg-type]
+
+    def _get_loc_properties(self) -> list[str]:
+        locdata = self.smlm_data.locdata
+        if locdata is None:
+            return []
+        elif (
+            self._cluster_properties_check_box.isChecked()
+            and LABEL_KEY in locdata.data.columns
+        ):
+            return cluster_property_keys(locdata=locdata)
+        else:
+            return list(locdata.data.columns)
+
+    def _cluster_properties_check_box_on_changed(self) -> None:
+        self._loc_property_combobox.setCurrentIndex(-1)
+        self._loc_property_combobox_slot_for_smlm_data_index(index=self.smlm_data.index)
+
     def _loc_property_combobox_slot_for_smlm_data_index(self, index: int) -> None:
         key_index = self._loc_property_combobox.currentIndex()
         self._loc_property_combobox.clear()
         self._plot_widget.axes.clear()
         self._plot_widget.canvas.draw()
         if index != -1:
-            self._loc_property_combobox.addItems(
-                self.smlm_data.locdata.data.columns  # type: ignore
-            )
+            self._loc_property_combobox.addItems(self._get_loc_properties())
             if key_index == -1:
                 if bool(self.smlm_data.locdata):
                     self._loc_property_combobox.setCurrentIndex(0)
@@ -134,11 +223,83 @@ class PropertyDistributionQWidget(QWidget):  # type: ignore[misc]
 
         self._plot_widget.axes.clear()
 
+        if self._cluster_properties_check_box.isChecked():
+            locdata = self._get_cluster_locdata()
+
+        if self._nearest_neighbor_check_box.isChecked():
+            self._plot_widget.canvas.draw()
+            self._plot_nearest_neighbor_distances_thread_worker(locdata=locdata)
+            return
+
+        loc_property = self._loc_property_combobox.currentText()
         with progress() as progress_bar:
-            progress_bar.set_description("Running LocalizationProperty")
-            lp = lc.LocalizationProperty(
-                loc_property=self._loc_property_combobox.currentText()
-            ).compute(locdata)
-            lp.hist(ax=self._plot_widget.axes, fit=False)
+            progress_bar.set_description("Computing property statistics")
+            statistics = self.smlm_data.property_statistics(
+                loc_property=loc_property, locdata=locdata
+            )
+        if statistics.count != 0:
+            density = statistics.counts / (
+                statistics.count * np.diff(statistics.bin_edges)
+            )
+            self._plot_widget.axes.stairs(density, statistics.bin_edges, fill=True)
+            self._plot_widget.axes.set_yscale("log")
+        self._plot_widget.axes.set(
+            title=loc_property, xlabel=loc_property, ylabel="PDF"
+        )
 
         self._plot_widget.canvas.draw()
+
+    def _plot_nearest_neighbor_distances_thread_worker(
+        self, locdata: lc.LocData
+    ) -> None:
+        k = self._k_spin_box.value()
+
+        self._progress_bar = progress(total=0)
+        self._progress_bar.set_description("Computing nearest-neighbor distances")
+        self._select_button.setEnabled(False)
+
+        def worker_return(return_value: npt.NDArray[np.float32]) -> None:
+            self._plot_widget.axes.clear()
+            self._plot_widget.axes.hist(return_value, bins="auto")
+            self._plot_widget.axes.set(
+                title=f"Distance to nearest neighbor k={k}",
+                xlabel="nn_distance",
+                ylabel="counts",
+            )
+            self._plot_widget.canvas.draw()
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(
+                f"Computing nearest-neighbor distances failed: {exception}"
+            )
+
+        # the spatial index is built in the worker thread
+        worker = _nearest_neighbor_distances_worker(
+            spatial_index=partial(self.smlm_data.spatial_index, locdata=locdata),
+            k=k,
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _finish_progress(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._select_button.setEnabled(True)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _nearest_neighbor_distances_worker(
+    spatial_index: Callable[[], SpatialIndex], k: int
+) -> npt.NDArray[np.float32]:
+    distances = nearest_neighbor_distances(
+        spatial_index=spatial_index(), k=k, n_jobs=N_JOBS
+    )
+    distances = distances[~np.isnan(distances)]
+    if len(distances) == 0:
+        raise ValueError(f"Locdata must have more than {k} localizations.")
+    return distances
@@ -4,6 +4,8 @@ Render selected features of all SMLM datasets in a collection.
 A QWidget plugin to represent collection features including centroid,
 bounding box, oriented bounding box, convex hull and alpha shape.
 The SMLM datasets must be kept in a Locdata collection (locdata.references).
+Centroids and bounding boxes in 2d are computed for all collection elements at
+once.
 """
 
 from __future__ import annotations
@@ -27,6 +29,7 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.group_properties import GroupBy, collection_labels
 
 logger = logging.getLogger(__name__)
 
@@ -217,12 +220,39 @@ class RenderCollectionFeaturesQWidget(QWidget):  # type: ignore[misc]
         collection = self._prepare_collection_for_rendering()
         assert collection.references is not None  # type narrowing # noqa: S101
 
+        group_by: GroupBy | None = None
+        if collection.dimension == 2 and (
+            self._centroid_check_box.isChecked()
+            or self._bounding_box_check_box.isChecked()
+        ):
+            dataframe, labels = collection_labels(collection=collection)
+            coordinates = dataframe[collection.coordinate_keys].to_numpy()
+            group_by = GroupBy(labels=labels)
+
+        # empty references have no group and are skipped; in a series each
+        # group keeps the position of its reference.
+        series_indices: list[int] = (
+            list(range(len(collection.references)))  # type: ignore
+            if group_by is None
+            else group_by.labels.tolist()
+        )
+
         if self._centroid_check_box.isChecked():
-            reference_data = [locdata_.centroid for locdata_ in collection.references]  # type: ignore
+            if group_by is None:
+                reference_data = [
+                    locdata_.centroid
+                    for locdata_ in collection.references  # type: ignore
+                ]
+            else:
+                # weighted by uncertainties as for LocData.centroid
+                properties = group_by.properties(
+                    dataframe=dataframe, coordinate_keys=collection.coordinate_keys
+                )
+                reference_data = list(properties[collection.coordinate_keys].to_numpy())
             if as_series:
                 img_stack = [
                     np.insert(reference_, 0, i, axis=0)
-                    for i, reference_ in enumerate(reference_data)
+                    for i, reference_ in zip(series_indices, reference_data)
                 ]
                 data = np.array(img_stack)
             else:
@@ -236,14 +266,28 @@ class RenderCollectionFeaturesQWidget(QWidget):  # type: ignore[misc]
 
         if self._bounding_box_check_box.isChecked():
             try:
-                reference_data = [
-                    locdata_.bounding_box.region.points  # type: ignore
-                    for locdata_ in collection.references  # type: ignore
-                ]
+                if group_by is None:
+                    reference_data = [
+                        locdata_.bounding_box.region.points  # type: ignore
+                        for locdata_ in collection.references  # type: ignore
+                    ]
+                else:
+                    mins, maxs = group_by.bounding_boxes(coordinates=coordinates)
+                    reference_data = list(
+                        np.stack(
+                            [
+                                mins,
+                                np.stack([maxs[:, 0], mins[:, 1]], axis=1),
+                                maxs,
+                                np.stack([mins[:, 0], maxs[:, 1]], axis=1),
+                            ],
+                            axis=1,
+                        )
+                    )
                 if as_series:
                     shapes = [
                         np.insert(reference_, 0, i, axis=1)
-                        for i, reference_ in enumerate(reference_data)
+                        for i, reference_ in zip(series_indices, reference_data)
                     ]
                 else:
                     shapes = reference_data  # type: ignore
@@ -2,17 +2,37 @@
 Create regions of interest.
 
 A QWidget plugin for managing regions of interest.
+
+Regions of interest that refer to a SMLM dataset in SmlmData are applied
+using the spatial index that is cached for the dataset.
+All regions of interest can be applied at once, with the regions that refer
+to the same dataset being tested on the same coordinates and spatial index.
+The result is kept as one SMLM dataset per region of interest, as a single
+collection with one selection per region of interest or as region labels
+together with a table of region properties.
+
+Regions of interest that refer to a localization file are applied to
+localization data that is loaded through a shared cache.
+The file is parsed once and kept in a columnar cache from which
+memory-mapped localization data is loaded later.
+Regions of interest are applied in a background thread.
+
+All roi files in a directory are loaded or saved at once in parallel
+threads.
 """
 
 from __future__ import annotations
 
 import logging
 import os
+from collections.abc import Callable, Generator, Sequence
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import locan as lc
 import napari
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
@@ -32,6 +52,21 @@ from napari_locan import region_specifications, roi_specifications, smlm_data
 from napari_locan.data_model.region_specifications import RegionSpecifications
 from napari_locan.data_model.roi_specifications import RoiSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.columnar_cache import ColumnarCache
+from napari_locan.locan_io.load import LocDataFileCache
+from napari_locan.locan_io.project import LocDataPlaceholder
+from napari_locan.locan_io.roi_files import (
+    iterate_load_rois,
+    iterate_save_rois,
+    roi_file_names,
+    roi_file_paths,
+)
+from napari_locan.process.cluster_labels import cluster_properties
+from napari_locan.process.region_selection import (
+    REGION_LABEL_KEY,
+    region_labels,
+    select_by_regions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +84,8 @@ class RoiQWidget(QWidget):  # type: ignore
         self.smlm_data = smlm_data
         self.region_specifications = region_specifications
         self.roi_specifications = roi_specifications
+        self.file_cache = LocDataFileCache(columnar_cache=ColumnarCache())
+        self._progress_bar: progress | None = None
 
         self._add_regions_widgets()
         self._add_regions_text()
@@ -339,12 +376,39 @@ class RoiQWidget(QWidget):  # type: ignore
         self._save_roi_button.setToolTip("Save roi specifications to yaml file.")
         self._save_roi_button.clicked.connect(self._save_roi_button_on_click)
 
+        self._load_all_roi_button = QPushButton("Load all")
+        self._load_all_roi_button.setToolTip(
+            "Load roi specifications from all yaml files in a directory."
+        )
+        self._load_all_roi_button.clicked.connect(self._load_all_roi_button_on_click)
+
+        self._save_all_roi_button = QPushButton("Save all")
+        self._save_all_roi_button.setToolTip(
+            "Save all roi specifications as yaml files in a directory."
+        )
+        self._save_all_roi_button.clicked.connect(self._save_all_roi_button_on_click)
+
         self._apply_roi_button = QPushButton("Apply")
         self._apply_roi_button.setToolTip(
             "Create new SMLM dataset from roi specifications."
         )
         self._apply_roi_button.clicked.connect(self._apply_roi_button_on_click)
 
+        self._apply_all_roi_button = QPushButton("Apply all")
+        self._apply_all_roi_button.setToolTip(
+            "Create new SMLM datasets from all roi specifications."
+        )
+        self._apply_all_roi_button.clicked.connect(self._apply_all_roi_button_on_click)
+
+        self._roi_result_combobox = QComboBox()
+        self._roi_result_combobox.setToolTip(
+            "Keep the result of applying all roi specifications as one SMLM "
+            "dataset per roi, as a single collection with one selection per roi "
+            f"or as region labels in column {REGION_LABEL_KEY} with a table of "
+            "region properties."
+        )
+        self._roi_result_combobox.addItems(["Datasets", "Collection", "Labels"])
+
         self._create_roi_button = QPushButton("Create")
         self._create_roi_button.setToolTip(
             "Create roi specifications from current region."
@@ -356,10 +420,14 @@ class RoiQWidget(QWidget):  # type: ignore
         self._rois_buttons_layout_0.addWidget(self._delete_roi_button)
         self._rois_buttons_layout_0.addWidget(self._load_roi_button)
         self._rois_buttons_layout_0.addWidget(self._save_roi_button)
+        self._rois_buttons_layout_0.addWidget(self._load_all_roi_button)
+        self._rois_buttons_layout_0.addWidget(self._save_all_roi_button)
 
         self._rois_buttons_layout_1 = QHBoxLayout()
         self._rois_buttons_layout_1.addWidget(self._create_roi_button)
         self._rois_buttons_layout_1.addWidget(self._apply_roi_button)
+        self._rois_buttons_layout_1.addWidget(self._apply_all_roi_button)
+        self._rois_buttons_layout_1.addWidget(self._roi_result_combobox)
 
         self._rois_buttons_layout = QVBoxLayout()
         self._rois_buttons_layout.addWidget(self._rois_label)
@@ -525,8 +593,10 @@ class RoiQWidget(QWidget):  # type: ignore
             self.roi_specifications.count + 1 + len(new_regions),
         )
         names_list = [f"{i}-{repr_}" for i, repr_ in zip(region_identifier, repr_list)]
-        for region_, name_ in zip(new_regions, names_list):
-            self.region_specifications.append_item(dataset=region_, name=name_)
+        # a single signal emission for all regions
+        self.region_specifications.append_items(
+            datasets=list(new_regions), names=names_list
+        )
 
     def _delete_all_roi_button_on_click(self) -> None:
         msgBox = QMessageBox()
@@ -567,6 +637,12 @@ class RoiQWidget(QWidget):  # type: ignore
             raise KeyError("No item available to save.")
         else:
             roi = self.roi_specifications.dataset
+            if isinstance(roi.reference, LocDataPlaceholder):
+                roi = lc.Roi(
+                    reference=roi.reference.meta,
+                    region=roi.region,
+                    loc_properties=roi.loc_properties,
+                )
 
             # choose file interactively
             file_path = None if roi.reference is None else "roi_reference"
@@ -619,21 +695,371 @@ class RoiQWidget(QWidget):  # type: ignore
 
             napari.utils.notifications.show_info(f"Roi file was saved as: {roi_path}")
 
+    def _load_all_roi_button_on_click(
+        self, value: bool = False, directory: str | os.PathLike[Any] | None = None
+    ) -> None:
+        if directory is None:
+            directory = QFileDialog.getExistingDirectory(
+                None, "Open directory with roi files...", ""
+            )
+            if not directory:
+                return
+        file_paths = roi_file_paths(directory=directory)
+        if not file_paths:
+            napari.utils.notifications.show_info(
+                f"There are no roi files in: {directory}"
+            )
+            return
+
+        self._progress_bar = progress(total=len(file_paths))
+        self._progress_bar.set_description("Loading rois:")
+        self._set_rois_buttons_enabled(False)
+
+        def worker_return(return_value: list[lc.Roi]) -> None:
+            self.roi_specifications.append_items(
+                datasets=return_value, names=[path_.stem for path_ in file_paths]
+            )
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(
+                f"Loading roi files failed: {exception}"
+            )
+
+        worker = _load_rois_worker(
+            paths=file_paths,
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.yielded.connect(self._update_progress)
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _save_all_roi_button_on_click(
+        self, value: bool = False, directory: str | os.PathLike[Any] | None = None
+    ) -> None:
+        if not self.roi_specifications.datasets:
+            raise KeyError("No item available to save.")
+        if directory is None:
+            directory = QFileDialog.getExistingDirectory(
+                None, "Save roi files in directory...", ""
+            )
+            if not directory:
+                return
+        directory = Path(directory)
+        rois = list(self.roi_specifications.datasets)
+        file_paths = [
+            directory / file_name_
+            for file_name_ in roi_file_names(names=self.roi_specifications.names)
+        ]
+
+        self._progress_bar = progress(total=len(file_paths))
+        self._progress_bar.set_description("Saving rois:")
+        self._set_rois_buttons_enabled(False)
+
+        def worker_return(return_value: None) -> None:
+            napari.utils.notifications.show_info(
+                f"{len(file_paths)} roi files were saved in: {directory}"
+            )
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(
+                f"Saving roi files failed: {exception}"
+            )
+
+        worker = _save_rois_worker(
+            rois=rois,
+            paths=file_paths,
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.yielded.connect(self._update_progress)
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
     def _apply_roi_button_on_click(self) -> None:
         if self.roi_specifications.dataset is None:
             raise KeyError("No item available to apply.")
         else:
-            roi = self.roi_specifications.dataset
-            with progress() as progress_bar:
-                progress_bar.set_description("Selecting roi:")
-                new_locdata = roi.locdata()
-                self.smlm_data.append_item(
-                    locdata=new_locdata,
-                    locdata_name=new_locdata.meta.identifier
-                    + "-"
-                    + self._rois_combobox.currentText(),
-                    set_index=False,
+            self._apply_rois_thread_worker(
+                rois=[self.roi_specifications.dataset],
+                roi_names=[self._rois_combobox.currentText()],
+                result="Datasets",
+            )
+
+    def _apply_all_roi_button_on_click(self) -> None:
+        if not self.roi_specifications.datasets:
+            raise KeyError("No item available to apply.")
+        self._apply_rois_thread_worker(
+            rois=list(self.roi_specifications.datasets),
+            roi_names=list(self.roi_specifications.names),
+            result=self._roi_result_combobox.currentText(),
+        )
+
+    def _apply_rois_thread_worker(
+        self, rois: list[lc.Roi], roi_names: list[str], result: str
+    ) -> None:
+        if result not in ["Datasets", "Collection", "Labels"]:
+            raise ValueError("Current choice of combobox is not supported.")
+        for roi in rois:
+            if not isinstance(
+                roi.reference,
+                (lc.LocData, LocDataPlaceholder, lc.data.metadata_pb2.Metadata),
+            ):
+                raise AttributeError("Valid reference to locdata is missing.")
+
+        # placeholders are resolved in the main thread since loading them
+        # modifies smlm_data
+        rois, dataset_ids = self._resolve_rois(rois=rois)
+
+        self._progress_bar = progress()
+        self._progress_bar.set_description("Selecting rois:")
+        self._set_rois_buttons_enabled(False)
+
+        def worker_return(return_value: tuple[list[lc.LocData], list[str]]) -> None:
+            new_locdatas, locdata_names = return_value
+            self.smlm_data.append_items(
+                locdatas=new_locdatas, locdata_names=locdata_names, set_index=False
+            )
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(f"Applying rois failed: {exception}")
+
+        # localization files and other placeholders are loaded in the worker
+        # thread
+        worker = _apply_rois_worker(
+            apply_rois=partial(
+                self._apply_rois,
+                rois=rois,
+                roi_names=roi_names,
+                result=result,
+                dataset_ids=dataset_ids,
+            ),
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _update_progress(self, n_items_and_total: tuple[int, int]) -> None:
+        n_items, n_total = n_items_and_total
+        if self._progress_bar is not None:
+            self._progress_bar.total = n_total
+            self._progress_bar.update(n_items - self._progress_bar.n)
+
+    def _finish_progress(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._set_rois_buttons_enabled(True)
+
+    def _set_rois_buttons_enabled(self, enabled: bool) -> None:
+        """Enable buttons that start a background job on rois."""
+        for button in [
+            self._load_all_roi_button,
+            self._save_all_roi_button,
+            self._apply_roi_button,
+            self._apply_all_roi_button,
+        ]:
+            button.setEnabled(enabled)
+
+    def _apply_rois(
+        self,
+        rois: Sequence[lc.Roi],
+        roi_names: Sequence[str],
+        result: str,
+        dataset_ids: set[int],
+    ) -> tuple[list[lc.LocData], list[str]]:
+        """
+        Apply rois and return the new datasets together with their names.
+
+        The rois must be resolved by :meth:`_resolve_rois` with the returned
+        `dataset_ids`.
+        """
+        if result == "Datasets":
+            new_locdatas = self._rois_locdatas(rois=rois, dataset_ids=dataset_ids)
+            locdata_names = [
+                new_locdata.meta.identifier + "-" + name
+                for new_locdata, name in zip(new_locdatas, roi_names)
+            ]
+        elif result == "Collection":
+            # selections keep a reference instead of a copy of the data
+            collection = lc.LocData.from_collection(
+                self._rois_locdatas(rois=rois, dataset_ids=dataset_ids, reduce=False)
+            )
+            new_locdatas = [collection]
+            locdata_names = [collection.meta.identifier + "-roi-collection"]
+        elif result == "Labels":
+            new_locdatas = []
+            locdata_names = []
+            for labels in self._rois_labels(rois=rois, dataset_ids=dataset_ids):
+                properties = cluster_properties(
+                    locdata=labels, label_key=REGION_LABEL_KEY
+                ).reset_index()
+                regions = lc.LocData.from_dataframe(dataframe=properties)  # type: ignore[arg-type]
+                new_locdatas += [regions, labels]
+                locdata_names += [
+                    regions.meta.identifier + "-region-properties",
+                    labels.meta.identifier + "-region-labels",
+                ]
+        else:
+            raise ValueError("Current choice of combobox is not supported.")
+        return new_locdatas, locdata_names
+
+    def _roi_locdata(self, roi: lc.Roi) -> lc.LocData:
+        """Select localizations within roi."""
+        rois, dataset_ids = self._resolve_rois(rois=[roi])
+        return self._rois_locdatas(rois=rois, dataset_ids=dataset_ids)[0]
+
+    def _resolve_rois(self, rois: Sequence[lc.Roi]) -> tuple[list[lc.Roi], set[int]]:
+        """
+        Resolve references to placeholders for datasets in SmlmData.
+
+        Returns the rois with placeholders replaced by the loaded datasets and
+        the ids of all references that are datasets in SmlmData.
+        Loading placeholders modifies SmlmData, which must therefore be done
+        in the main thread.
+        """
+        rois_ = []
+        dataset_ids = set()
+        for roi in rois:
+            reference = roi.reference
+            if isinstance(reference, LocDataPlaceholder):
+                locdata = self.smlm_data.resolve(reference)
+                if locdata is not None:
+                    reference = locdata
+                    roi = lc.Roi(
+                        reference=reference,
+                        region=roi.region,
+                        loc_properties=roi.loc_properties,
+                    )
+            if isinstance(reference, lc.LocData) and self.smlm_data.contains(reference):
+                dataset_ids.add(id(reference))
+            rois_.append(roi)
+        return rois_, dataset_ids
+
+    def _rois_locdatas(
+        self, rois: Sequence[lc.Roi], dataset_ids: set[int], reduce: bool = True
+    ) -> list[lc.LocData]:
+        """
+        Select localizations within each roi.
+
+        For references to datasets in SmlmData, given by `dataset_ids`, the
+        cached spatial index is used and all rois on the same dataset are
+        applied together.
+        Localization files that rois refer to are loaded through file_cache
+        and all rois on the same file are applied together.
+        """
+        other_rois, groups = self._group_rois(rois=rois, dataset_ids=dataset_ids)
+        new_locdatas = {
+            index: roi.locdata(reduce=reduce) for index, roi in other_rois.items()
+        }
+        for (_, loc_properties_), (locdata, indices) in groups.items():
+            # the spatial index is only cached for datasets in SmlmData
+            spatial_index = self.smlm_data.spatial_index(
+                locdata=locdata, loc_properties=list(loc_properties_)
+            )
+            new_locdatas_ = select_by_regions(
+                locdata=locdata,
+                regions=[rois[index].region for index in indices],
+                loc_properties=list(loc_properties_),
+                reduce=reduce,
+                spatial_index=spatial_index,
+            )
+            new_locdatas.update(zip(indices, new_locdatas_))
+        return [new_locdatas[index] for index in range(len(rois))]
+
+    def _rois_labels(
+        self, rois: Sequence[lc.Roi], dataset_ids: set[int]
+    ) -> list[lc.LocData]:
+        """
+        Label localizations by the roi that they are in.
+
+        One LocData object with region labels is returned for each dataset
+        in SmlmData, given by `dataset_ids`, that rois refer to.
+        The labels are the positions of the rois in `rois`.
+        """
+        other_rois, groups = self._group_rois(rois=rois, dataset_ids=dataset_ids)
+        # region labels are added to the dataset and must not modify the
+        # localization data that is shared by file_cache
+        if other_rois or not all(
+            id(locdata) in dataset_ids for locdata, _ in groups.values()
+        ):
+            raise ValueError(
+                "Region labels require all rois to refer to non-empty SMLM datasets."
+            )
+        labels = []
+        for (_, loc_properties_), (locdata, indices) in groups.items():
+            spatial_index = self.smlm_data.spatial_index(
+                locdata=locdata, loc_properties=list(loc_properties_)
+            )
+            labels_ = region_labels(
+                locdata=locdata,
+                regions=[rois[index].region for index in indices],
+                loc_properties=list(loc_properties_),
+                labels=indices,
+                spatial_index=spatial_index,
+            )
+            labels.append(labels_)
+        return labels
+
+    def _group_rois(self, rois: Sequence[lc.Roi], dataset_ids: set[int]) -> tuple[
+        dict[int, lc.Roi],
+        dict[tuple[int, tuple[str, ...]], tuple[lc.LocData, list[int]]],
+    ]:
+        """
+        Group rois that refer to the same dataset in SmlmData or the same
+        localization file.
+
+        Returns rois that do not refer to a non-empty dataset in SmlmData,
+        given by `dataset_ids`, or to a localization file by their position
+        in rois and the positions of all other rois grouped by dataset and
+        loc_properties.
+        Placeholders for datasets that are not in SmlmData are loaded.
+        """
+        other_rois: dict[int, lc.Roi] = {}
+        groups: dict[tuple[int, tuple[str, ...]], tuple[lc.LocData, list[int]]] = {}
+        for index, roi in enumerate(rois):
+            reference = roi.reference
+            is_file_reference = False
+            if isinstance(reference, LocDataPlaceholder):
+                reference = reference.load()
+                roi = lc.Roi(
+                    reference=reference,
+                    region=roi.region,
+                    loc_properties=roi.loc_properties,
                 )
+            elif (
+                isinstance(reference, lc.data.metadata_pb2.Metadata)
+                and reference.file.path
+            ):
+                reference = self.file_cache.load(
+                    path=reference.file.path, file_type=reference.file.type
+                )
+                is_file_reference = True
+            if (
+                not isinstance(reference, lc.LocData)
+                or not (is_file_reference or id(reference) in dataset_ids)
+                or not len(reference)
+            ):
+                other_rois[index] = roi
+                continue
+
+            if roi.loc_properties:
+                loc_properties = list(roi.loc_properties)
+            else:
+                loc_properties = list(
+                    reference.coordinate_keys[0 : roi.region.dimension]
+                )
+            key = (id(reference), tuple(loc_properties))
+            groups.setdefault(key, (reference, []))[1].append(index)
+
+        return other_rois, groups
 
     def _create_roi_button_on_click(self) -> None:
         if self.region_specifications.dataset is None:
@@ -712,3 +1138,25 @@ class RoiQWidget(QWidget):  # type: ignore
             except KeyError as exception:
                 raise KeyError("Please select a valid shapes layer.") from exception
         return layer
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _apply_rois_worker(
+    apply_rois: Callable[[], tuple[list[lc.LocData], list[str]]],
+) -> tuple[list[lc.LocData], list[str]]:
+    return apply_rois()
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _load_rois_worker(
+    paths: list[Path],
+) -> Generator[tuple[int, int], None, list[lc.Roi]]:
+    rois = yield from iterate_load_rois(paths=paths)
+    return rois
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _save_rois_worker(
+    rois: list[lc.Roi], paths: list[Path]
+) -> Generator[tuple[int, int], None, None]:
+    yield from iterate_save_rois(rois=rois, paths=paths)
@@ -4,21 +4,38 @@ Select localizations from SMLM dataset.
 A QWidget plugin to select localizations in current SMLM dataset based on a
 filter specification.
 A new SMLM dataset will be created.
+The filter specification is evaluated as boolean masks on the localization
+properties (see :mod:`napari_locan.process.filter_selection`).
+A preview shows the number of selected localizations and an overlay of the
+selected localization coordinates while the filter specification is changed.
+The range of localization properties is taken from summary statistics that
+are computed in a background thread once a SMLM dataset is selected
+(see :meth:`napari_locan.data_model.smlm_data.SmlmData.property_statistics`).
+The filter specification can be applied to several SMLM datasets at once,
+which are processed in parallel threads in the background.
 """
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable, Generator
+from copy import deepcopy
 
 import locan as lc
+import napari
+import numpy as np
+from napari.layers import Points
+from napari.qt.threading import thread_worker
 from napari.utils import progress
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
+    QAbstractItemView,
     QCheckBox,
     QComboBox,
     QDoubleSpinBox,
     QHBoxLayout,
     QLabel,
+    QListWidget,
     QPlainTextEdit,
     QPushButton,
     QVBoxLayout,
@@ -28,9 +45,19 @@ from qtpy.QtWidgets import (
 from napari_locan import filter_specifications, smlm_data
 from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import LocDataPlaceholder
+from napari_locan.process.filter_selection import (
+    FilterPreview,
+    iterate_select_by_selectors,
+    select_by_selectors,
+)
+from napari_locan.process.property_statistics import numeric_loc_properties
 
 logger = logging.getLogger(__name__)
 
+# maximum number of localizations shown in the preview overlay
+PREVIEW_MAX_POINTS: int = 100_000
+
 
 class SelectQWidget(QWidget):  # type: ignore[misc]
     def __init__(
@@ -45,15 +72,22 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
         self.filter_specifications = filter_specifications
         if self.filter_specifications.dataset is None:
             self.filter_specifications.append_item(dataset={})
+        self._filter_preview: FilterPreview | None = None
+        self._preview_layer: Points | None = None
+        self._progress_bar: progress | None = None
 
         self._add_loc_property_selector()
         self._add_selection_tools()
         self._add_condition_text()
+        self._add_preview()
+        self._add_batch()
         self._add_buttons()
 
         self._connect_loc_property_selector()
         self._connect_selection_tools()
         self._connect_condition_text()
+        self._connect_preview()
+        self._connect_batch()
         self._connect_buttons()
 
         self._init_widget_values()
@@ -77,6 +111,9 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
         self._loc_property_selector_layout.addWidget(self._loc_property_combobox)
 
     def _connect_loc_property_selector(self) -> None:
+        self.smlm_data.index_changed_signal.connect(
+            self._compute_property_statistics_thread_worker
+        )
         self.smlm_data.index_changed_signal.connect(
             self._loc_property_combobox_slot_for_smlm_data_index
         )
@@ -125,6 +162,49 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
             self._filter_specifications_index_on_changed
         )
 
+    def _add_preview(self) -> None:
+        self._preview_check_box = QCheckBox("Preview")
+        self._preview_check_box.setToolTip(
+            "Show the number of selected localizations and an overlay of the "
+            "selected localizations while changing the filter specification."
+        )
+        self._preview_check_box.setChecked(False)
+        self._preview_label = QLabel("")
+
+        self._preview_layout = QHBoxLayout()
+        self._preview_layout.addWidget(self._preview_check_box)
+        self._preview_layout.addWidget(self._preview_label)
+
+    def _connect_preview(self) -> None:
+        self._preview_check_box.stateChanged.connect(self._update_preview)
+        self.smlm_data.index_changed_signal.connect(self._update_preview)
+
+    def _add_batch(self) -> None:
+        self._batch_check_box = QCheckBox("Apply to several items")
+        self._batch_check_box.setToolTip(
+            "Filter the chosen SMLM datasets or all SMLM datasets if none is "
+            "chosen in parallel and keep each selection as new SMLM dataset."
+        )
+        self._batch_check_box.setChecked(False)
+        self._items_list_widget = QListWidget()
+        self._items_list_widget.setSelectionMode(
+            QAbstractItemView.ExtendedSelection  # type: ignore[attr-defined]
+        )
+        self._items_list_widget.setHidden(True)
+
+        self._batch_layout = QVBoxLayout()
+        self._batch_layout.addWidget(self._batch_check_box)
+        self._batch_layout.addWidget(self._items_list_widget)
+
+    def _connect_batch(self) -> None:
+        self._batch_check_box.stateChanged.connect(self._batch_check_box_on_changed)
+        self.smlm_data.locdata_names_changed_signal.connect(
+            self._items_list_widget_slot_for_smlm_data_names
+        )
+        self._items_list_widget_slot_for_smlm_data_names(
+            locdata_names=self.smlm_data.locdata_names
+        )
+
     def _add_buttons(self) -> None:
         self._select_button = QPushButton("Select")
         self._select_button.setToolTip(
@@ -139,6 +219,7 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
         self._select_button.clicked.connect(self._select_button_on_click)
 
     def _init_widget_values(self) -> None:
+        self._compute_property_statistics_thread_worker(index=self.smlm_data.index)
         try:
             self._loc_property_combobox.setCurrentIndex(0)
         except IndexError:
@@ -151,6 +232,8 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
         layout.addLayout(self._loc_property_selector_layout)
         layout.addLayout(self._selection_tools_layout)
         layout.addLayout(self._condition_text_layout)
+        layout.addLayout(self._preview_layout)
+        layout.addLayout(self._batch_layout)
         layout.addLayout(self._buttons_layout)
         self.setLayout(layout)
 
@@ -207,25 +290,32 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
                     self.filter_specifications.dataset[loc_property].activate  # type: ignore[index]
                 )
             else:
-                self._lower_bound_spinbox.setValue(
-                    self.smlm_data.locdata.data[loc_property].min()  # type: ignore[union-attr]
-                )
-                self._upper_bound_spinbox.setValue(
-                    self.smlm_data.locdata.data[loc_property].max()  # type: ignore[union-attr]
+                statistics = self.smlm_data.property_statistics(
+                    loc_property=loc_property
                 )
+                self._lower_bound_spinbox.setValue(statistics.min)
+                self._upper_bound_spinbox.setValue(statistics.max)
                 self._apply_checkbox.setChecked(False)
 
     def _get_spinbox_boundaries(self) -> tuple[float, float]:
         loc_property = self._loc_property_combobox.currentText()
         if self.smlm_data.locdata is None:
-            min_, max_ = 0, 0
+            min_, max_ = 0.0, 0.0
         else:
-            min_value = self.smlm_data.locdata.data[loc_property].min()
-            max_value = self.smlm_data.locdata.data[loc_property].max()
-            min_ = min_value * 10 if min_value < 0 else 0
-            max_ = max_value * 10
+            statistics = self.smlm_data.property_statistics(loc_property=loc_property)
+            min_ = statistics.min * 10 if statistics.min < 0 else 0
+            max_ = statistics.max * 10
         return min_, max_
 
+    def _compute_property_statistics_thread_worker(self, index: int) -> None:
+        locdata = self.smlm_data.locdata
+        if index == -1 or locdata is None:
+            return
+        worker = _compute_property_statistics_worker(
+            smlm_data=self.smlm_data, locdata=locdata
+        )
+        worker.start()
+
     def _filter_specifications_index_on_changed(self) -> None:
         if self.filter_specifications.index == -1:
             self._loc_property_combobox.setCurrentIndex(-1)
@@ -248,6 +338,7 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
                 )
 
         self._update_condition_text()
+        self._update_preview()
 
     def _apply_checkbox_on_changed(self) -> None:
         loc_property = self._loc_property_combobox.currentText()
@@ -264,7 +355,12 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
                     upper_bound=self._upper_bound_spinbox.value(),
                 )
                 self.filter_specifications.dataset[loc_property] = selector  # type: ignore[index]
+            # the selected dataset is modified in place
+            self.filter_specifications.datasets_changed_signal.emit(
+                self.filter_specifications.datasets
+            )
             self._update_condition_text()
+            self._update_preview()
 
     def _lower_bound_spinbox_on_changed(self) -> None:
         loc_property = self._loc_property_combobox.currentText()
@@ -281,7 +377,12 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
                     upper_bound=self._upper_bound_spinbox.value(),
                 )
                 self.filter_specifications.dataset[loc_property] = selector  # type: ignore[index]
+            # the selected dataset is modified in place
+            self.filter_specifications.datasets_changed_signal.emit(
+                self.filter_specifications.datasets
+            )
             self._update_condition_text()
+            self._update_preview()
 
     def _upper_bound_spinbox_on_changed(self) -> None:
         loc_property = self._loc_property_combobox.currentText()
@@ -298,7 +399,12 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
                     upper_bound=self._upper_bound_spinbox.value(),
                 )
                 self.filter_specifications.dataset[loc_property] = selector  # type: ignore[index]
+            # the selected dataset is modified in place
+            self.filter_specifications.datasets_changed_signal.emit(
+                self.filter_specifications.datasets
+            )
             self._update_condition_text()
+            self._update_preview()
 
     def _update_condition_text(self) -> None:
         if self.filter_specifications.index != -1:
@@ -307,7 +413,69 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
         else:
             self._condition_text_edit.setPlainText("")
 
+    def _update_preview(self) -> None:
+        locdata = self.smlm_data.locdata
+        if (
+            not self._preview_check_box.isChecked()
+            or locdata is None
+            or self.filter_specifications.dataset is None
+        ):
+            self._preview_label.setText("")
+            self._remove_preview_layer()
+            return
+
+        if self._filter_preview is None or self._filter_preview.locdata is not locdata:
+            self._filter_preview = FilterPreview(locdata=locdata)
+        selectors = list(self.filter_specifications.dataset.values())
+        try:
+            n_selected = self._filter_preview.count(selectors=selectors)
+        except KeyError as exception:
+            self._preview_label.setText(str(exception))
+            self._remove_preview_layer()
+            return
+        self._preview_label.setText(
+            f"{n_selected} of {len(locdata)} localizations selected"
+        )
+
+        coordinate_keys = locdata.coordinate_keys
+        if not coordinate_keys:
+            return
+        indices = self._filter_preview.indices(
+            selectors=selectors, max_points=PREVIEW_MAX_POINTS
+        )
+        locdata_data = locdata.data
+        data = np.column_stack(
+            [locdata_data[key].to_numpy()[indices] for key in coordinate_keys]
+        )
+        if self._preview_layer is None or self._preview_layer not in self.viewer.layers:
+            self._preview_layer = self.viewer.add_points(
+                data=data, name="Filter preview", face_color="yellow"
+            )
+        else:
+            self._preview_layer.data = data
+
+    def _remove_preview_layer(self) -> None:
+        if (
+            self._preview_layer is not None
+            and self._preview_layer in self.viewer.layers
+        ):
+            self.viewer.layers.remove(self._preview_layer)
+        self._preview_layer = None
+
+    def _batch_check_box_on_changed(self) -> None:
+        self._items_list_widget.setHidden(not self._batch_check_box.isChecked())
+
+    def _items_list_widget_slot_for_smlm_data_names(
+        self, locdata_names: list[str]
+    ) -> None:
+        self._items_list_widget.clear()
+        self._items_list_widget.addItems(locdata_names)
+
     def _select_button_on_click(self) -> None:
+        if self._batch_check_box.isChecked():
+            self._select_items_thread_worker()
+            return
+
         locdata = self.smlm_data.locdata
         if locdata is None:
             raise ValueError("There is no SMLM data available.")
@@ -319,10 +487,88 @@ class SelectQWidget(QWidget):  # type: ignore[misc]
 
         with progress() as progress_bar:
             progress_bar.set_description("Selecting:")
-            new_locdata = lc.select_by_condition(
-                locdata=locdata, condition=self.filter_specifications.filter_condition
+            new_locdata = select_by_selectors(
+                locdata=locdata,
+                selectors=self.filter_specifications.dataset.values(),  # type: ignore[union-attr]
             )
             self.smlm_data.append_item(
                 locdata=new_locdata,
                 locdata_name=new_locdata.meta.identifier + "-selection",
             )
+
+    def _select_items_thread_worker(self) -> None:
+        if not self.filter_specifications.filter_condition:
+            raise ValueError("Filter condition cannot be an empty string.")
+        indices = sorted(
+            index.row() for index in self._items_list_widget.selectedIndexes()
+        )
+        if not indices:
+            indices = list(range(len(self.smlm_data.locdatas)))
+        if not indices:
+            raise ValueError("There is no SMLM data available.")
+
+        # placeholders are loaded in the worker thread
+        locdatas: list[lc.LocData | Callable[[], lc.LocData]] = []
+        for index in indices:
+            item = self.smlm_data.locdatas[index]
+            locdatas.append(item.load if isinstance(item, LocDataPlaceholder) else item)
+        locdata_names = [
+            self.smlm_data.locdata_names[index] + "-selection" for index in indices
+        ]
+        # the filter specification may change while the worker is running
+        selectors = deepcopy(list(self.filter_specifications.dataset.values()))  # type: ignore[union-attr]
+
+        self._progress_bar = progress(total=len(locdatas))
+        self._progress_bar.set_description("Selecting:")
+        self._select_button.setEnabled(False)
+
+        def worker_return(return_value: list[lc.LocData]) -> None:
+            self.smlm_data.append_items(
+                locdatas=return_value, locdata_names=locdata_names
+            )
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(f"Selection failed: {exception}")
+
+        worker = _select_items_worker(
+            locdatas=locdatas,
+            selectors=selectors,
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.yielded.connect(self._update_progress)
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(self._finish_progress)
+        worker.start()
+
+    def _update_progress(self, n_items_and_total: tuple[int, int]) -> None:
+        n_items, n_total = n_items_and_total
+        if self._progress_bar is not None:
+            self._progress_bar.total = n_total
+            self._progress_bar.update(n_items - self._progress_bar.n)
+
+    def _finish_progress(self) -> None:
+        if self._progress_bar is not None:
+            self._progress_bar.close()
+        self._progress_bar = None
+        self._select_button.setEnabled(True)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _compute_property_statistics_worker(
+    smlm_data: SmlmData, locdata: lc.LocData
+) -> None:
+    for loc_property in numeric_loc_properties(dataframe=locdata.data):
+        smlm_data.property_statistics(loc_property=loc_property, locdata=locdata)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _select_items_worker(
+    locdatas: list[lc.LocData | Callable[[], lc.LocData]],
+    selectors: list[lc.Selector],
+) -> Generator[tuple[int, int], None, list[lc.LocData]]:
+    new_locdatas = yield from iterate_select_by_selectors(
+        locdatas=locdatas, selectors=selectors
+    )
+    return list(new_locdatas)
@@ -2,6 +2,9 @@
 Show data statistics for a SMLM dataset.
 
 A QWidget plugin for showing locdata data statistics (locdata.data.describe()).
+The statistics are computed for each localization property in a background
+thread and cached for the SMLM dataset
+(see :meth:`napari_locan.data_model.smlm_data.SmlmData.property_statistics`).
 """
 
 from __future__ import annotations
@@ -9,6 +12,9 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import locan as lc
+import pandas as pd
+from napari.qt.threading import thread_worker
 from napari.viewer import Viewer
 from qtpy.QtCore import QAbstractTableModel, Qt  # type: ignore[attr-defined]
 from qtpy.QtWidgets import (
@@ -20,6 +26,7 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.property_statistics import describe, numeric_loc_properties
 
 logger = logging.getLogger(__name__)
 
@@ -69,15 +76,32 @@ class ShowDataQWidget(QWidget):  # type: ignore
         self.smlm_data.index_changed_signal.emit(self.smlm_data.index)
 
     def _update_table_view(self) -> None:
-        if self.smlm_data.index != -1:
-            self.model: TableModel | None = TableModel(
-                data=self.smlm_data.locdata.data.describe()  # type: ignore
-            )
-        else:
-            self.model = None
+        self.model: TableModel | None = None
         self._table_view.setModel(self.model)
+        locdata = self.smlm_data.locdata
+        if self.smlm_data.index == -1 or locdata is None:
+            return
+
+        def worker_return(return_value: pd.DataFrame) -> None:
+            # ignore results for a dataset that is no longer selected
+            if self.smlm_data.locdata is not locdata:
+                return
+            self.model = TableModel(data=return_value)
+            self._table_view.setModel(self.model)
+
+        worker = _describe_worker(smlm_data=self.smlm_data, locdata=locdata)
+        worker.returned.connect(worker_return)
+        worker.start()
 
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
         layout.addLayout(self._table_view_layout)
         self.setLayout(layout)
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _describe_worker(smlm_data: SmlmData, locdata: lc.LocData) -> pd.DataFrame:
+    return describe(
+        smlm_data.property_statistics(loc_property=loc_property, locdata=locdata)
+        for loc_property in numeric_loc_properties(dataframe=locdata.data)
+    )
@@ -7,8 +7,11 @@ for a single SMLM dataset.
 
 import logging
 from collections.abc import Iterable
+from typing import Any
 
 import locan as lc
+import numpy as np
+import numpy.typing as npt
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
     QCheckBox,
@@ -20,6 +23,8 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.cluster_labels import LABEL_KEY
+from napari_locan.process.selection_view import SelectionView
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +38,10 @@ class ShowInfoQWidget(QWidget):  # type: ignore
         self._add_information_meta()
         self._add_information_collection()
         self._add_information_selection()
+        self._add_information_selection_view()
         self._add_information_coordinate_dimension()
         self._add_information_localization_count()
+        self._add_information_cluster_count()
         self.smlm_data.index_changed_signal.emit(self.smlm_data.index)
         self._set_layout()
 
@@ -78,6 +85,26 @@ class ShowInfoQWidget(QWidget):  # type: ignore
             self._information_selection_checkbox
         )
 
+    def _add_information_selection_view(self) -> None:
+        self._information_selection_view_text_edit = QLabel()
+        self._information_selection_view_label = QLabel("Selected from:")
+        self._information_selection_view_label.setToolTip(
+            "Number of localizations in the referenced LocData instance for a "
+            "selection that keeps only a mask and no copy of the localization data."
+        )
+
+        self.smlm_data.index_changed_signal.connect(
+            self._update_information_selection_view
+        )
+
+        self._information_selection_view_layout = QHBoxLayout()
+        self._information_selection_view_layout.addWidget(
+            self._information_selection_view_label
+        )
+        self._information_selection_view_layout.addWidget(
+            self._information_selection_view_text_edit
+        )
+
     def _add_information_coordinate_dimension(self) -> None:
         self._information_coordinate_dimension_text_edit = QLabel()
         self._information_coordinate_dimension_label = QLabel(
@@ -118,6 +145,26 @@ class ShowInfoQWidget(QWidget):  # type: ignore
             self._information_localization_count_text_edit
         )
 
+    def _add_information_cluster_count(self) -> None:
+        self._information_cluster_count_text_edit = QLabel()
+        self._information_cluster_count_label = QLabel("Number of clusters:")
+        self._information_cluster_count_label.setToolTip(
+            "Number of elements in a collection or number of clusters "
+            f"given by the cluster labels in column {LABEL_KEY}."
+        )
+
+        self.smlm_data.index_changed_signal.connect(
+            self._update_information_cluster_count
+        )
+
+        self._information_cluster_count_layout = QHBoxLayout()
+        self._information_cluster_count_layout.addWidget(
+            self._information_cluster_count_label
+        )
+        self._information_cluster_count_layout.addWidget(
+            self._information_cluster_count_text_edit
+        )
+
     def _update_information_meta(self) -> None:
         if (
             self.smlm_data.index != -1
@@ -150,6 +197,19 @@ class ShowInfoQWidget(QWidget):  # type: ignore
         else:
             self._information_selection_checkbox.setChecked(False)
 
+    def _update_information_selection_view(self) -> None:
+        locdata = self.smlm_data.locdata
+        if (
+            self.smlm_data.index != -1
+            and isinstance(locdata, SelectionView)
+            and locdata.is_view
+        ):
+            self._information_selection_view_text_edit.setText(
+                f"{len(locdata)} of {locdata.n_references} localizations"
+            )
+        else:
+            self._information_selection_view_text_edit.clear()
+
     def _update_information_coordinate_dimension(self) -> None:
         if self.smlm_data.index != -1 and self.smlm_data.locdata is not None:
             self._information_coordinate_dimension_text_edit.setNum(
@@ -166,11 +226,40 @@ class ShowInfoQWidget(QWidget):  # type: ignore
         else:
             self._information_localization_count_text_edit.clear()
 
+    def _update_information_cluster_count(self) -> None:
+        locdata = self.smlm_data.locdata
+        if self.smlm_data.index == -1 or locdata is None:
+            self._information_cluster_count_text_edit.clear()
+        elif isinstance(locdata.references, list):
+            self._information_cluster_count_text_edit.setNum(len(locdata.references))
+        elif (
+            isinstance(locdata, SelectionView)
+            and locdata.is_view
+            and LABEL_KEY in locdata.columns
+        ):
+            # only the label column is taken from the referenced data
+            references = locdata.references
+            assert isinstance(references, lc.LocData)  # type narrowing # noqa: S101
+            labels = references.data[LABEL_KEY].to_numpy()[locdata.positions]
+            self._information_cluster_count_text_edit.setNum(_n_clusters(labels))
+        elif LABEL_KEY in locdata.data.columns:
+            labels = locdata.data[LABEL_KEY].to_numpy()
+            self._information_cluster_count_text_edit.setNum(_n_clusters(labels))
+        else:
+            self._information_cluster_count_text_edit.clear()
+
     def _set_layout(self) -> None:
         layout = QVBoxLayout()
         layout.addLayout(self._information_meta_layout)
         layout.addLayout(self._information_collection_layout)
         layout.addLayout(self._information_selection_layout)
+        layout.addLayout(self._information_selection_view_layout)
         layout.addLayout(self._information_coordinate_dimension_layout)
         layout.addLayout(self._information_localization_count_layout)
+        layout.addLayout(self._information_cluster_count_layout)
         self.setLayout(layout)
+
+
+def _n_clusters(labels: npt.NDArray[Any]) -> int:
+    """Number of distinct cluster labels without negative labels for noise."""
+    return int(np.unique(labels[labels >= 0]).size)
@@ -5,12 +5,16 @@ QWidget plugin to access SMLM datasets from which images are rendered
 and localization-based analysis procedures are computed.
 Each dataset is kept as locdata, i.e. a locan.LocData object with metadata,
 aggregated properties, and localization properties for all localizations.
+The selected dataset can be saved as ASDF file in a background thread.
 """
 
 import logging
+from collections.abc import Generator
 from pathlib import Path
 
 import locan as lc
+import napari
+from napari.qt.threading import thread_worker
 from napari.viewer import Viewer
 from qtpy.QtWidgets import (
     QComboBox,
@@ -24,6 +28,7 @@ from qtpy.QtWidgets import (
 
 from napari_locan import smlm_data
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.save import iterate_save_locdata
 
 logger = logging.getLogger(__name__)
 
@@ -115,7 +120,39 @@ class SmlmDataQWidget(QWidget):  # type: ignore
                 caption="Provide file name and path to save data",
                 filter="ASDF file (*.asdf)",
             )
-            file_path = Path(file_path_return[0])
-            print("Save SmlmDdata at:", file_path)
-            if file_path:
-                lc.save_asdf(locdata=self.smlm_data.locdata, path=file_path)  # type: ignore[arg-type]
+            if file_path_return[0]:
+                self._save_thread_worker(file_path=Path(file_path_return[0]))
+
+    def _save_thread_worker(self, file_path: Path) -> None:
+        # the file dialog does not append the suffix
+        if file_path.suffix != ".asdf":
+            file_path = file_path.with_name(file_path.name + ".asdf")
+        logger.info("Save SMLM data at: %s", file_path)
+        self._save_button.setEnabled(False)
+
+        def worker_return() -> None:
+            napari.utils.notifications.show_info(f"Saved {file_path}.")
+
+        def worker_errored(exception: Exception) -> None:
+            napari.utils.notifications.show_error(f"Saving failed: {exception}")
+
+        worker = _save_asdf_worker(
+            locdata=self.smlm_data.locdata,
+            path=file_path,
+            # errors are shown by worker_errored instead of being re-raised
+            _ignore_errors=True,
+        )
+        worker.returned.connect(worker_return)
+        worker.errored.connect(worker_errored)
+        worker.finished.connect(lambda: self._save_button.setEnabled(True))
+        worker.start()
+
+
+@thread_worker  # type: ignore[misc, untyped-decorator]
+def _save_asdf_worker(
+    locdata: lc.LocData, path: Path
+) -> Generator[tuple[int, int], None, None]:
+    """Save locdata as ASDF file and yield the number of written localizations."""
+    yield from iterate_save_locdata(
+        locdata=locdata, path=path, file_type=lc.FileType.ASDF.name
+    )
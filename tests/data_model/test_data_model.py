@@ -91,6 +91,45 @@ class TestDataModel:
         assert len(data_model.datasets) == 2
         assert data_model.names == ["1", "2"]
 
+    def test_append_items(self):
+        data_model = DataModel()
+        n_emissions = []
+        data_model.names_changed_signal.connect(lambda names: n_emissions.append(names))
+        data_model.index_changed_signal.connect(lambda index: n_emissions.append(index))
+        data_model.append_items(datasets=[lc.LocData(), lc.LocData()])
+        assert data_model.index == 1
+        assert data_model.names == ["1", "2"]
+        assert data_model.count == 2
+        assert len(n_emissions) == 2
+
+        data_model.append_items(datasets=[3, 4], names=["a", "b"], set_index=False)
+        assert data_model.index == 1
+        assert data_model.names == ["1", "2", "a", "b"]
+        assert data_model.count == 4
+        assert len(n_emissions) == 4
+
+        data_model.append_items(datasets=[])
+        assert len(n_emissions) == 4
+
+        with pytest.raises(ValueError):
+            data_model.append_items(datasets=[5], names=[])
+
+    def test_is_dirty(self):
+        data_model = DataModel(datasets=[1, 2])
+        assert data_model.is_dirty
+        data_model.mark_clean()
+        assert not data_model.is_dirty
+        data_model.index = 0
+        assert not data_model.is_dirty
+        data_model.datasets_changed_signal.emit(data_model.datasets)
+        assert data_model.is_dirty
+        data_model.mark_clean()
+        data_model.append_item(dataset=3)
+        assert data_model.is_dirty
+        data_model.mark_clean()
+        data_model.delete_all()
+        assert data_model.is_dirty
+
     def test_connect(self):
         def names_slot(locdata_names):
             warnings.warn("Name changed.", stacklevel=1)
@@ -1,9 +1,14 @@
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 import locan as lc
 import pytest
 
+import napari_locan.data_model.smlm_data as smlm_data_module
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import LocDataPlaceholder, load_project, save_project
+from napari_locan.process.property_statistics import PropertyStatistics
+from napari_locan.process.spatial_index import SpatialIndex
 
 
 class TestSmlmData:
@@ -92,6 +97,334 @@ class TestSmlmData:
         assert len(smlm_data.locdatas) == 2
         assert smlm_data.locdata_names == ["1", "2"]
 
+    def test_append_items(self):
+        smlm_data = SmlmData()
+        n_emissions = []
+        smlm_data.locdata_names_changed_signal.connect(
+            lambda names: n_emissions.append(names)
+        )
+        smlm_data.append_items(locdatas=[lc.LocData(), lc.LocData()])
+        assert len(smlm_data.locdatas) == 2
+        assert smlm_data.index == 1
+        assert len(n_emissions) == 1
+
+        smlm_data.append_items(
+            locdatas=[lc.LocData()], locdata_names=["3"], set_index=False
+        )
+        assert smlm_data.locdata_names[-1] == "3"
+        assert smlm_data.index == 1
+        assert len(n_emissions) == 2
+
+        smlm_data.append_items(locdatas=[])
+        assert len(n_emissions) == 2
+
+        with pytest.raises(ValueError):
+            smlm_data.append_items(locdatas=[lc.LocData()], locdata_names=[])
+
+    def test_spatial_index(self, locdata_2d, locdata_two_cluster_with_noise_2d):
+        smlm_data = SmlmData()
+        with pytest.raises(ValueError):
+            smlm_data.spatial_index()
+
+        smlm_data = SmlmData(locdatas=[locdata_2d, locdata_two_cluster_with_noise_2d])
+        spatial_index = smlm_data.spatial_index()
+        assert len(spatial_index) == len(locdata_two_cluster_with_noise_2d)
+        assert spatial_index.loc_properties == ["position_x", "position_y"]
+        assert smlm_data.spatial_index() is spatial_index
+        assert smlm_data.spatial_index(locdata=locdata_2d) is not spatial_index
+        assert smlm_data.spatial_index(locdata=locdata_2d) is smlm_data.spatial_index(
+            locdata=locdata_2d
+        )
+        spatial_index_x = smlm_data.spatial_index(loc_properties=["position_x"])
+        assert spatial_index_x.dimension == 1
+        assert len(smlm_data._spatial_indices) == 3
+
+        # locdata not in smlm_data is not cached
+        other = smlm_data.spatial_index(
+            locdata=lc.LocData.from_dataframe(dataframe=locdata_2d.data)
+        )
+        assert len(other) == len(locdata_2d)
+        assert len(smlm_data._spatial_indices) == 3
+
+        with pytest.raises(ValueError):
+            smlm_data.spatial_index(locdata=lc.LocData())
+
+        # in-place modifications of the coordinates are detected
+        locdata = lc.LocData.from_dataframe(dataframe=locdata_2d.data.astype(float))
+        smlm_data.append_item(locdata)
+        spatial_index = smlm_data.spatial_index()
+        assert smlm_data.spatial_index() is spatial_index
+        locdata.dataframe.loc[0, "position_x"] = 100
+        new_spatial_index = smlm_data.spatial_index()
+        assert new_spatial_index is not spatial_index
+        assert new_spatial_index.points[0, 0] == 100
+        smlm_data.delete_item()
+
+        smlm_data.locdata = locdata_2d
+        assert len(smlm_data._spatial_indices) == 1
+        smlm_data.delete_item()
+        assert len(smlm_data._spatial_indices) == 1
+        smlm_data.delete_all()
+        assert len(smlm_data._spatial_indices) == 0
+
+    def test_property_statistics(self, locdata_2d, locdata_two_cluster_with_noise_2d):
+        smlm_data = SmlmData()
+        with pytest.raises(ValueError):
+            smlm_data.property_statistics(loc_property="position_x")
+
+        smlm_data = SmlmData(locdatas=[locdata_2d, locdata_two_cluster_with_noise_2d])
+        statistics = smlm_data.property_statistics(loc_property="position_x")
+        values = locdata_two_cluster_with_noise_2d.data["position_x"]
+        assert statistics.min == values.min()
+        assert statistics.max == values.max()
+        assert smlm_data.property_statistics(loc_property="position_x") is statistics
+        assert (
+            smlm_data.property_statistics(loc_property="position_x", locdata=locdata_2d)
+            is not statistics
+        )
+        assert len(smlm_data._property_statistics) == 2
+
+        with pytest.raises(KeyError):
+            smlm_data.property_statistics(loc_property="undefined")
+
+        # locdata not in smlm_data is not cached
+        smlm_data.property_statistics(
+            loc_property="position_x",
+            locdata=lc.LocData.from_dataframe(dataframe=locdata_2d.data),
+        )
+        assert len(smlm_data._property_statistics) == 2
+
+        # in-place modifications are detected
+        locdata = lc.LocData.from_dataframe(dataframe=locdata_2d.data.astype(float))
+        smlm_data.append_item(locdata)
+        statistics = smlm_data.property_statistics(loc_property="position_x")
+        assert smlm_data.property_statistics(loc_property="position_x") is statistics
+        locdata.dataframe.loc[0, "position_x"] = 100
+        new_statistics = smlm_data.property_statistics(loc_property="position_x")
+        assert new_statistics is not statistics
+        assert new_statistics.max == 100
+        smlm_data.delete_item()
+
+        smlm_data.locdata = locdata_2d
+        assert len(smlm_data._property_statistics) == 1
+        smlm_data.delete_all()
+        assert len(smlm_data._property_statistics) == 0
+
+    def test_spatial_index_threads(self, locdata_2d, monkeypatch):
+        n_computations = []
+
+        class CountingSpatialIndex(SpatialIndex):
+            def __init__(self, *args, **kwargs):
+                n_computations.append(1)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(smlm_data_module, "SpatialIndex", CountingSpatialIndex)
+        smlm_data = SmlmData(locdatas=[locdata_2d])
+        loc_properties = [["position_x", "position_y"], ["position_x"]] * 8
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda loc_properties_: smlm_data.spatial_index(
+                        locdata=locdata_2d, loc_properties=loc_properties_
+                    ),
+                    loc_properties,
+                )
+            )
+        assert len(n_computations) == 2
+        assert results[0] is results[2]
+        assert len(smlm_data._spatial_indices) == 2
+
+    def test_property_statistics_threads(self, locdata_2d, monkeypatch):
+        n_computations = []
+
+        class CountingPropertyStatistics(PropertyStatistics):
+            def __init__(self, *args, **kwargs):
+                n_computations.append(1)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(
+            smlm_data_module, "PropertyStatistics", CountingPropertyStatistics
+        )
+        smlm_data = SmlmData(locdatas=[locdata_2d])
+        loc_properties = ["position_x", "position_y"] * 8
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda loc_property: smlm_data.property_statistics(
+                        loc_property=loc_property, locdata=locdata_2d
+                    ),
+                    loc_properties,
+                )
+            )
+        assert len(n_computations) == 2
+        assert results[0] is results[2]
+        assert len(smlm_data._property_statistics) == 2
+
+        smlm_data.delete_all()
+        assert smlm_data._key_locks == {}
+
+    def test_placeholders(self, locdata_2d, tmp_path):
+        project = {
+            key: {"datasets": [], "names": [], "index": -1}
+            for key in [
+                "filter_specifications",
+                "region_specifications",
+                "roi_specifications",
+            ]
+        }
+        project["smlm_data"] = {
+            "datasets": [locdata_2d] * 3,
+            "names": ["0", "1", "2"],
+            "index": 0,
+        }
+        save_project(path=tmp_path / "project", project=project)
+        placeholders = load_project(path=tmp_path / "project", lazy=True)["smlm_data"][
+            "datasets"
+        ]
+        assert all(isinstance(item, LocDataPlaceholder) for item in placeholders)
+
+        smlm_data = SmlmData(locdatas=placeholders + [locdata_2d])
+        smlm_data.max_resident = 2
+        assert smlm_data.locdata_names == [locdata_2d.meta.identifier] * 4
+        assert [smlm_data.is_loaded(index) for index in range(4)] == [
+            False,
+            False,
+            False,
+            True,
+        ]
+        assert smlm_data.contains(locdata_2d)
+
+        smlm_data.index = 0
+        locdata = smlm_data.locdata
+        assert locdata.meta == locdata_2d.meta
+        assert smlm_data.locdata is locdata
+        assert smlm_data.contains(locdata)
+        smlm_data.index = 1
+        smlm_data.spatial_index()
+        smlm_data.index = 2
+        assert isinstance(smlm_data.locdata, lc.LocData)
+        assert [smlm_data.is_loaded(index) for index in range(4)] == [
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert not smlm_data.contains(locdata)
+
+        smlm_data.index = 1
+        assert smlm_data.locdata is not None
+        smlm_data.index = 0
+        assert smlm_data.locdata is not None
+        assert [smlm_data.is_loaded(index) for index in range(4)] == [
+            True,
+            True,
+            False,
+            True,
+        ]
+        assert len(smlm_data._spatial_indices) == 1
+
+        # locdatas keep placeholders and identical objects
+        locdatas = smlm_data.locdatas
+        assert locdatas[2] is placeholders[2]
+        assert locdatas[0] is smlm_data.locdata
+        assert smlm_data.locdatas[0] is locdatas[0]
+        assert not smlm_data.is_loaded(2)
+
+        # placeholders are resolved to the datasets they represent
+        assert smlm_data.placeholder(0) is placeholders[0]
+        assert smlm_data.placeholder(2) is placeholders[2]
+        assert smlm_data.placeholder(3) is None
+        assert smlm_data.resolve(placeholders[0]) is locdatas[0]
+        assert smlm_data.resolve(locdata_2d) is locdata_2d
+        new_locdata = smlm_data.resolve(placeholders[2])
+        assert isinstance(new_locdata, lc.LocData)
+        assert smlm_data.is_loaded(2)
+        assert smlm_data.resolve(lc.LocData()) is None
+
+        smlm_data.delete_item()
+        assert len(smlm_data._resident) == 1
+        smlm_data.delete_all()
+        assert len(smlm_data._resident) == 0
+
+    @pytest.mark.parametrize("modification", ["column", "values"])
+    def test_placeholders_modified(self, locdata_2d, tmp_path, caplog, modification):
+        project = {
+            key: {"datasets": [], "names": [], "index": -1}
+            for key in [
+                "filter_specifications",
+                "region_specifications",
+                "roi_specifications",
+            ]
+        }
+        project["smlm_data"] = {
+            "datasets": [locdata_2d] * 3,
+            "names": ["0", "1", "2"],
+            "index": 0,
+        }
+        save_project(path=tmp_path / "project", project=project)
+        placeholders = load_project(path=tmp_path / "project", lazy=True)["smlm_data"][
+            "datasets"
+        ]
+        smlm_data = SmlmData(locdatas=list(placeholders))
+        smlm_data.max_resident = 1
+
+        # modified datasets are not replaced by their placeholders
+        smlm_data.index = 0
+        locdata = smlm_data.locdata
+        if modification == "column":
+            locdata.dataframe["label"] = 1
+        else:
+            locdata.dataframe.loc[0, "position_x"] = 100
+        smlm_data.index = 1
+        assert smlm_data.locdata is not None
+        assert smlm_data.locdatas[0] is locdata
+        assert "was modified after loading" in caplog.text
+        assert smlm_data.placeholder(0) is None
+        assert smlm_data.placeholder(1) is placeholders[1]
+
+        # unmodified datasets are replaced
+        smlm_data.index = 2
+        assert smlm_data.locdata is not None
+        assert smlm_data.locdatas[1] is placeholders[1]
+        assert [smlm_data.is_loaded(index) for index in range(3)] == [
+            True,
+            False,
+            True,
+        ]
+
+        # only unmodified datasets are given with their placeholders
+        smlm_data.max_resident = None
+        smlm_data.index = 1
+        assert smlm_data.locdata is not None
+        resident_items = smlm_data.resident_items()
+        assert len(resident_items) == 2
+        assert resident_items[0][0] is smlm_data.locdatas[2]
+        assert resident_items[0][1] is placeholders[2]
+        assert resident_items[1][1] is placeholders[1]
+
+        smlm_data.locdatas[1].dataframe.loc[0, "position_x"] = 100
+        resident_items = smlm_data.resident_items()
+        assert len(resident_items) == 1
+        assert resident_items[0][1] is placeholders[2]
+
+    def test_is_dirty(self):
+        smlm_data = SmlmData(
+            locdatas=[lc.LocData(), lc.LocData()], locdata_names=["1", "2"]
+        )
+        assert smlm_data.is_dirty
+        smlm_data.mark_clean()
+        assert not smlm_data.is_dirty
+        smlm_data.index = 0
+        assert not smlm_data.is_dirty
+        smlm_data.locdata_name = "other name"
+        assert smlm_data.is_dirty
+        smlm_data.mark_clean()
+        smlm_data.locdata = lc.LocData()
+        assert smlm_data.is_dirty
+        smlm_data.mark_clean()
+        smlm_data.delete_item()
+        assert smlm_data.is_dirty
+
     def test_connect(self):
         def locdata_names_slot(locdata_names):
             warnings.warn("Name changed.", stacklevel=1)
@@ -0,0 +1,128 @@
+import os
+
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.locan_io.columnar_cache import ColumnarCache, restore_locdata
+from napari_locan.locan_io.load import LocDataLoader
+
+
+@pytest.fixture()
+def thunderstorm_file(locdata_2d, tmp_path):
+    file_path = tmp_path / "locdata.csv"
+    lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+    return file_path
+
+
+def test_ColumnarCache(thunderstorm_file, tmp_path):
+    cache = ColumnarCache(directory=tmp_path / "cache")
+    assert cache.load(path=thunderstorm_file, file_type="THUNDERSTORM") is None
+
+    locdata = lc.load_locdata(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert cache.save(locdata=locdata, path=thunderstorm_file, file_type="THUNDERSTORM")
+    entry_directory = cache.entry_directory(
+        path=thunderstorm_file, file_type="THUNDERSTORM"
+    )
+    assert (entry_directory / "metadata.json").is_file()
+    assert len(list(entry_directory.glob("*.npy"))) == len(locdata.data.columns)
+
+    cached = cache.load(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert isinstance(cached, lc.LocData)
+    assert cached.meta.identifier != locdata.meta.identifier
+    assert cached.meta.file.path == locdata.meta.file.path
+    assert list(cached.data.columns) == list(locdata.data.columns)
+    assert np.array_equal(cached.data, locdata.data)
+    array = cached.data["position_x"].to_numpy()
+    while not isinstance(array, np.memmap) and array.base is not None:
+        array = array.base
+    assert isinstance(array, np.memmap)
+    assert cached.coordinates.shape == locdata.coordinates.shape
+    assert cached.properties == locdata.properties
+    assert cached.meta.element_count == locdata.meta.element_count
+
+    # different kwargs give a different entry
+    assert (
+        cache.load(
+            path=thunderstorm_file, file_type="THUNDERSTORM", kwargs={"nrows": 2}
+        )
+        is None
+    )
+
+    # changed source files invalidate the entry
+    stat = thunderstorm_file.stat()
+    os.utime(thunderstorm_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load(path=thunderstorm_file, file_type="THUNDERSTORM") is None
+    assert not entry_directory.exists()
+
+    cache.clear()
+    assert not cache.directory.exists()
+
+
+def test_ColumnarCache_properties_not_recomputed(
+    thunderstorm_file, tmp_path, monkeypatch
+):
+    cache = ColumnarCache(directory=tmp_path / "cache")
+    locdata = lc.load_locdata(path=thunderstorm_file, file_type="THUNDERSTORM")
+    cache.save(locdata=locdata, path=thunderstorm_file, file_type="THUNDERSTORM")
+
+    update_properties_ = lc.LocData._update_properties
+
+    def update_properties(self, *args, **kwargs):
+        if len(self.dataframe):
+            raise AssertionError("properties are recomputed")
+        return update_properties_(self, *args, **kwargs)
+
+    monkeypatch.setattr(lc.LocData, "_update_properties", update_properties)
+    cached = cache.load(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert cached.properties == locdata.properties
+
+
+def test_ColumnarCache_not_cached(locdata_2d, thunderstorm_file, tmp_path):
+    cache = ColumnarCache(directory=tmp_path / "cache")
+    collection = lc.LocData.from_collection([locdata_2d, locdata_2d])
+    assert not cache.save(
+        locdata=collection, path=thunderstorm_file, file_type="THUNDERSTORM"
+    )
+    assert cache.load(path=thunderstorm_file, file_type="THUNDERSTORM") is None
+
+
+def test_ColumnarCache_evict(thunderstorm_file, tmp_path):
+    cache = ColumnarCache(directory=tmp_path / "cache", max_bytes=0)
+    locdata = lc.load_locdata(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert cache.save(locdata=locdata, path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert cache.load(path=thunderstorm_file, file_type="THUNDERSTORM") is None
+
+
+def test_LocDataLoader_columnar_cache(locdata_2d, thunderstorm_file, tmp_path):
+    cache = ColumnarCache(directory=tmp_path / "cache")
+    loader = LocDataLoader(
+        path=thunderstorm_file, file_type="THUNDERSTORM", columnar_cache=cache
+    )
+    locdata = loader.load()
+    assert not loader.is_cached
+
+    loader = LocDataLoader(
+        path=thunderstorm_file, file_type="THUNDERSTORM", columnar_cache=cache
+    )
+    cached = loader.load()
+    assert loader.is_cached
+    assert loader.bytes_read == loader.size
+    assert len(cached) == len(locdata_2d)
+    assert np.array_equal(cached.data, locdata.data)
+
+
+def test_restore_locdata(locdata_2d):
+    locdata = restore_locdata(
+        dataframe=locdata_2d.data,
+        meta=locdata_2d.meta.SerializeToString(),
+        properties=locdata_2d.properties,
+    )
+    assert locdata.data is locdata_2d.data
+    assert locdata.properties == locdata_2d.properties
+    assert locdata.properties is not locdata_2d.properties
+    assert locdata.dimension == 2
+    assert locdata.meta.identifier != locdata_2d.meta.identifier
+    assert locdata.meta.element_count == len(locdata_2d)
+    assert locdata.meta.history == locdata_2d.meta.history
+    assert locdata.bounding_box.region_measure == locdata_2d.bounding_box.region_measure
@@ -0,0 +1,295 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.locan_io.columnar_cache import ColumnarCache
+from napari_locan.locan_io.load import (
+    LoadCancelledError,
+    LocDataFileCache,
+    LocDataLoader,
+    ProgressFile,
+    _condition_names,
+    expand_file_paths,
+    iterate_load_locdata_files,
+    load_locdata_files,
+    project_locdata,
+)
+
+
+@pytest.fixture()
+def thunderstorm_file(locdata_2d, tmp_path):
+    file_path = tmp_path / "locdata.csv"
+    lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+    return file_path
+
+
+def test_ProgressFile(thunderstorm_file):
+    cancel_event = threading.Event()
+    with ProgressFile(path=thunderstorm_file, cancel_event=cancel_event) as file:
+        assert file.readable()
+        assert file.read(10)
+        assert file.tell() == 10
+        assert file.seek(2) == file.position == 2
+        cancel_event.set()
+        with pytest.raises(LoadCancelledError):
+            file.read(10)
+    # the position is available after closing the file
+    assert file.closed
+    assert file.position == 2
+
+
+def test_LocDataLoader(locdata_2d, thunderstorm_file):
+    loader = LocDataLoader(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert loader.size == thunderstorm_file.stat().st_size
+    assert loader.bytes_read == 0
+
+    locdata = loader.load()
+    expected = lc.load_locdata(path=thunderstorm_file, file_type="THUNDERSTORM")
+    assert loader.bytes_read == loader.size
+    assert len(locdata) == len(locdata_2d)
+    assert np.array_equal(locdata.data, expected.data)
+    assert locdata.meta.file.path == str(thunderstorm_file)
+    assert str(thunderstorm_file) in locdata.meta.history[0].parameter
+
+    loader = LocDataLoader(path=thunderstorm_file, file_type="THUNDERSTORM", nrows=2)
+    assert len(loader.load()) == 2
+
+    loader = LocDataLoader(path=thunderstorm_file, file_type="THUNDERSTORM")
+    loader.cancel()
+    assert loader.is_cancelled
+    with pytest.raises(LoadCancelledError):
+        loader.load()
+
+
+def test_LocDataLoader_binary_file(locdata_2d, tmp_path):
+    file_path = tmp_path / "locdata.asdf"
+    lc.save_asdf(locdata=locdata_2d, path=file_path)
+    loader = LocDataLoader(path=file_path, file_type="ASDF")
+    locdata = loader.load()
+    assert len(locdata) == len(locdata_2d)
+    assert loader.bytes_read == loader.size
+
+
+def test_LocDataLoader_projection(locdata_2d, thunderstorm_file):
+    loader = LocDataLoader(
+        path=thunderstorm_file,
+        file_type="THUNDERSTORM",
+        loc_properties=["position_x", "position_y", "frame"],
+        dtypes={"frame": "int32"},
+    )
+    locdata = loader.load()
+    assert list(locdata.data.columns) == ["position_x", "position_y", "frame"]
+    assert locdata.data.dtypes.to_dict() == {
+        "position_x": np.float32,
+        "position_y": np.float32,
+        "frame": np.int32,
+    }
+    assert len(locdata) == len(locdata_2d)
+
+    loader = LocDataLoader(
+        path=thunderstorm_file, file_type="THUNDERSTORM", loc_properties=["frame"]
+    )
+    assert list(loader.load().data.columns) == ["frame"]
+
+
+def test_LocDataLoader_condition(locdata_2d, thunderstorm_file):
+    condition = "position_x > 1 and frame < 5"
+    expected = lc.select_by_condition(
+        locdata=lc.load_locdata(path=thunderstorm_file, file_type="THUNDERSTORM"),
+        condition=condition,
+    )
+    assert 0 < len(expected) < len(locdata_2d)
+
+    loader = LocDataLoader(
+        path=thunderstorm_file,
+        file_type="THUNDERSTORM",
+        condition=condition,
+        chunk_size=2,
+    )
+    locdata = loader.load()
+    assert loader.bytes_read == loader.size
+    assert np.array_equal(locdata.data, expected.data)
+    assert locdata.data.dtypes.to_dict() == expected.data.dtypes.to_dict()
+    assert locdata.meta.element_count == len(expected)
+    assert locdata.meta.file.path == str(thunderstorm_file)
+    assert [item.name for item in locdata.meta.history] == [
+        "load_thundestorm_file",
+        "select_by_condition",
+    ]
+
+    loader = LocDataLoader(
+        path=thunderstorm_file,
+        file_type="THUNDERSTORM",
+        condition=condition,
+        chunk_size=2,
+        loc_properties=["position_x", "frame"],
+        dtypes={"frame": "int32"},
+        nrows=3,
+    )
+    locdata = loader.load()
+    assert list(locdata.data.columns) == ["position_x", "frame"]
+    assert locdata.data.frame.dtype == np.int32
+    assert len(locdata) <= 3
+
+    loader = LocDataLoader(
+        path=thunderstorm_file, file_type="THUNDERSTORM", condition="position_x > 1e9"
+    )
+    assert len(loader.load()) == 0
+
+
+@pytest.mark.parametrize("file_type", ["THUNDERSTORM", "CUSTOM"])
+def test_LocDataLoader_condition_on_unloaded_property(locdata_2d, tmp_path, file_type):
+    file_path = tmp_path / "locdata.csv"
+    if file_type == "THUNDERSTORM":
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+    else:
+        locdata_2d.data.to_csv(file_path, index=False)
+    expected = locdata_2d.data.query("position_x > 1")[["position_y", "frame"]]
+
+    loader = LocDataLoader(
+        path=file_path,
+        file_type=file_type,
+        condition="position_x > 1",
+        loc_properties=["position_y", "frame"],
+        chunk_size=2,
+    )
+    locdata = loader.load()
+    assert list(locdata.data.columns) == ["position_y", "frame"]
+    assert np.array_equal(locdata.data, expected)
+
+
+def test_LocDataFileCache(locdata_2d, thunderstorm_file, tmp_path, monkeypatch):
+    n_loads = []
+    load = LocDataLoader.load
+
+    def counting_load(self):
+        n_loads.append(self.file_type)
+        return load(self)
+
+    monkeypatch.setattr(LocDataLoader, "load", counting_load)
+
+    columnar_cache = ColumnarCache(directory=tmp_path / "cache")
+    file_cache = LocDataFileCache(columnar_cache=columnar_cache, max_items=1)
+    assert len(file_cache) == 0
+
+    # concurrent requests share a single load
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        locdatas = list(
+            executor.map(
+                lambda file_type: file_cache.load(thunderstorm_file, file_type),
+                [
+                    "THUNDERSTORM",
+                    "thunderstorm",
+                    lc.FileType.THUNDERSTORM,
+                    lc.FileType.THUNDERSTORM.value,
+                ],
+            )
+        )
+    assert n_loads == ["THUNDERSTORM"]
+    assert len(file_cache) == 1
+    assert all(locdata is locdatas[0] for locdata in locdatas)
+    assert len(locdatas[0]) == len(locdata_2d)
+    assert columnar_cache.entry_directory(
+        thunderstorm_file, "THUNDERSTORM", {}
+    ).exists()
+
+    # modified files are loaded again
+    stat = thunderstorm_file.stat()
+    os.utime(thunderstorm_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    locdata = file_cache.load(thunderstorm_file, "THUNDERSTORM")
+    assert locdata is not locdatas[0]
+    assert len(n_loads) == 2
+
+    # the least recently used item is discarded
+    file_cache.load(thunderstorm_file, "THUNDERSTORM", loc_properties=["position_x"])
+    assert len(file_cache) == 1
+    assert len(n_loads) == 3
+
+    file_cache.clear()
+    assert len(file_cache) == 0
+
+
+def test_project_locdata(locdata_2d, tmp_path):
+    file_path = tmp_path / "locdata.asdf"
+    lc.save_asdf(locdata=locdata_2d, path=file_path)
+    loader = LocDataLoader(
+        path=file_path,
+        file_type="ASDF",
+        loc_properties=["position_x", "frame"],
+        dtypes={"frame": "int32"},
+    )
+    locdata = loader.load()
+    assert list(locdata.data.columns) == ["position_x", "frame"]
+    assert locdata.data.frame.dtype == np.int32
+    assert locdata.meta.file.path == str(file_path)
+
+    new_locdata = project_locdata(locdata=locdata_2d, loc_properties=["position_y"])
+    assert list(new_locdata.data.columns) == ["position_y"]
+    assert new_locdata.meta.identifier != locdata_2d.meta.identifier
+    assert len(new_locdata) == len(locdata_2d)
+
+    new_locdata = project_locdata(locdata=locdata_2d, condition="frame < 2")
+    assert len(new_locdata) == len(locdata_2d.data.query("frame < 2"))
+    assert new_locdata.meta.element_count == len(new_locdata)
+    assert new_locdata.meta.history[-1].name == "select_by_condition"
+
+
+def test_condition_names():
+    assert _condition_names("position_x > 1 and `frame` < 5") == {
+        "position_x",
+        "and",
+        "frame",
+    }
+
+
+def test_expand_file_paths(tmp_path):
+    for name in ["b.csv", "a.csv", "c.txt"]:
+        (tmp_path / name).touch()
+    assert expand_file_paths(tmp_path / "c.txt") == [tmp_path / "c.txt"]
+    assert expand_file_paths(str(tmp_path / "*.csv")) == [
+        tmp_path / "a.csv",
+        tmp_path / "b.csv",
+    ]
+    assert expand_file_paths(f"{tmp_path / 'c.txt'}; {tmp_path / '*.csv'};") == [
+        tmp_path / "c.txt",
+        tmp_path / "a.csv",
+        tmp_path / "b.csv",
+    ]
+    assert expand_file_paths([tmp_path / "*.csv", tmp_path / "c.txt"]) == [
+        tmp_path / "a.csv",
+        tmp_path / "b.csv",
+        tmp_path / "c.txt",
+    ]
+    assert expand_file_paths("") == []
+
+
+def test_load_locdata_files(locdata_2d, tmp_path):
+    file_paths = []
+    for index in range(3):
+        file_path = tmp_path / f"locdata_{index}.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+        file_paths.append(file_path)
+
+    locdatas = load_locdata_files(
+        paths=file_paths, file_type="THUNDERSTORM", n_jobs=2, nrows=3
+    )
+    assert [locdata.meta.file.path for locdata in locdatas] == [
+        str(file_path) for file_path in file_paths
+    ]
+    assert all(len(locdata) == 3 for locdata in locdatas)
+    expected = lc.load_locdata(path=file_paths[0], file_type="THUNDERSTORM", nrows=3)
+    assert locdatas[0].properties == expected.properties
+    assert len({locdata.meta.identifier for locdata in locdatas}) == 3
+
+    assert load_locdata_files(paths=[], file_type="THUNDERSTORM") == []
+
+    iterator = iterate_load_locdata_files(
+        paths=file_paths, file_type="THUNDERSTORM", n_jobs=1
+    )
+    index, locdata = next(iterator)
+    assert index in range(3)
+    iterator.close()
@@ -0,0 +1,246 @@
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.locan_io.project import (
+    PROJECT_FILE_NAME,
+    LocDataPlaceholder,
+    ProjectWriter,
+    iterate_load_project,
+    iterate_save_project,
+    load_project,
+    region_from_repr,
+    save_project,
+)
+
+
+@pytest.fixture()
+def project(locdata_2d):
+    selection = lc.select_by_condition(locdata=locdata_2d, condition="frame > 1")
+    collection = lc.LocData.from_collection([locdata_2d, selection])
+    selectors = {
+        "position_x": lc.Selector(
+            loc_property="position_x", activate=True, lower_bound=0, upper_bound=1.5
+        ),
+    }
+    rois = [
+        lc.Roi(reference=locdata_2d, region=lc.Rectangle((0, 0), 2, 3, 0)),
+        lc.Roi(reference=None, region=lc.Ellipse((0, 0), 2, 3, 0)),
+        lc.Roi(
+            reference=lc.LocData.from_dataframe(locdata_2d.data), region=lc.Rectangle()
+        ),
+    ]
+    return {
+        "filter_specifications": {
+            "datasets": [selectors],
+            "names": ["filter"],
+            "index": 0,
+        },
+        "region_specifications": {
+            "datasets": [
+                lc.Rectangle(),
+                lc.EmptyRegion(),
+                lc.Polygon([(0, 0), (1, 0), (1, 1)]),
+            ],
+            "names": ["rectangle", "empty", "polygon"],
+            "index": 1,
+        },
+        "roi_specifications": {
+            "datasets": rois,
+            "names": ["0", "1", "2"],
+            "index": 2,
+        },
+        "smlm_data": {
+            "datasets": [locdata_2d, selection, collection],
+            "names": ["locdata", "selection", "collection"],
+            "index": 0,
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "region",
+    [
+        lc.Rectangle((1, 2), 3, 4, 10),
+        lc.EmptyRegion(),
+        lc.Polygon([(0, 0), (1, 0), (1, 1)]),
+        lc.Interval(1, 2),
+        lc.Rectangle((0, 0), 1, 1, 0).union(lc.Rectangle((5, 5), 1, 1, 0)),
+        lc.Polygon([(0, 0), (4, 0), (4, 4), (0, 4)], holes=[[(1, 1), (2, 1), (2, 2)]]),
+    ],
+)
+def test_region_from_repr(region):
+    assert repr(region_from_repr(repr(region))) == repr(region)
+
+
+def test_region_from_repr_fails():
+    with pytest.raises(ValueError):
+        region_from_repr("Selector(1, 2)")
+    with pytest.raises(ValueError):
+        region_from_repr("not_a_region")
+    with pytest.raises(ValueError):
+        region_from_repr("Rectangle(print(1), 1, 1, 0)")
+    with pytest.raises(ValueError):
+        region_from_repr("Rectangle((0, 0), 1, 1, 0")
+
+
+def test_save_and_load_project(project, tmp_path):
+    path = tmp_path / "project"
+    progress = list(iterate_save_project(path=path, project=project, n_jobs=2))
+    assert progress[-1][0] == progress[-1][1] == len(progress)
+    assert (path / PROJECT_FILE_NAME).is_file()
+    assert not (tmp_path / "project.tmp").exists()
+
+    iterator = iterate_load_project(path=path / PROJECT_FILE_NAME, n_jobs=2)
+    assert next(iterator) == (1, progress[-1][1] - 5)
+    new_project = load_project(path=path)
+
+    for key in [
+        "filter_specifications",
+        "region_specifications",
+        "roi_specifications",
+        "smlm_data",
+    ]:
+        assert new_project[key]["names"] == project[key]["names"]
+        assert new_project[key]["index"] == project[key]["index"]
+
+    assert repr(new_project["filter_specifications"]["datasets"]) == repr(
+        project["filter_specifications"]["datasets"]
+    )
+    assert repr(new_project["region_specifications"]["datasets"]) == repr(
+        project["region_specifications"]["datasets"]
+    )
+
+    locdatas = project["smlm_data"]["datasets"]
+    new_locdatas = new_project["smlm_data"]["datasets"]
+    for locdata, new_locdata in zip(locdatas, new_locdatas):
+        assert new_locdata.meta == locdata.meta
+        assert list(new_locdata.data.columns) == list(locdata.data.columns)
+        assert np.allclose(new_locdata.data, locdata.data)
+    assert len(new_locdatas[2].references) == 2
+
+    rois = project["roi_specifications"]["datasets"]
+    new_rois = new_project["roi_specifications"]["datasets"]
+    assert new_rois[0].reference is new_locdatas[0]
+    assert new_rois[1].reference is None
+    assert new_rois[2].reference.file == rois[2].reference.meta.file
+    assert [repr(roi.region) for roi in new_rois] == [repr(roi.region) for roi in rois]
+
+    lazy_project = load_project(path=path, lazy=True)
+    placeholders = lazy_project["smlm_data"]["datasets"]
+    assert all(isinstance(item, LocDataPlaceholder) for item in placeholders)
+    assert placeholders[0].meta == locdatas[0].meta
+    for locdata, placeholder in zip(locdatas, placeholders):
+        assert placeholder.load().meta == locdata.meta
+    assert np.allclose(placeholders[2].load().data, locdatas[2].data)
+    lazy_rois = lazy_project["roi_specifications"]["datasets"]
+    assert lazy_rois[0].reference is placeholders[0]
+
+    # rois keep referring to datasets loaded from placeholders
+    lazy_project["smlm_data"]["datasets"][0] = placeholders[0].load()
+    other_path = tmp_path / "other_project"
+    save_project(path=other_path, project=lazy_project)
+    other_project = load_project(path=other_path)
+    assert (
+        other_project["roi_specifications"]["datasets"][0].reference
+        is other_project["smlm_data"]["datasets"][0]
+    )
+
+    # overwrite project
+    project["smlm_data"] = {"datasets": [], "names": [], "index": -1}
+    project["roi_specifications"]["datasets"][0].reference = None
+    save_project(path=path, project=project)
+    assert load_project(path=path)["smlm_data"]["datasets"] == []
+    assert not (path / "locdatas").exists()
+
+
+def test_save_and_load_project_regions(project, locdata_2d, tmp_path):
+    roi = lc.Roi(reference=locdata_2d, region=lc.Rectangle((0, 0), 2, 3, 0))
+    selection = roi.locdata()
+    multi_polygon = lc.Rectangle((0, 0), 1, 1, 0).union(lc.Rectangle((5, 5), 1, 1, 0))
+    project["region_specifications"]["datasets"].append(multi_polygon)
+    project["region_specifications"]["names"].append("multi_polygon")
+    project["smlm_data"] = {
+        "datasets": [locdata_2d, selection],
+        "names": ["locdata", "roi"],
+        "index": 1,
+    }
+
+    path = tmp_path / "project"
+    project_writer = ProjectWriter(path=path)
+    list(project_writer.iterate_save(project=project))
+    new_project = load_project(path=path)
+    assert repr(new_project["region_specifications"]["datasets"][-1]) == repr(
+        multi_polygon
+    )
+    new_locdatas = new_project["smlm_data"]["datasets"]
+    assert new_locdatas[0].region is None
+    assert repr(new_locdatas[1].region) == repr(selection.region)
+    assert new_locdatas[1].properties == selection.properties
+
+    # a changed region is written again
+    selection.region = lc.Rectangle((0, 0), 3, 3, 0)
+    assert len(list(project_writer.iterate_save(project=project))) > 0
+    new_locdatas = load_project(path=path)["smlm_data"]["datasets"]
+    assert repr(new_locdatas[1].region) == repr(selection.region)
+
+
+def test_save_project_fails(project, tmp_path):
+    (tmp_path / "file.txt").touch()
+    with pytest.raises(FileExistsError):
+        save_project(path=tmp_path, project=project)
+
+
+def test_project_writer(project, tmp_path):
+    path = tmp_path / "project"
+    project_writer = ProjectWriter(path=path, n_jobs=2)
+    progress = list(project_writer.iterate_save(project=project))
+    n_files = progress[-1][1]
+    directories = {
+        directory: directory.stat().st_mtime_ns
+        for directory in (path / "locdatas").iterdir()
+    }
+    assert len(directories) == 3
+
+    # only the project file is written for unchanged datasets
+    project["smlm_data"]["names"] = ["a", "b", "c"]
+    assert list(project_writer.iterate_save(project=project)) == []
+    assert {
+        directory: directory.stat().st_mtime_ns
+        for directory in (path / "locdatas").iterdir()
+    } == directories
+    assert load_project(path=path)["smlm_data"]["names"] == ["a", "b", "c"]
+
+    # modified and new datasets are written, deleted datasets are removed
+    locdatas = project["smlm_data"]["datasets"]
+    locdatas[0].meta.comment = "modified"
+    project["smlm_data"]["datasets"] = [locdatas[0], locdatas[1]]
+    project["smlm_data"]["names"] = ["a", "b"]
+    project["smlm_data"]["index"] = 1
+    progress = list(project_writer.iterate_save(project=project))
+    assert 0 < progress[-1][1] < n_files
+    new_directories = set((path / "locdatas").iterdir())
+    assert len(new_directories) == 2
+    assert len(new_directories & set(directories)) == 1
+    new_project = load_project(path=path)
+    assert new_project["smlm_data"]["datasets"][0].meta.comment == "modified"
+
+    # placeholders of the project are not loaded or written
+    lazy_project = load_project(path=path, lazy=True)
+    new_project_writer = ProjectWriter(path=path)
+    assert list(new_project_writer.iterate_save(project=lazy_project)) == []
+    assert set((path / "locdatas").iterdir()) == new_directories
+
+    # datasets loaded from the project are registered
+    new_project_writer = ProjectWriter(path=path)
+    for locdata, placeholder in zip(
+        new_project["smlm_data"]["datasets"], new_project["smlm_data"]["placeholders"]
+    ):
+        new_project_writer.register(locdata=locdata, placeholder=placeholder)
+    assert list(new_project_writer.iterate_save(project=new_project)) == []
+
+    # placeholders of other projects are loaded and written
+    other_path = tmp_path / "other_project"
+    progress = list(iterate_save_project(path=other_path, project=lazy_project))
+    assert 0 < progress[-1][1] < n_files
+    assert load_project(path=other_path)["smlm_data"]["names"] == ["a", "b"]
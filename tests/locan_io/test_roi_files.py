@@ -0,0 +1,103 @@
+from copy import deepcopy
+
+import locan as lc
+import pytest
+
+from napari_locan.locan_io.project import (
+    LocDataPlaceholder,
+    load_project,
+    save_project,
+)
+from napari_locan.locan_io.roi_files import (
+    iterate_load_rois,
+    iterate_save_rois,
+    roi_file_names,
+    roi_file_paths,
+)
+
+
+def test_roi_file_names():
+    assert roi_file_names(names=[]) == []
+    assert roi_file_names(names=["roi_1", "2-Rectangle", "a/b c", ""]) == [
+        "roi_1.yaml",
+        "2-Rectangle.yaml",
+        "a_b_c.yaml",
+        "roi.yaml",
+    ]
+    assert roi_file_names(names=["roi", "other", "roi"]) == [
+        "roi_0.yaml",
+        "other.yaml",
+        "roi_1.yaml",
+    ]
+    # suffixes do not collide with other names
+    assert roi_file_names(names=["a", "a", "a_1"]) == [
+        "a_0.yaml",
+        "a_2.yaml",
+        "a_1.yaml",
+    ]
+    assert roi_file_names(names=["a_0", "a", "A", "a/"]) == [
+        "a_0.yaml",
+        "a_1.yaml",
+        "A_2.yaml",
+        "a_.yaml",
+    ]
+    names = roi_file_names(names=["a", "a", "a_1", "a_0", "a_1"] * 3)
+    assert len({name.lower() for name in names}) == len(names)
+
+
+def test_iterate_save_and_load_rois(locdata_2d, tmp_path):
+    locdata = deepcopy(locdata_2d)
+    locdata.meta.file.path = str(tmp_path / "locdata.csv")
+    locdata.meta.file.type = lc.FileType.THUNDERSTORM.value
+    meta = locdata.meta
+    project = {
+        key: {"datasets": [], "names": [], "index": -1}
+        for key in [
+            "filter_specifications",
+            "region_specifications",
+            "roi_specifications",
+        ]
+    }
+    project["smlm_data"] = {"datasets": [locdata], "names": ["0"], "index": 0}
+    save_project(path=tmp_path / "project", project=project)
+    placeholder = load_project(path=tmp_path / "project", lazy=True)["smlm_data"][
+        "datasets"
+    ][0]
+    assert isinstance(placeholder, LocDataPlaceholder)
+    rois = [
+        lc.Roi(region=lc.Rectangle((0, 0), 2, 3, 0)),
+        lc.Roi(
+            reference={"file_path": meta.file.path, "file_type": "THUNDERSTORM"},
+            region=lc.Ellipse((3, 3), 4, 2, 30),
+            loc_properties=["position_x", "position_y"],
+        ),
+        lc.Roi(reference=placeholder, region=lc.Rectangle((1, 1), 5, 5, 0)),
+    ]
+    paths = [
+        tmp_path / file_name
+        for file_name in roi_file_names(names=[f"roi_{i}" for i in range(3)])
+    ]
+
+    iterator = iterate_save_rois(rois=rois, paths=paths, n_jobs=2)
+    assert list(iterator) == [(1, 3), (2, 3), (3, 3)]
+    assert roi_file_paths(directory=tmp_path) == paths
+
+    iterator = iterate_load_rois(paths=paths, n_jobs=2)
+    progress = []
+    try:
+        while True:
+            progress.append(next(iterator))
+    except StopIteration as exception:
+        new_rois = exception.value
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert [repr(roi.region) for roi in new_rois] == [repr(roi.region) for roi in rois]
+    assert new_rois[0].reference is None
+    assert new_rois[1].reference.file.path == meta.file.path
+    assert list(new_rois[1].loc_properties) == ["position_x", "position_y"]
+    assert new_rois[2].reference.file == meta.file
+
+    assert list(iterate_save_rois(rois=[], paths=[])) == []
+    with pytest.raises(ValueError):
+        list(iterate_save_rois(rois=rois, paths=paths[:1]))
+    with pytest.raises(FileNotFoundError):
+        list(iterate_load_rois(paths=[tmp_path / "missing.yaml"]))
@@ -0,0 +1,110 @@
+import locan as lc
+import numpy as np
+import pandas as pd
+import pytest
+
+from napari_locan.locan_io.save import (
+    format_csv_block,
+    iterate_save_csv,
+    iterate_save_locdata,
+    iterate_save_locdatas,
+    save_asdf,
+)
+
+
+@pytest.mark.parametrize(
+    "arrays",
+    [
+        [np.array([1, 2, 3]), np.array([0.1, -2.5e-12, 123456789.123])],
+        [np.array([1.5, np.nan, 3], dtype=np.float32), np.array([1, 2, 3])],
+        [np.array([True, False, True]), np.array(["a", "b", "c"])],
+        [np.array([], dtype=float)],
+        [],
+    ],
+)
+def test_format_csv_block(arrays):
+    expected = pd.DataFrame(dict(enumerate(arrays))).to_csv(
+        header=False, index=False, float_format="%.10g"
+    )
+    assert format_csv_block(arrays) == expected.encode()
+
+
+@pytest.mark.parametrize(
+    "file_type, save_function",
+    [
+        ("THUNDERSTORM", lc.save_thunderstorm_csv),
+        ("SMAP", lc.save_SMAP_csv),
+    ],
+)
+def test_iterate_save_csv(locdata_2d, tmp_path, file_type, save_function):
+    file_path = tmp_path / "locdata.csv"
+    progress = list(
+        iterate_save_csv(
+            locdata=locdata_2d,
+            path=file_path,
+            file_type=file_type,
+            chunk_size=2,
+            n_jobs=2,
+        )
+    )
+    assert progress == [(2, 6), (4, 6), (6, 6)]
+
+    expected_file_path = tmp_path / "expected.csv"
+    save_function(locdata=locdata_2d, path=expected_file_path)
+    assert file_path.read_bytes() == expected_file_path.read_bytes()
+
+
+def test_save_asdf(locdata_2d, tmp_path):
+    save_asdf(locdata=locdata_2d, path=tmp_path / "locdata.asdf")
+    save_asdf(locdata=locdata_2d, path=tmp_path / "compressed.asdf", compression="zlib")
+    for file_name in ["locdata.asdf", "compressed.asdf"]:
+        locdata = lc.load_asdf_file(path=tmp_path / file_name)
+        assert list(locdata.data.columns) == list(locdata_2d.data.columns)
+        assert np.allclose(locdata.data, locdata_2d.data)
+
+
+def test_iterate_save_locdata(locdata_2d, tmp_path):
+    for file_type, file_name in [
+        ("ASDF", "locdata.asdf"),
+        ("SMLM", "locdata.zip"),
+        ("THUNDERSTORM", "locdata.csv"),
+    ]:
+        progress = list(
+            iterate_save_locdata(
+                locdata=locdata_2d,
+                path=tmp_path / file_name,
+                file_type=file_type,
+                compress=True,
+            )
+        )
+        assert progress[-1] == (6, 6)
+        locdata = lc.load_locdata(path=tmp_path / file_name, file_type=file_type)
+        assert np.allclose(locdata.coordinates, locdata_2d.coordinates)
+
+    with pytest.raises(TypeError):
+        list(
+            iterate_save_locdata(
+                locdata=locdata_2d, path=tmp_path / "locdata.csv", file_type="ASDF"
+            )
+        )
+
+
+def test_iterate_save_locdatas(locdata_2d, tmp_path):
+    paths = [tmp_path / f"locdata_{index}.asdf" for index in range(3)]
+    progress = list(
+        iterate_save_locdatas(
+            locdatas=[locdata_2d, lc.LocData(), locdata_2d],
+            paths=paths,
+            file_type="ASDF",
+            n_jobs=2,
+        )
+    )
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert all(path.is_file() for path in paths)
+
+    with pytest.raises(ValueError):
+        list(
+            iterate_save_locdatas(
+                locdatas=[locdata_2d], paths=paths, file_type="ASDF", n_jobs=2
+            )
+        )
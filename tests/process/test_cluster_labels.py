@@ -0,0 +1,186 @@
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.process.cluster_labels import (
+    LABEL_KEY,
+    cluster_dbscan_labels,
+    cluster_properties,
+    cluster_property_keys,
+    compute_dbscan_labels,
+    dbscan_labels,
+    materialize_clusters,
+)
+from napari_locan.process.result_cache import ResultCache
+from napari_locan.process.spatial_index import SpatialIndex
+
+
+def test_cluster_properties(locdata_two_cluster_with_noise_2d):
+    properties = cluster_properties(locdata_two_cluster_with_noise_2d)
+    _, collection = lc.cluster_dbscan(
+        locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+    )
+    assert list(properties.index) == [1, 2]
+    assert cluster_property_keys(locdata_two_cluster_with_noise_2d) == list(
+        properties.reset_index().columns
+    )
+    for column_ in [
+        "localization_count",
+        "position_x",
+        "position_y",
+        "region_measure_bb",
+        "localization_density_bb",
+        "subregion_measure_bb",
+    ]:
+        assert np.allclose(
+            properties[column_].to_numpy(),
+            collection.data[column_].to_numpy(),
+        )
+
+
+def test_cluster_dbscan_labels(locdata_two_cluster_with_noise_2d):
+    locdata_labels, locdata_clusters = cluster_dbscan_labels(
+        locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+    )
+    assert len(locdata_labels) == 7
+    assert locdata_labels.data[LABEL_KEY].dtype == np.int32
+    assert np.array_equal(locdata_labels.data[LABEL_KEY], [0, 0, 0, 1, 1, 1, -1])
+    assert len(locdata_clusters) == 2
+    assert np.array_equal(locdata_clusters.data["localization_count"], [3, 3])
+    assert np.array_equal(locdata_clusters.data[LABEL_KEY], [0, 1])
+    assert "'eps': 2, 'min_samples': 2" in locdata_labels.meta.history[0].parameter
+    # localization data is not copied
+    assert np.shares_memory(
+        locdata_labels.data["position_x"].to_numpy(),
+        locdata_two_cluster_with_noise_2d.data["position_x"].to_numpy(),
+    )
+
+    locdata_labels, locdata_clusters = cluster_dbscan_labels(
+        locdata=lc.LocData(), eps=2, min_samples=2
+    )
+    assert len(locdata_labels) == 0
+    assert len(locdata_clusters) == 0
+
+
+@pytest.mark.parametrize("min_samples", [1, 2, 3, 4])
+def test_dbscan_labels(locdata_two_cluster_with_noise_2d, min_samples):
+    locdata = locdata_two_cluster_with_noise_2d
+    spatial_index = SpatialIndex(points=locdata.coordinates)
+    labels = dbscan_labels(spatial_index=spatial_index, eps=2, min_samples=min_samples)
+    locdata_labels, _ = cluster_dbscan_labels(
+        locdata=locdata, eps=2, min_samples=min_samples
+    )
+    assert labels.dtype == np.int32
+    assert np.array_equal(labels, locdata_labels.data[LABEL_KEY])
+
+    locdata_labels, locdata_clusters = cluster_dbscan_labels(
+        locdata=locdata, eps=2, min_samples=min_samples, spatial_index=spatial_index
+    )
+    assert np.array_equal(labels, locdata_labels.data[LABEL_KEY])
+
+    with pytest.raises(ValueError):
+        cluster_dbscan_labels(
+            locdata=locdata,
+            spatial_index=SpatialIndex(points=locdata.coordinates[:2]),
+        )
+
+
+def test_dbscan_labels_border_points():
+    # point 2 is a border point to two clusters
+    points = np.array([[0, 0], [1, 0], [2, 0], [3, 0], [4, 0], [-1, 0], [5, 0]])
+    spatial_index = SpatialIndex(points=points)
+    labels = dbscan_labels(spatial_index=spatial_index, eps=1, min_samples=3)
+    locdata = lc.LocData.from_coordinates(points)
+    locdata_labels, _ = cluster_dbscan_labels(locdata=locdata, eps=1, min_samples=3)
+    assert np.array_equal(labels, locdata_labels.data[LABEL_KEY])
+
+
+def test_cluster_dbscan_labels_result_cache(
+    locdata_two_cluster_with_noise_2d, tmp_path
+):
+    locdata = locdata_two_cluster_with_noise_2d
+    result_cache = ResultCache(directory=tmp_path)
+    locdata_labels, _ = cluster_dbscan_labels(
+        locdata=locdata, eps=2, min_samples=2, result_cache=result_cache
+    )
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    # cached labels are taken even if they are wrong
+    path = next(tmp_path.glob("*.npy"))
+    np.save(path, np.array([5, 5, 5, 5, 5, 5, 5], dtype=np.int32))
+    locdata_labels, locdata_clusters = cluster_dbscan_labels(
+        locdata=locdata,
+        eps=2,
+        min_samples=2,
+        spatial_index=SpatialIndex(points=locdata.coordinates),
+        result_cache=result_cache,
+    )
+    assert np.array_equal(locdata_labels.data[LABEL_KEY], [5] * 7)
+    assert len(locdata_clusters) == 1
+
+    # a spatial index is not built for cached labels
+    def build_spatial_index():
+        raise AssertionError("The spatial index should not be built.")
+
+    locdata_labels, _ = cluster_dbscan_labels(
+        locdata=locdata,
+        eps=2,
+        min_samples=2,
+        spatial_index=build_spatial_index,
+        result_cache=result_cache,
+    )
+    assert np.array_equal(locdata_labels.data[LABEL_KEY], [5] * 7)
+
+    # other parameters are computed
+    locdata_labels, _ = cluster_dbscan_labels(
+        locdata=locdata, eps=2, min_samples=3, result_cache=result_cache
+    )
+    assert np.array_equal(locdata_labels.data[LABEL_KEY], [0, 0, 0, 1, 1, 1, -1])
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+
+    # labels are taken from the cache without cluster properties
+    labels = compute_dbscan_labels(
+        locdata=locdata, eps=2, min_samples=3, result_cache=result_cache
+    )
+    assert labels.dtype == np.int32
+    assert np.array_equal(labels, [0, 0, 0, 1, 1, 1, -1])
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    assert len(compute_dbscan_labels(locdata=lc.LocData())) == 0
+
+
+def test_materialize_clusters(locdata_two_cluster_with_noise_2d):
+    locdata_labels, _ = cluster_dbscan_labels(
+        locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+    )
+    noise, collection = materialize_clusters(locdata=locdata_labels)
+    assert len(noise) == 1
+    assert len(collection) == 2
+    assert [len(reference_) for reference_ in collection.references] == [3, 3]
+    _, collection_ref = lc.cluster_dbscan(
+        locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+    )
+    assert np.allclose(
+        collection.data[["position_x", "position_y"]],
+        collection_ref.data[["position_x", "position_y"]],
+    )
+
+    with pytest.raises(KeyError):
+        materialize_clusters(
+            locdata=locdata_two_cluster_with_noise_2d, label_key="none"
+        )
+
+    noise, collection = materialize_clusters(
+        locdata=locdata_two_cluster_with_noise_2d,
+        labels=locdata_labels.data[LABEL_KEY],
+    )
+    assert noise.references is locdata_two_cluster_with_noise_2d
+    assert all(
+        reference_.references is locdata_two_cluster_with_noise_2d
+        for reference_ in collection.references
+    )
+    assert [len(reference_) for reference_ in collection.references] == [3, 3]
+
+    with pytest.raises(ValueError):
+        materialize_clusters(
+            locdata=locdata_two_cluster_with_noise_2d, labels=np.zeros(2)
+        )
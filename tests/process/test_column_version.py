@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from napari_locan.process.column_version import ColumnVersion, content_hash
+
+
+def test_content_hash():
+    values = np.arange(6, dtype=np.float64)
+    assert content_hash(values) == content_hash(values.copy())
+    assert content_hash(values) != content_hash(values + 1)
+    assert content_hash(values) != content_hash(values.astype(np.float32))
+    assert content_hash(values) != content_hash(values.reshape(2, 3))
+    assert content_hash(values.reshape(2, 3)[:, :2]) == content_hash(
+        np.array([[0, 1], [3, 4]], dtype=np.float64)
+    )
+    assert content_hash(np.array(["a", None], dtype=object)) == content_hash(
+        np.array(["a", None], dtype=object)
+    )
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_ColumnVersion(copy_on_write):
+    values = np.array([1.0, np.nan, 3.0])
+    version = ColumnVersion(values=pd.Series(values), copy_on_write=copy_on_write)
+    assert version.matches(values)
+    assert version.matches(values.copy())
+    assert not version.matches(values[:2])
+    assert not version.matches(values + 1)
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_ColumnVersion_in_place_modification(copy_on_write):
+    # plain arrays and data without copy-on-write are modified in place
+    values = np.arange(5, dtype=np.float64)
+    version = ColumnVersion(values=values, copy_on_write=copy_on_write)
+    values[2] = -1
+    assert not version.matches(values)
+
+    dataframe = pd.DataFrame({"x": np.arange(5, dtype=np.float64)})
+    version = ColumnVersion(values=dataframe["x"], copy_on_write=copy_on_write)
+    dataframe.loc[2, "x"] = -1
+    assert not version.matches(dataframe["x"])
@@ -0,0 +1,154 @@
+from copy import deepcopy
+
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.process.filter_selection import (
+    HAS_NUMEXPR,
+    FilterPreview,
+    iterate_select_by_selectors,
+    select_by_selectors,
+    selection_mask,
+)
+
+
+@pytest.fixture()
+def selectors():
+    return [
+        lc.Selector(
+            loc_property="position_x", activate=True, lower_bound=1, upper_bound=5
+        ),
+        lc.Selector(loc_property="frame", activate=True, lower_bound=1, upper_bound=6),
+        lc.Selector(
+            loc_property="intensity", activate=False, lower_bound=0, upper_bound=1
+        ),
+    ]
+
+
+def test_selection_mask(locdata_2d, selectors):
+    expected = locdata_2d.data.eval(lc.filter_condition(selectors)).to_numpy()
+    mask = selection_mask(locdata=locdata_2d, selectors=selectors)
+    assert mask.dtype == np.bool_
+    assert np.array_equal(mask, expected)
+
+    mask = selection_mask(
+        locdata=locdata_2d, selectors=selectors, n_jobs=2, chunk_size=4
+    )
+    assert np.array_equal(mask, expected)
+
+    mask = selection_mask(locdata=locdata_2d, selectors=selectors[2:])
+    assert mask.all()
+
+    with pytest.raises(KeyError):
+        selection_mask(
+            locdata=locdata_2d,
+            selectors=[
+                lc.Selector(
+                    loc_property="undefined",
+                    activate=True,
+                    lower_bound=0,
+                    upper_bound=1,
+                )
+            ],
+        )
+
+
+@pytest.mark.skipif(not HAS_NUMEXPR, reason="Test requires numexpr.")
+def test_selection_mask_numexpr(locdata_2d, selectors):
+    expected = locdata_2d.data.eval(lc.filter_condition(selectors)).to_numpy()
+    mask = selection_mask(locdata=locdata_2d, selectors=selectors, use_numexpr=True)
+    assert np.array_equal(mask, expected)
+
+
+def test_select_by_selectors(locdata_2d, selectors):
+    expected = lc.select_by_condition(
+        locdata=locdata_2d, condition=lc.filter_condition(selectors)
+    )
+    new_locdata = select_by_selectors(locdata=locdata_2d, selectors=selectors)
+    assert len(new_locdata) == len(expected) == 3
+    assert new_locdata.data.equals(expected.data)
+    assert new_locdata.meta.history[-1].name == "select_by_selectors"
+
+
+def test_iterate_select_by_selectors(
+    locdata_2d, locdata_two_cluster_with_noise_2d, selectors
+):
+    selectors = selectors[:1]
+    locdatas = [locdata_2d, lambda: locdata_two_cluster_with_noise_2d, locdata_2d]
+    iterator = iterate_select_by_selectors(
+        locdatas=locdatas, selectors=selectors, n_jobs=2
+    )
+    progress = []
+    try:
+        while True:
+            progress.append(next(iterator))
+    except StopIteration as exception:
+        new_locdatas = exception.value
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert len(new_locdatas) == 3
+    for new_locdata, locdata in zip(
+        new_locdatas,
+        [locdata_2d, locdata_two_cluster_with_noise_2d, locdata_2d],
+        strict=True,
+    ):
+        assert new_locdata.references is locdata
+        expected = select_by_selectors(locdata=locdata, selectors=selectors)
+        assert new_locdata.data.equals(expected.data)
+
+    iterator = iterate_select_by_selectors(locdatas=[], selectors=selectors)
+    with pytest.raises(StopIteration):
+        next(iterator)
+
+
+def test_FilterPreview(locdata_2d, selectors):
+    filter_preview = FilterPreview(locdata=locdata_2d)
+    expected = locdata_2d.data.eval(lc.filter_condition(selectors)).to_numpy()
+    assert np.array_equal(filter_preview.mask(selectors=selectors), expected)
+    assert filter_preview.count(selectors=selectors) == expected.sum() == 3
+    assert filter_preview.count(selectors=selectors[:1]) == 3
+    assert filter_preview.count(selectors=selectors[2:]) == len(locdata_2d)
+
+    mask = filter_preview.property_mask("position_x", 1, 5)
+    assert filter_preview.property_mask("position_x", 1, 5) is mask
+    assert filter_preview.property_mask("position_x", 1, 4) is not mask
+    assert filter_preview.property_mask("position_x", 1, 4).sum() == 2
+    assert filter_preview.property_mask("position_x", 5, 1).sum() == 0
+    assert set(filter_preview._sorted_indices) == {"position_x", "frame"}
+
+    with pytest.raises(KeyError):
+        filter_preview.property_mask("undefined", 0, 1)
+
+
+def test_FilterPreview_incremental(locdata_2d, selectors):
+    filter_preview = FilterPreview(locdata=locdata_2d)
+    for lower_bound, upper_bound in [(1, 5), (0, 5), (2, 3), (5, 1), (-1, 10)]:
+        selectors[0].lower_bound = lower_bound
+        selectors[0].upper_bound = upper_bound
+        for frame_upper_bound in [6, 3]:
+            selectors[1].upper_bound = frame_upper_bound
+            expected = locdata_2d.data.eval(lc.filter_condition(selectors)).to_numpy()
+            assert np.array_equal(filter_preview.mask(selectors=selectors), expected)
+            assert filter_preview.count(selectors=selectors) == expected.sum()
+            assert np.array_equal(
+                filter_preview.indices(selectors=selectors), np.flatnonzero(expected)
+            )
+
+    assert np.array_equal(
+        filter_preview.indices(selectors=selectors[2:]), np.arange(len(locdata_2d))
+    )
+    assert len(filter_preview.indices(selectors=selectors[2:], max_points=4)) == 3
+
+
+def test_FilterPreview_modified_locdata(locdata_2d, selectors):
+    locdata_2d = deepcopy(locdata_2d)
+    filter_preview = FilterPreview(locdata=locdata_2d)
+    assert filter_preview.count(selectors=selectors) == 3
+    mask = filter_preview.mask(selectors=selectors)
+
+    locdata_2d.dataframe.loc[mask, "position_x"] = 100
+    expected = locdata_2d.data.eval(lc.filter_condition(selectors)).to_numpy()
+    assert expected.sum() == 0
+    assert filter_preview.count(selectors=selectors) == 0
+    assert np.array_equal(filter_preview.mask(selectors=selectors), expected)
+    assert len(filter_preview.indices(selectors=selectors)) == 0
@@ -0,0 +1,101 @@
+import locan as lc
+import numpy as np
+import pandas as pd
+import pytest
+
+from napari_locan.process.group_properties import (
+    GroupBy,
+    collection_labels,
+    label_segments,
+    property_keys,
+)
+
+
+def test_label_segments():
+    segments = label_segments([2, -1, 0, 2, 0, -1, 5])
+    assert np.array_equal(segments.labels, [0, 2, 5])
+    assert np.array_equal(segments.order, [2, 4, 0, 3, 6])
+    assert np.array_equal(segments.starts, [0, 2, 4])
+    assert np.array_equal(segments.counts, [2, 2, 1])
+
+    segments = label_segments([-1, -1])
+    assert len(segments.labels) == 0
+    assert len(segments.order) == 0
+
+
+def test_GroupBy():
+    group_by = GroupBy(labels=[1, 0, 1, -1, 1])
+    assert group_by.n_groups == 2
+    assert np.array_equal(group_by.labels, [0, 1])
+    assert np.array_equal(group_by.counts, [1, 3])
+    values = np.array([1, 2, 3, 100, 5])
+    assert np.array_equal(group_by.sum(values), [2, 9])
+    assert np.array_equal(group_by.mean(values), [2, 3])
+    assert np.array_equal(group_by.min(values), [2, 1])
+    assert np.array_equal(group_by.max(values), [2, 5])
+    mins, maxs = group_by.bounding_boxes(np.stack([values, -values], axis=1))
+    assert np.array_equal(mins, [[2, -2], [1, -5]])
+    assert np.array_equal(maxs, [[2, -2], [5, -1]])
+
+    group_by = GroupBy(labels=[-1, -1])
+    assert group_by.n_groups == 0
+    assert len(group_by.sum([1, 2])) == 0
+    assert group_by.bounding_boxes(np.ones((2, 2)))[0].shape == (0, 2)
+    assert len(group_by.properties(pd.DataFrame({"position_x": [1, 2]}))) == 0
+
+
+@pytest.mark.parametrize("uncertainty", [False, True])
+def test_GroupBy_properties(uncertainty):
+    rng = np.random.default_rng(seed=1)
+    n_localizations = 40
+    dataframe = pd.DataFrame(
+        {
+            "position_x": rng.uniform(0, 100, n_localizations),
+            "position_y": rng.uniform(0, 100, n_localizations),
+            "frame": rng.integers(0, 100, n_localizations),
+            "intensity": rng.uniform(0, 100, n_localizations),
+            "local_background": rng.uniform(0, 100, n_localizations),
+        }
+    )
+    if uncertainty:
+        dataframe["uncertainty"] = rng.uniform(1, 10, n_localizations)
+    labels = rng.integers(-1, 5, n_localizations)
+    labels[0] = 5  # single localization
+    locdata = lc.LocData.from_dataframe(dataframe=dataframe)
+
+    properties = GroupBy(labels=labels).properties(dataframe=dataframe)
+    assert list(properties.index) == [0, 1, 2, 3, 4, 5]
+    assert list(properties.columns) == property_keys(columns=dataframe.columns)
+
+    references = [
+        lc.LocData.from_selection(locdata=locdata, indices=np.flatnonzero(labels == i))
+        for i in range(6)
+    ]
+    collection = lc.LocData.from_collection(references)
+    for column_ in collection.data.columns:
+        assert np.allclose(
+            properties[column_].to_numpy(),
+            collection.data[column_].to_numpy(),
+            equal_nan=True,
+        ), column_
+
+
+def test_collection_labels(locdata_2d, locdata_two_cluster_with_noise_2d):
+    _, collection = lc.cluster_dbscan(
+        locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+    )
+    dataframe, labels = collection_labels(collection=collection)
+    assert len(dataframe) == 6
+    assert np.array_equal(labels, [0, 0, 0, 1, 1, 1])
+    properties = GroupBy(labels=labels).properties(dataframe=dataframe)
+    assert np.allclose(
+        properties[["position_x", "position_y"]],
+        [reference_.centroid for reference_ in collection.references],
+    )
+
+    dataframe, labels = collection_labels(collection=lc.LocData.from_collection([]))
+    assert dataframe.empty
+    assert len(labels) == 0
+
+    with pytest.raises(TypeError):
+        collection_labels(collection=locdata_2d)
@@ -0,0 +1,34 @@
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.process.neighbor_distances import nearest_neighbor_distances
+from napari_locan.process.spatial_index import SpatialIndex
+
+
+@pytest.mark.parametrize("k", [1, 2, 3])
+@pytest.mark.parametrize("chunk_size, n_jobs", [(100_000, 1), (2, 1), (2, 3), (3, -1)])
+def test_nearest_neighbor_distances(
+    locdata_two_cluster_with_noise_2d, k, chunk_size, n_jobs
+):
+    locdata = locdata_two_cluster_with_noise_2d
+    spatial_index = SpatialIndex(points=locdata.coordinates)
+    distances = nearest_neighbor_distances(
+        spatial_index=spatial_index, k=k, chunk_size=chunk_size, n_jobs=n_jobs
+    )
+    nn = lc.NearestNeighborDistances(k=k).compute(locdata)
+    assert distances.dtype == np.float32
+    assert np.allclose(distances, nn.results["nn_distance"])
+
+
+def test_nearest_neighbor_distances_exceptions(locdata_2d):
+    spatial_index = SpatialIndex(points=locdata_2d.coordinates)
+    with pytest.raises(ValueError):
+        nearest_neighbor_distances(spatial_index=spatial_index, k=0)
+    with pytest.raises(ValueError):
+        nearest_neighbor_distances(spatial_index=spatial_index, chunk_size=0)
+
+    distances = nearest_neighbor_distances(
+        spatial_index=spatial_index, k=len(locdata_2d)
+    )
+    assert np.all(np.isnan(distances))
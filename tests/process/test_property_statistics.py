@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from napari_locan.process.property_statistics import (
+    HISTOGRAM_MAX_BINS,
+    PropertyStatistics,
+    describe,
+    numeric_loc_properties,
+)
+
+
+def test_PropertyStatistics(locdata_2d):
+    values = locdata_2d.data["position_x"]
+    statistics = PropertyStatistics(values=values, loc_property="position_x")
+    assert statistics.loc_property == "position_x"
+    assert statistics.count == len(values)
+    assert statistics.min == values.min()
+    assert statistics.max == values.max()
+    assert np.array_equal(
+        statistics.quantiles, values.quantile([0.25, 0.5, 0.75]).to_numpy()
+    )
+    assert statistics.counts.sum() == len(values)
+    assert statistics.bin_edges[0] == values.min()
+    assert statistics.bin_edges[-1] == values.max()
+    assert statistics.describe().equals(values.describe().astype(float))
+
+    assert statistics.is_valid(values)
+    assert statistics.is_valid(values.copy())
+    assert not statistics.is_valid(values + 1)
+    assert not statistics.is_valid(values[:2])
+    assert not PropertyStatistics(values=values.to_numpy()).is_valid(values)
+
+
+def test_PropertyStatistics_special_values():
+    values = pd.Series([1.0, np.nan, 3.0])
+    statistics = PropertyStatistics(values=values)
+    assert statistics.count == 2
+    assert statistics.describe().equals(values.describe())
+    assert statistics.is_valid(values.copy())
+
+    statistics = PropertyStatistics(values=pd.Series([], dtype=float))
+    assert statistics.count == 0
+    assert np.isnan(statistics.min)
+    assert len(statistics.counts) == 0
+
+    values = np.linspace(0, 1, 10_000)
+    statistics = PropertyStatistics(values=values)
+    assert np.array_equal(
+        statistics.bin_edges, np.histogram_bin_edges(values, bins="auto")
+    )
+
+    statistics = PropertyStatistics(values=np.append(values, 1e6))
+    assert len(statistics.counts) == HISTOGRAM_MAX_BINS
+
+    statistics = PropertyStatistics(values=np.ones(3))
+    assert statistics.counts.tolist() == [3]
+
+    with pytest.raises(TypeError):
+        PropertyStatistics(values=pd.Series(["a", "b"]))
+
+
+def test_describe(locdata_2d):
+    loc_properties = numeric_loc_properties(dataframe=locdata_2d.data)
+    assert loc_properties == list(locdata_2d.data.columns)
+    result = describe(
+        PropertyStatistics(
+            values=locdata_2d.data[loc_property], loc_property=loc_property
+        )
+        for loc_property in loc_properties
+    )
+    expected = locdata_2d.data.describe()
+    assert np.allclose(result.to_numpy(), expected.to_numpy())
+    assert list(result.columns) == list(expected.columns)
+    assert list(result.index) == list(expected.index)
+
+    assert describe([]).empty
+
+    dataframe = pd.DataFrame({"a": [1, 2], "b": ["x", "y"], "c": [True, False]})
+    assert numeric_loc_properties(dataframe=dataframe) == ["a"]
@@ -0,0 +1,132 @@
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.process.region_selection import (
+    REGION_LABEL_KEY,
+    region_labels,
+    select_by_region,
+    select_by_regions,
+)
+from napari_locan.process.spatial_index import SpatialIndex
+
+
+@pytest.mark.parametrize(
+    "region",
+    [
+        lc.Rectangle((1, 1), 4, 3, 0),
+        lc.Ellipse((3, 3), 4, 2, 30),
+        lc.Polygon([(0, 0), (6, 0), (3, 5), (0, 0)]),
+        lc.Rectangle((100, 100), 1, 1, 0),
+    ],
+)
+def test_select_by_region(locdata_2d, region):
+    expected = lc.Roi(reference=locdata_2d, region=region).locdata()
+
+    new_locdata = select_by_region(locdata=locdata_2d, region=region)
+    assert len(new_locdata) == len(expected)
+
+    spatial_index = SpatialIndex(
+        points=locdata_2d.coordinates, loc_properties=locdata_2d.coordinate_keys
+    )
+    new_locdata = select_by_region(
+        locdata=locdata_2d, region=region, spatial_index=spatial_index
+    )
+    assert len(new_locdata) == len(expected)
+    if len(expected):
+        assert np.array_equal(new_locdata.data, expected.data)
+        assert new_locdata.region == region
+    assert new_locdata.meta.history[-1].name == "select_by_region"
+
+
+def test_select_by_region_exceptions(locdata_2d):
+    region = lc.Rectangle((1, 1), 4, 3, 0)
+    spatial_index = SpatialIndex(points=locdata_2d.coordinates[:2])
+    with pytest.raises(ValueError):
+        select_by_region(locdata=locdata_2d, region=region, spatial_index=spatial_index)
+
+    spatial_index = SpatialIndex(
+        points=locdata_2d.data[["position_y", "position_x"]].to_numpy(),
+        loc_properties=["position_y", "position_x"],
+    )
+    with pytest.raises(ValueError):
+        select_by_region(locdata=locdata_2d, region=region, spatial_index=spatial_index)
+
+
+def test_select_by_regions(locdata_2d):
+    regions = [
+        lc.Rectangle((1, 1), 4, 3, 0),
+        lc.Ellipse((3, 3), 4, 2, 30),
+        lc.Polygon([(0, 0), (6, 0), (3, 5), (0, 0)]),
+        lc.Rectangle((100, 100), 1, 1, 0),
+    ]
+    expected = [
+        select_by_region(locdata=locdata_2d, region=region) for region in regions
+    ]
+
+    new_locdatas = select_by_regions(locdata=locdata_2d, regions=regions)
+    assert len(new_locdatas) == len(regions)
+    for new_locdata, expected_, region in zip(
+        new_locdatas, expected, regions, strict=True
+    ):
+        assert new_locdata.data.equals(expected_.data)
+        if len(expected_):
+            assert new_locdata.region == region
+        assert new_locdata.meta.history[-1].name == "select_by_region"
+
+    spatial_index = SpatialIndex(
+        points=locdata_2d.coordinates, loc_properties=locdata_2d.coordinate_keys
+    )
+    new_locdatas = select_by_regions(
+        locdata=locdata_2d, regions=regions, spatial_index=spatial_index
+    )
+    assert [len(item) for item in new_locdatas] == [len(item) for item in expected]
+
+    assert select_by_regions(locdata=locdata_2d, regions=[]) == []
+
+    with pytest.raises(ValueError):
+        select_by_regions(
+            locdata=locdata_2d,
+            regions=[regions[0], lc.Interval(0, 1)],
+        )
+    with pytest.raises(ValueError):
+        select_by_regions(
+            locdata=locdata_2d,
+            regions=regions,
+            spatial_index=SpatialIndex(points=locdata_2d.coordinates[:2]),
+        )
+
+
+def test_region_labels(locdata_2d):
+    regions = [
+        lc.Rectangle((1, 1), 4, 3, 0),
+        lc.Polygon([(0, 0), (6, 0), (3, 5), (0, 0)]),
+        lc.Rectangle((100, 100), 1, 1, 0),
+    ]
+    points = locdata_2d.coordinates
+    expected = np.full(len(locdata_2d), -1)
+    for label, region in reversed(list(enumerate(regions))):
+        expected[region.contains(points)] = label
+
+    new_locdata = region_labels(locdata=locdata_2d, regions=regions)
+    assert len(new_locdata) == len(locdata_2d)
+    assert new_locdata.data[REGION_LABEL_KEY].dtype == np.int32
+    assert np.array_equal(new_locdata.data[REGION_LABEL_KEY], expected)
+    assert (expected >= 0).any() and (expected < 0).any()
+    assert new_locdata.data[locdata_2d.data.columns].equals(locdata_2d.data)
+    assert new_locdata.meta.history[-1].name == "region_labels"
+
+    new_locdata = region_labels(
+        locdata=locdata_2d, regions=regions, labels=[10, 11, 12], label_key="label"
+    )
+    assert np.array_equal(
+        new_locdata.data["label"], np.where(expected < 0, -1, expected + 10)
+    )
+
+    new_locdata = region_labels(locdata=locdata_2d, regions=[])
+    assert (new_locdata.data[REGION_LABEL_KEY] == -1).all()
+
+    with pytest.raises(ValueError):
+        region_labels(locdata=locdata_2d, regions=regions, labels=[0])
+    with pytest.raises(ValueError):
+        region_labels(locdata=locdata_2d, regions=regions, labels=[0, -1, 2])
@@ -0,0 +1,56 @@
+import numpy as np
+
+from napari_locan.process.result_cache import CACHE_DIRECTORY, ResultCache, hash_key
+
+
+def test_hash_key():
+    points = np.arange(10, dtype=np.float64).reshape((5, 2))
+    key = hash_key(arrays=[points], parameter={"eps": 1, "min_samples": 2})
+    assert isinstance(key, str)
+    assert key == hash_key(
+        arrays=[points.copy()], parameter={"min_samples": 2, "eps": 1}
+    )
+    assert key != hash_key(arrays=[points], parameter={"eps": 2, "min_samples": 2})
+    assert key != hash_key(arrays=[points + 1], parameter={"eps": 1, "min_samples": 2})
+    assert key != hash_key(
+        arrays=[points.astype(np.float32)], parameter={"eps": 1, "min_samples": 2}
+    )
+    assert key != hash_key(
+        arrays=[points.reshape((2, 5))], parameter={"eps": 1, "min_samples": 2}
+    )
+    assert hash_key(arrays=[np.empty((0, 2))], parameter={})
+
+
+def test_ResultCache(tmp_path):
+    assert ResultCache().directory == CACHE_DIRECTORY
+
+    result_cache = ResultCache(directory=tmp_path / "cache")
+    assert result_cache.get("key") is None
+    assert "key" not in result_cache
+
+    labels = np.array([0, 0, 1, -1], dtype=np.int32)
+    result_cache.set("key", labels)
+    assert "key" in result_cache
+    cached = result_cache.get("key")
+    assert cached.dtype == np.int32
+    assert np.array_equal(cached, labels)
+    assert list((tmp_path / "cache").glob("*.tmp")) == []
+
+    (tmp_path / "cache" / "corrupted.npy").write_bytes(b"no array")
+    assert result_cache.get("corrupted") is None
+    assert "corrupted" not in result_cache
+
+    result_cache.clear()
+    assert "key" not in result_cache
+
+
+def test_ResultCache_evict(tmp_path):
+    result_cache = ResultCache(directory=tmp_path, max_bytes=1_000)
+    for index in range(3):
+        result_cache.set(f"key_{index}", np.zeros(50, dtype=np.int32))
+    assert all(f"key_{index}" in result_cache for index in range(3))
+
+    result_cache.set("key_3", np.zeros(200, dtype=np.int32))
+    assert "key_3" in result_cache
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.npy")) <= 1_000
+    assert "key_0" not in result_cache
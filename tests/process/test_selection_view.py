@@ -0,0 +1,54 @@
+import copy
+import pickle
+
+import locan as lc
+import numpy as np
+import pytest
+
+from napari_locan.process.selection_view import SelectionView
+
+
+def test_SelectionView(locdata_2d):
+    mask = locdata_2d.data["position_x"].to_numpy() > 1
+    expected = lc.LocData.from_selection(
+        locdata=locdata_2d, indices=locdata_2d.data.index[mask]
+    )
+
+    selection = SelectionView.from_mask(locdata=locdata_2d, mask=mask)
+    assert selection.is_view
+    assert selection.references is locdata_2d
+    assert selection.indices.dtype == np.bool_
+    assert len(selection) == len(expected) == 4
+    assert selection.n_references == 6
+    assert selection.data.equals(expected.data)
+    assert selection.properties == expected.properties
+    assert selection.coordinate_keys == ["position_x", "position_y"]
+    assert list(selection.columns) == list(locdata_2d.data.columns)
+    assert selection.meta.element_count == 4
+    assert selection.meta.ancestor_identifiers[-1] == locdata_2d.meta.identifier
+    assert selection._data_cache is None
+    positions = selection.positions
+    assert positions.tolist() == np.flatnonzero(mask).tolist()
+    assert selection.positions is positions
+    assert selection.data is not selection.data
+
+    nested = SelectionView.from_mask(
+        locdata=selection, mask=selection.data["frame"].to_numpy() > 2
+    )
+    assert len(nested) == 3
+    assert nested.n_references == 4
+    assert nested.data.equals(locdata_2d.data[locdata_2d.data["frame"] > 2])
+
+    new_locdata = copy.copy(selection)
+    assert new_locdata.data.equals(expected.data)
+
+    new_locdata = pickle.loads(pickle.dumps(selection))  # noqa: S301
+    assert new_locdata.data.equals(expected.data)
+
+    selection.reduce()
+    assert not selection.is_view
+    assert selection.data.equals(expected.data)
+    assert len(selection) == selection.n_references == 4
+
+    with pytest.raises(ValueError):
+        SelectionView.from_mask(locdata=locdata_2d, mask=mask[:2])
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from napari_locan.process.spatial_index import SpatialIndex
+
+
+def test_SpatialIndex(locdata_2d):
+    spatial_index = SpatialIndex(
+        points=locdata_2d.coordinates, loc_properties=locdata_2d.coordinate_keys
+    )
+    assert len(spatial_index) == len(locdata_2d)
+    assert spatial_index.dimension == 2
+    assert spatial_index.loc_properties == ["position_x", "position_y"]
+
+    distances, indices = spatial_index.query(k=1)
+    assert distances.shape == indices.shape == (len(locdata_2d), 1)
+    assert np.all(indices[:, 0] != np.arange(len(locdata_2d)))
+
+    distances, indices = spatial_index.query(k=2, points=[[1, 1]])
+    assert distances.shape == (1, 2)
+    assert np.all(np.diff(distances) >= 0)
+
+    bounds = [1, 1, 5, 4]
+    points = locdata_2d.coordinates
+    expected = np.flatnonzero(
+        np.all((points >= bounds[:2]) & (points <= bounds[2:]), axis=1)
+    )
+    assert np.array_equal(spatial_index.query_bounding_box(bounds=bounds), expected)
+
+    pairs = spatial_index.query_pairs(radius=2)
+    assert pairs.shape[1] == 2
+    assert np.all(pairs[:, 0] < pairs[:, 1])
+    assert np.all(
+        np.linalg.norm(points[pairs[:, 0]] - points[pairs[:, 1]], axis=1) <= 2
+    )
+
+    with pytest.raises(TypeError):
+        SpatialIndex(points=[1, 2, 3])
+
+
+def test_SpatialIndex_empty():
+    spatial_index = SpatialIndex(points=np.empty((0, 2)))
+    assert len(spatial_index) == 0
+    assert len(spatial_index.query_bounding_box(bounds=[0, 0, 1, 1])) == 0
+    assert len(spatial_index.query_pairs(radius=1)) == 0
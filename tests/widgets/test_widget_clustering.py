@@ -1,5 +1,8 @@
+import pytest
+
 from napari_locan import ClusteringQWidget
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.result_cache import ResultCache
 
 
 class TestClusteringQWidgetQWidget:
@@ -40,3 +43,78 @@ class TestClusteringQWidgetQWidget:
         my_widget._compute_button_on_click_thread_worker()
         # you would have to wait for worker.finished() to assert - so we skip this:
         # assert len(smlm_data.locdatas) == 5
+
+    def test_ClusteringQWidget_compact_result(
+        self, make_napari_viewer, locdata_2d, locdata_two_cluster_with_noise_2d
+    ):
+        smlm_data = SmlmData(locdatas=[locdata_two_cluster_with_noise_2d])
+        viewer = make_napari_viewer()
+        my_widget = ClusteringQWidget(viewer, smlm_data=smlm_data)
+        my_widget._eps_spin_box.setValue(2)
+        my_widget._min_points_spin_box.setValue(2)
+        my_widget._compact_result_check_box.setChecked(True)
+
+        my_widget._compute_button_on_click_main_thread()
+        assert len(smlm_data._spatial_indices) == 1
+        assert len(smlm_data.locdatas) == 3
+        assert smlm_data.index == 2
+        assert smlm_data.locdata_name.endswith("cluster-labels")
+        assert "cluster_label" in smlm_data.locdata.data.columns
+        assert smlm_data.locdata_names[1].endswith("cluster-properties")
+        assert len(smlm_data.locdatas[1]) == 2
+
+        my_widget._materialize_button_on_click()
+        assert len(smlm_data.locdatas) == 5
+        assert smlm_data.locdata_name.endswith("cluster")
+        assert len(smlm_data.locdata.references) == 2
+
+        smlm_data.append_item(locdata=locdata_2d)
+        with pytest.raises(KeyError):
+            my_widget._materialize_button_on_click()
+
+    def test_ClusteringQWidget_compact_result_worker(
+        self, make_napari_viewer, qtbot, locdata_two_cluster_with_noise_2d
+    ):
+        smlm_data = SmlmData(locdatas=[locdata_two_cluster_with_noise_2d])
+        viewer = make_napari_viewer()
+        my_widget = ClusteringQWidget(viewer, smlm_data=smlm_data)
+        my_widget._eps_spin_box.setValue(2)
+        my_widget._min_points_spin_box.setValue(2)
+        my_widget._compact_result_check_box.setChecked(True)
+
+        my_widget._compute_button_on_click_thread_worker()
+        qtbot.waitUntil(lambda: len(smlm_data.locdata_names) == 3, timeout=10_000)
+        assert len(smlm_data._spatial_indices) == 1
+        assert smlm_data.locdata_name.endswith("cluster-labels")
+
+    def test_ClusteringQWidget_result_cache(
+        self, make_napari_viewer, locdata_two_cluster_with_noise_2d, tmp_path
+    ):
+        smlm_data = SmlmData(locdatas=[locdata_two_cluster_with_noise_2d])
+        viewer = make_napari_viewer()
+        my_widget = ClusteringQWidget(viewer, smlm_data=smlm_data)
+        my_widget.result_cache = ResultCache(directory=tmp_path)
+        my_widget._eps_spin_box.setValue(2)
+        my_widget._min_points_spin_box.setValue(2)
+        my_widget._result_cache_check_box.setChecked(True)
+
+        my_widget._compute_button_on_click_main_thread()
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+        assert len(smlm_data.locdatas) == 3
+        assert smlm_data.locdata_name.endswith("cluster")
+        assert len(smlm_data.locdata.references) == 2
+        assert len(smlm_data.locdatas[1]) == 1
+        assert all(
+            reference_.references is locdata_two_cluster_with_noise_2d
+            for reference_ in smlm_data.locdata.references
+        )
+
+        # cached labels do not require a spatial index
+        smlm_data.index = 0
+        smlm_data._spatial_indices = {}
+        my_widget._compact_result_check_box.setChecked(True)
+        my_widget._compute_button_on_click_main_thread()
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+        assert len(smlm_data._spatial_indices) == 0
+        assert len(smlm_data.locdatas) == 5
+        assert len(smlm_data.locdatas[3]) == 2
@@ -4,6 +4,7 @@ import pytest
 
 from napari_locan import SaveSmlmDataQWidget
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import load_project, save_project
 
 
 class TestSaveSmlmDataQWidget:
@@ -13,7 +14,9 @@ class TestSaveSmlmDataQWidget:
         my_widget = SaveSmlmDataQWidget(viewer, smlm_data=smlm_data)
         assert my_widget._file_path_edit.text() == ""
 
-    def test_SaveSmlmDataQWidget_save(self, make_napari_viewer, locdata_2d, tmp_path):
+    def test_SaveSmlmDataQWidget_save(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
         viewer = make_napari_viewer()
         smlm_data = SmlmData(locdatas=[lc.LocData(), locdata_2d])
         my_widget = SaveSmlmDataQWidget(viewer, smlm_data=smlm_data)
@@ -26,10 +29,12 @@ class TestSaveSmlmDataQWidget:
 
         smlm_data.index = 0
         my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
         assert test_file_path.exists()
 
         smlm_data.index = 1
         my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
         assert test_file_path.exists()
 
         test_file_path = tmp_path / "test.csv"
@@ -38,6 +43,7 @@ class TestSaveSmlmDataQWidget:
         assert my_widget._file_type_combobox.currentText() == "THUNDERSTORM"
         smlm_data.index = 1
         my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
         assert test_file_path.exists()
 
         test_file_path = tmp_path / "test.zip"
@@ -46,6 +52,7 @@ class TestSaveSmlmDataQWidget:
         assert my_widget._file_type_combobox.currentText() == "SMLM"
         smlm_data.index = 1
         my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
         assert test_file_path.exists()
 
         test_file_path = tmp_path / "test.csv"
@@ -54,11 +61,87 @@ class TestSaveSmlmDataQWidget:
         assert my_widget._file_type_combobox.currentText() == "SMAP"
         smlm_data.index = 1
         my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
         assert test_file_path.exists()
 
         my_widget._file_path_delete_button_on_click()
         assert my_widget._file_path_edit.text() == ""
 
+    def test_SaveSmlmDataQWidget_save_all(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        viewer = make_napari_viewer()
+        smlm_data = SmlmData(
+            locdatas=[locdata_2d, locdata_2d], locdata_names=["first", "second/2"]
+        )
+        my_widget = SaveSmlmDataQWidget(viewer, smlm_data=smlm_data)
+        my_widget._file_path_edit.setText(str(tmp_path / "test.asdf"))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.ASDF.name)
+        my_widget._compress_check_box.setChecked(True)
+        my_widget._save_all_check_box.setChecked(True)
+        my_widget._save_button_on_click()
+        assert not my_widget._save_button.isEnabled()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
+        assert (tmp_path / "test_0_first.asdf").exists()
+        assert (tmp_path / "test_1_second_2.asdf").exists()
+
+        my_widget._file_path_edit.setText(str(tmp_path / "test.zip"))
+        with pytest.raises(TypeError):
+            my_widget._save_button_on_click()
+
+    def test_SaveSmlmDataQWidget_save_errored(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path, monkeypatch
+    ):
+        messages = []
+        monkeypatch.setattr(napari.utils.notifications, "show_error", messages.append)
+        viewer = make_napari_viewer()
+        smlm_data = SmlmData(locdatas=[locdata_2d])
+        my_widget = SaveSmlmDataQWidget(viewer, smlm_data=smlm_data)
+        my_widget._file_path_edit.setText(str(tmp_path / "missing" / "test.asdf"))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.ASDF.name)
+        my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
+        qtbot.waitUntil(lambda: len(messages) == 1, timeout=10_000)
+        assert messages[0].startswith("Saving failed:")
+
+    def test_SaveSmlmDataQWidget_save_all_placeholders(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        project = {
+            key: {"datasets": [], "names": [], "index": -1}
+            for key in [
+                "filter_specifications",
+                "region_specifications",
+                "roi_specifications",
+            ]
+        }
+        project["smlm_data"] = {
+            "datasets": [locdata_2d, locdata_2d],
+            "names": ["0", "1"],
+            "index": 0,
+        }
+        save_project(path=tmp_path / "project", project=project)
+        placeholders = load_project(path=tmp_path / "project", lazy=True)["smlm_data"][
+            "datasets"
+        ]
+
+        viewer = make_napari_viewer()
+        smlm_data = SmlmData(locdatas=placeholders, locdata_names=["0", "1"])
+        my_widget = SaveSmlmDataQWidget(viewer, smlm_data=smlm_data)
+        my_widget._file_path_edit.setText(str(tmp_path / "test.csv"))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+        my_widget._save_all_check_box.setChecked(True)
+        my_widget._save_button_on_click()
+        qtbot.waitUntil(lambda: my_widget._save_button.isEnabled(), timeout=10_000)
+        for index in range(2):
+            locdata = lc.load_locdata(
+                path=tmp_path / f"test_{index}_{index}.csv", file_type="THUNDERSTORM"
+            )
+            assert len(locdata) == len(locdata_2d)
+        # placeholders are not replaced by loaded datasets
+        assert smlm_data.locdatas == placeholders
+        assert not smlm_data.is_loaded(0)
+
 
 @pytest.mark.napari
 def test_run_napari():
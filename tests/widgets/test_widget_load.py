@@ -2,10 +2,14 @@ from pathlib import Path
 
 import locan as lc
 import napari
+import numpy as np
 import pytest
 
 from napari_locan import LoadQWidget
+from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.columnar_cache import ColumnarCache
+from napari_locan.widgets.widget_load import _load_worker
 from tests import TEST_DIR
 
 
@@ -16,6 +20,165 @@ class TestLoadQWidget:
         my_widget = LoadQWidget(viewer, smlm_data=smlm_data)
         assert my_widget._file_path_edit.text() == ""
 
+    def test_LoadQWidget_load_thread_worker(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        file_path = tmp_path / "locdata.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+
+        smlm_data = SmlmData()
+        viewer = make_napari_viewer()
+        my_widget = LoadQWidget(viewer, smlm_data=smlm_data)
+        my_widget._file_path_edit.setText(str(file_path))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+        my_widget._kwargs_edit.setText("nrows=3")
+
+        my_widget._load_thread_worker()
+        assert my_widget._cancel_button.isEnabled()
+        assert not my_widget._load_button.isEnabled()
+        # the dataset is named after the file path at the start of loading
+        my_widget._file_path_edit.setText("other.csv")
+        qtbot.waitUntil(lambda: my_widget._loader is None, timeout=10_000)
+        assert len(smlm_data.locdatas) == 1
+        assert len(smlm_data.locdata) == 3
+        assert smlm_data.locdata_name.endswith("locdata.csv")
+        assert smlm_data.locdata.meta.file.path == str(file_path)
+        assert my_widget._load_button.isEnabled()
+        assert not my_widget._cancel_button.isEnabled()
+
+        my_widget._file_path_edit.setText(str(file_path))
+        loader = my_widget._get_loader()
+        loader.cancel()
+        worker = _load_worker(loader=loader)
+        with qtbot.waitSignal(worker.returned, timeout=10_000) as blocker:
+            worker.start()
+        assert blocker.args == [None]
+
+    def test_LoadQWidget_projection(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        file_path = tmp_path / "locdata.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+
+        smlm_data = SmlmData()
+        viewer = make_napari_viewer()
+        my_widget = LoadQWidget(viewer, smlm_data=smlm_data)
+        assert my_widget._get_kwargs() == {}
+
+        my_widget._file_path_edit.setText(str(file_path))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+        my_widget._loc_properties_edit.setText("position_x, 'position_y', frame")
+        my_widget._dtypes_edit.setText("position_x=float64, frame='int32'")
+        my_widget._kwargs_edit.setText("nrows=3")
+        assert my_widget._get_kwargs() == {
+            "nrows": 3,
+            "loc_properties": ["position_x", "position_y", "frame"],
+            "dtypes": {"position_x": "float64", "frame": "int32"},
+        }
+
+        my_widget._load_thread_worker()
+        qtbot.waitUntil(lambda: my_widget._loader is None, timeout=10_000)
+        assert list(smlm_data.locdata.data.columns) == [
+            "position_x",
+            "position_y",
+            "frame",
+        ]
+        assert smlm_data.locdata.data.dtypes.to_list() == [
+            np.float64,
+            np.float32,
+            np.int32,
+        ]
+
+        my_widget._dtypes_edit.setText("frame=none_type")
+        with pytest.raises(TypeError):
+            my_widget._get_dtypes()
+
+    def test_LoadQWidget_condition(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        file_path = tmp_path / "locdata.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+
+        smlm_data = SmlmData()
+        filter_specifications = FilterSpecifications()
+        filter_specifications.append_item(
+            dataset={
+                "position_x": lc.Selector(
+                    loc_property="position_x",
+                    activate=True,
+                    lower_bound=1,
+                    upper_bound=1000,
+                )
+            },
+            name="filter",
+        )
+        viewer = make_napari_viewer()
+        my_widget = LoadQWidget(
+            viewer, smlm_data=smlm_data, filter_specifications=filter_specifications
+        )
+        my_widget._condition_get_button_on_click()
+        condition = filter_specifications.filter_condition
+        assert my_widget._condition_edit.text() == condition
+        assert my_widget._get_kwargs() == {"condition": condition}
+
+        my_widget._file_path_edit.setText(str(file_path))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+        my_widget._load_thread_worker()
+        qtbot.waitUntil(lambda: my_widget._loader is None, timeout=10_000)
+        assert len(smlm_data.locdata) == len(locdata_2d.data.query(condition))
+
+    def test_LoadQWidget_columnar_cache(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        file_path = tmp_path / "locdata.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+
+        smlm_data = SmlmData()
+        viewer = make_napari_viewer()
+        my_widget = LoadQWidget(viewer, smlm_data=smlm_data)
+        my_widget.columnar_cache = ColumnarCache(directory=tmp_path / "cache")
+        my_widget._file_path_edit.setText(str(file_path))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+        assert my_widget._get_columnar_cache() is None
+
+        my_widget._columnar_cache_check_box.setChecked(True)
+        assert my_widget._get_columnar_cache() is my_widget.columnar_cache
+        for _ in range(2):
+            my_widget._load_thread_worker()
+            qtbot.waitUntil(lambda: my_widget._loader is None, timeout=10_000)
+        assert len(smlm_data.locdatas) == 2
+        assert len(list((tmp_path / "cache").iterdir())) == 1
+        assert np.array_equal(smlm_data.locdatas[0].data, smlm_data.locdatas[1].data)
+
+    def test_LoadQWidget_load_files(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        for index in range(2):
+            lc.save_thunderstorm_csv(
+                locdata=locdata_2d, path=tmp_path / f"locdata_{index}.csv"
+            )
+
+        smlm_data = SmlmData()
+        viewer = make_napari_viewer()
+        my_widget = LoadQWidget(viewer, smlm_data=smlm_data)
+        my_widget._multiple_files_check_box.setChecked(True)
+        my_widget._file_path_edit.setText(str(tmp_path / "*.csv"))
+        my_widget._file_type_combobox.setCurrentText(lc.FileType.THUNDERSTORM.name)
+
+        n_emissions = []
+        smlm_data.locdata_names_changed_signal.connect(
+            lambda names: n_emissions.append(names)
+        )
+        my_widget._load_button_on_click()
+        qtbot.waitUntil(lambda: not my_widget._is_loading(), timeout=60_000)
+        assert len(smlm_data.locdatas) == 2
+        assert len(n_emissions) == 1
+        assert smlm_data.locdata_names[0].endswith("locdata_0.csv")
+
+        my_widget._file_path_edit.setText(str(tmp_path / "*.none"))
+        with pytest.raises(FileNotFoundError):
+            my_widget._load_files_thread_worker()
+
     @pytest.mark.skip("needs user interaction")
     def test_LoadQWidget_load(self, make_napari_viewer):
         smlm_data = SmlmData()
@@ -6,6 +6,7 @@ from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.region_specifications import RegionSpecifications
 from napari_locan.data_model.roi_specifications import RoiSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.project import load_project
 from napari_locan.widgets.widget_napari_locan_project import NapariLocanProjectQWidget
 
 
@@ -66,6 +67,105 @@ class TestNapariLocanStateQWidget:
         assert my_widget.smlm_data.locdatas == []
         assert my_widget.smlm_data.locdata_names == []
 
+    def test_NapariLocanProjectQWidget_save_and_load_thread_worker(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        smlm_data_0 = SmlmData(
+            locdatas=[locdata_2d, locdata_2d], locdata_names=["locdata_2d", "other"]
+        )
+        smlm_data_0.index = 0
+        selectors = {
+            "position_x": lc.Selector(
+                loc_property="position_x", activate=True, lower_bound=0, upper_bound=1
+            ),
+        }
+        filter_specifications_0 = FilterSpecifications()
+        filter_specifications_0.append_item(dataset=selectors)
+        region_specifications_0 = RegionSpecifications(
+            datasets=[lc.Rectangle(), lc.EmptyRegion()], names=["rectangle", "empty"]
+        )
+        roi_specifications_0 = RoiSpecifications(
+            datasets=[lc.Roi(reference=locdata_2d, region=lc.Rectangle())],
+            names=["roi"],
+        )
+
+        viewer = make_napari_viewer()
+        my_widget = NapariLocanProjectQWidget(
+            viewer,
+            smlm_data=smlm_data_0,
+            filter_specifications=filter_specifications_0,
+            region_specifications=region_specifications_0,
+            roi_specifications=roi_specifications_0,
+        )
+        path = tmp_path / "project"
+        my_widget._save_thread_worker(path=path)
+        assert not my_widget._save_button.isEnabled()
+        qtbot.waitUntil(lambda: my_widget._progress_bar is None, timeout=10_000)
+        assert my_widget._save_button.isEnabled()
+        assert (path / "project.json").is_file()
+
+        smlm_data_1 = SmlmData()
+        filter_specifications_1 = FilterSpecifications()
+        region_specifications_1 = RegionSpecifications()
+        roi_specifications_1 = RoiSpecifications()
+        new_widget = NapariLocanProjectQWidget(
+            viewer,
+            smlm_data=smlm_data_1,
+            filter_specifications=filter_specifications_1,
+            region_specifications=region_specifications_1,
+            roi_specifications=roi_specifications_1,
+        )
+        with qtbot.waitSignal(smlm_data_1.locdata_names_changed_signal):
+            new_widget._load_thread_worker(path=path / "project.json")
+        qtbot.waitUntil(lambda: new_widget._progress_bar is None, timeout=10_000)
+
+        assert smlm_data_1.locdata_names == ["locdata_2d", "other"]
+        assert smlm_data_1.index == 0
+        assert smlm_data_1.locdatas[0].meta == locdata_2d.meta
+        assert filter_specifications_1.names == filter_specifications_0.names
+        assert repr(filter_specifications_1.datasets) == repr(
+            filter_specifications_0.datasets
+        )
+        assert region_specifications_1.index == 1
+        assert repr(region_specifications_1.datasets) == repr(
+            region_specifications_0.datasets
+        )
+        assert roi_specifications_1.dataset.reference is smlm_data_1.locdatas[0]
+
+        new_widget._new_button_on_click()
+        new_widget._lazy_check_box.setChecked(True)
+        new_widget._max_resident_spin_box.setValue(1)
+        with qtbot.waitSignal(smlm_data_1.locdata_names_changed_signal):
+            new_widget._load_thread_worker(path=path)
+        qtbot.waitUntil(lambda: new_widget._progress_bar is None, timeout=10_000)
+        assert smlm_data_1.max_resident == 1
+        assert not smlm_data_1.is_loaded(1)
+        assert smlm_data_1.locdata.meta == locdata_2d.meta
+        assert smlm_data_1.is_loaded(0)
+        smlm_data_1.index = 1
+        assert smlm_data_1.locdata.meta == locdata_2d.meta
+        assert not smlm_data_1.is_loaded(0)
+
+        # autosave writes changes to the loaded project
+        smlm_data_1.locdata_name = "changed"
+        assert new_widget._is_dirty()
+        new_widget._autosave_check_box.setChecked(True)
+        new_widget._autosave_interval_spin_box.setValue(1)
+        assert new_widget._autosave_timer.isActive()
+        qtbot.waitUntil(lambda: not new_widget._is_dirty(), timeout=10_000)
+        qtbot.waitUntil(lambda: not new_widget._is_busy, timeout=10_000)
+        new_widget._autosave_check_box.setChecked(False)
+        assert not new_widget._autosave_timer.isActive()
+        assert load_project(path=path)["smlm_data"]["names"] == [
+            "locdata_2d",
+            "changed",
+        ]
+
+        new_widget._new_button_on_click()
+        my_widget._save_pickle(file_path=tmp_path / "project.pickle")
+        new_widget._load_pickle(file_path=tmp_path / "project.pickle")
+        assert smlm_data_1.locdata_names == ["locdata_2d", "other"]
+
     @pytest.mark.skip("needs user interaction")
     def test_NapariLocanProjectQWidget_save_and_load(
         self, make_napari_viewer, locdata_2d
@@ -19,6 +19,59 @@ class TestPropertyDistributionQWidget:
         assert my_widget._loc_property_combobox.currentIndex() == 0
 
         my_widget._select_button_on_click()
+        assert my_widget._plot_widget.axes.get_xlabel() == "position_x"
+        assert my_widget._plot_widget.axes.get_ylabel() == "PDF"
+        assert list(smlm_data._property_statistics) == [(id(locdata_2d), "position_x")]
+        viewer.close()
+
+    def test_PropertyDistributionQWidget_cluster_properties(
+        self, make_napari_viewer, locdata_2d, locdata_two_cluster_with_noise_2d
+    ):
+        smlm_data = SmlmData(locdatas=[locdata_2d, locdata_two_cluster_with_noise_2d])
+        viewer = make_napari_viewer()
+        my_widget = PropertyDistributionQWidget(viewer, smlm_data=smlm_data)
+        assert my_widget._loc_property_combobox.currentText() == "position_x"
+
+        my_widget._cluster_properties_check_box.setChecked(True)
+        assert my_widget._loc_property_combobox.currentText() == "cluster_label"
+        assert my_widget._loc_property_combobox.findText("localization_count") != -1
+        my_widget._loc_property_combobox.setCurrentText("localization_count")
+        my_widget._select_button_on_click()
+
+        smlm_data.index = 0
+        assert my_widget._loc_property_combobox.findText("localization_count") == -1
+        with pytest.raises(KeyError):
+            my_widget._select_button_on_click()
+        viewer.close()
+
+    def test_PropertyDistributionQWidget_nearest_neighbor(
+        self, make_napari_viewer, qtbot, locdata_two_cluster_with_noise_2d, monkeypatch
+    ):
+        messages = []
+        monkeypatch.setattr(napari.utils.notifications, "show_error", messages.append)
+        smlm_data = SmlmData(locdatas=[locdata_two_cluster_with_noise_2d])
+        viewer = make_napari_viewer()
+        my_widget = PropertyDistributionQWidget(viewer, smlm_data=smlm_data)
+        my_widget._nearest_neighbor_check_box.setChecked(True)
+        my_widget._k_spin_box.setValue(2)
+        my_widget._select_button_on_click()
+        assert not my_widget._select_button.isEnabled()
+        qtbot.waitUntil(my_widget._select_button.isEnabled, timeout=10_000)
+        assert my_widget._plot_widget.axes.get_xlabel() == "nn_distance"
+        assert len(smlm_data._spatial_indices) == 1
+
+        my_widget._cluster_properties_check_box.setChecked(True)
+        my_widget._k_spin_box.setValue(1)
+        my_widget._select_button_on_click()
+        qtbot.waitUntil(my_widget._select_button.isEnabled, timeout=10_000)
+        assert my_widget._plot_widget.axes.get_xlabel() == "nn_distance"
+
+        my_widget._k_spin_box.setValue(2)
+        my_widget._select_button_on_click()
+        qtbot.waitUntil(my_widget._select_button.isEnabled, timeout=10_000)
+        assert len(messages) == 1
+        assert messages[0].startswith("Computing nearest-neighbor distances failed:")
+        assert my_widget._plot_widget.axes.get_xlabel() == ""
         viewer.close()
 
 
@@ -1,4 +1,7 @@
+import locan as lc
 import napari
+import numpy as np
+import pandas as pd
 import pytest
 
 from napari_locan import RenderCollectionFeaturesQWidget
@@ -49,6 +52,39 @@ class TestRenderCollectionFeaturesQWidget:
             smlm_data.index = 0
             my_widget._render_button_on_click()
 
+    def test_RenderCollectionFeaturesQWidget_weighted_centroid(
+        self, make_napari_viewer
+    ):
+        dataframe = pd.DataFrame(
+            {
+                "position_x": [1.0, 2.0, 9.0, 5.0, 6.0, 8.0],
+                "position_y": [3.0, 9.0, 4.0, 5.0, 7.0, 6.0],
+                "uncertainty": [1.0, 2.0, 5.0, 1.0, 3.0, 2.0],
+            }
+        )
+        locdata = lc.LocData.from_dataframe(dataframe=dataframe)
+        references = [
+            lc.LocData.from_selection(locdata=locdata, indices=[0, 1, 2]),
+            lc.LocData(),
+            lc.LocData.from_selection(locdata=locdata, indices=[3, 4, 5]),
+        ]
+        collection = lc.LocData.from_collection(references)
+        viewer = make_napari_viewer()
+        smlm_data = SmlmData(locdatas=[collection])
+        my_widget = RenderCollectionFeaturesQWidget(viewer, smlm_data=smlm_data)
+        my_widget._centroid_check_box.setChecked(True)
+        my_widget._bounding_box_check_box.setChecked(True)
+
+        my_widget._render_button_on_click()
+        assert np.allclose(
+            viewer.layers["centroid"].data,
+            [references[0].centroid, references[2].centroid],
+        )
+
+        my_widget._render_as_series_button_on_click()
+        assert np.array_equal(viewer.layers[-2].data[:, 0], [0, 2])
+        assert [shape_[0, 0] for shape_ in viewer.layers[-1].data] == [0, 2]
+
 
 @pytest.mark.napari
 def test_run_napari():
@@ -10,6 +10,13 @@ from napari_locan import RoiQWidget
 from napari_locan.data_model.region_specifications import RegionSpecifications
 from napari_locan.data_model.roi_specifications import RoiSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.locan_io.columnar_cache import ColumnarCache
+from napari_locan.locan_io.load import LocDataFileCache, LocDataLoader
+from napari_locan.locan_io.project import (
+    LocDataPlaceholder,
+    load_project,
+    save_project,
+)
 
 
 class TestRoiQWidgetQWidget:
@@ -95,7 +102,12 @@ class TestRoiQWidgetQWidget:
 
         my_widget._scale_layer_button_on_click()
 
+        n_emissions = []
+        region_specifications.names_changed_signal.connect(
+            lambda names: n_emissions.append(names)
+        )
         my_widget._get_regions_from_shapes_button_on_click()
+        assert len(n_emissions) == 1
         assert len(my_widget.region_specifications.datasets) == 3
         assert my_widget._regions_combobox.count() == 3
         assert my_widget._regions_combobox.currentIndex() == 2
@@ -164,7 +176,7 @@ class TestRoiQWidgetQWidget:
         assert my_widget._regions_combobox.count() == 0
         assert my_widget._regions_combobox.currentIndex() == -1
 
-    def test_RoiQWidget_rois(self, make_napari_viewer, locdata_2d):
+    def test_RoiQWidget_rois(self, make_napari_viewer, qtbot, locdata_2d):
         region_specifications = RegionSpecifications()
         roi_specifications = RoiSpecifications()
         smlm_data = SmlmData(locdatas=[locdata_2d])
@@ -267,8 +279,218 @@ class TestRoiQWidgetQWidget:
         assert my_widget._reference_combobox.currentText() == "SmlmData"
         my_widget._create_roi_button_on_click()
         my_widget._apply_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(my_widget.smlm_data.locdatas) == 2)
+        assert len(my_widget.smlm_data._spatial_indices) == 1
+        assert len(my_widget.smlm_data.locdatas[1]) == len(
+            my_widget.roi_specifications.dataset.locdata()
+        )
+
+        # rois without reference cannot be applied
+        with pytest.raises(AttributeError):
+            my_widget._apply_all_roi_button_on_click()
         assert len(my_widget.smlm_data.locdatas) == 2
 
+        # rois on the same dataset are applied together
+        region = lc.Ellipse((3, 3), 4, 2, 30)
+        my_widget.roi_specifications.set_datasets_and_names(
+            datasets=[
+                my_widget.roi_specifications.datasets[1],
+                lc.Roi(reference=my_widget.smlm_data.locdata, region=region),
+            ],
+            names=["roi_a", "roi_b"],
+        )
+        n_rois = 2
+        expected = [roi.locdata() for roi in my_widget.roi_specifications.datasets]
+        my_widget._apply_all_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(my_widget.smlm_data.locdatas) == 2 + n_rois)
+        assert my_widget.smlm_data.index == 0
+        assert [len(item) for item in my_widget.smlm_data.locdatas[2:]] == [
+            len(item) for item in expected
+        ]
+        assert my_widget.smlm_data.locdata_names[-1].endswith(
+            my_widget.roi_specifications.names[-1]
+        )
+        assert len(my_widget.smlm_data._spatial_indices) == 1
+
+        my_widget._roi_result_combobox.setCurrentText("Collection")
+        qtbot.waitUntil(my_widget._apply_all_roi_button.isEnabled)
+        my_widget._apply_all_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(my_widget.smlm_data.locdatas) == 3 + n_rois)
+        collection = my_widget.smlm_data.locdatas[-1]
+        assert len(collection) == n_rois
+        assert [len(item) for item in collection.references] == [
+            len(item) for item in expected
+        ]
+        assert all(
+            item.references is my_widget.smlm_data.locdatas[0]
+            for item in collection.references
+        )
+
+        my_widget._roi_result_combobox.setCurrentText("Labels")
+        qtbot.waitUntil(my_widget._apply_all_roi_button.isEnabled)
+        my_widget._apply_all_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(my_widget.smlm_data.locdatas) == 5 + n_rois)
+        regions, labels = my_widget.smlm_data.locdatas[-2:]
+        assert len(labels) == len(my_widget.smlm_data.locdatas[0])
+        assert set(labels.data["region_label"]) <= {-1, 0, 1}
+        assert len(regions) == len(set(labels.data["region_label"]) - {-1})
+
+    def test_RoiQWidget_placeholder_reference(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path
+    ):
+        region = lc.Rectangle((0, 0), 2, 3, 0)
+        project = {
+            key: {"datasets": [], "names": [], "index": -1}
+            for key in ["filter_specifications", "region_specifications"]
+        }
+        project["roi_specifications"] = {
+            "datasets": [lc.Roi(reference=locdata_2d, region=region)],
+            "names": ["roi"],
+            "index": 0,
+        }
+        project["smlm_data"] = {"datasets": [locdata_2d], "names": ["0"], "index": 0}
+        save_project(path=tmp_path / "project", project=project)
+        lazy_project = load_project(path=tmp_path / "project", lazy=True)
+        placeholder = lazy_project["smlm_data"]["datasets"][0]
+        roi = lazy_project["roi_specifications"]["datasets"][0]
+        assert isinstance(placeholder, LocDataPlaceholder)
+        assert roi.reference is placeholder
+
+        smlm_data = SmlmData(locdatas=[placeholder])
+        roi_specifications = RoiSpecifications(datasets=[roi], names=["roi"])
+        viewer = make_napari_viewer()
+        my_widget = RoiQWidget(
+            viewer,
+            region_specifications=RegionSpecifications(),
+            roi_specifications=roi_specifications,
+            smlm_data=smlm_data,
+        )
+        expected = lc.Roi(reference=locdata_2d, region=region).locdata()
+
+        # the placeholder is loaded as dataset of smlm_data in the main thread
+        my_widget._apply_roi_button_on_click()
+        assert smlm_data.is_loaded(0)
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == 2)
+        assert len(smlm_data.locdatas[1]) == len(expected)
+        assert list(smlm_data._spatial_indices) == [
+            (id(smlm_data.locdatas[0]), ("position_x", "position_y"))
+        ]
+
+        # the already loaded dataset is taken
+        locdata = smlm_data.locdatas[0]
+        qtbot.waitUntil(my_widget._apply_roi_button.isEnabled)
+        my_widget._apply_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == 3)
+        assert smlm_data.locdatas[0] is locdata
+        assert len(smlm_data.locdatas[2]) == len(expected)
+        assert len(smlm_data._spatial_indices) == 1
+
+    def test_RoiQWidget_file_reference(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path, monkeypatch
+    ):
+        file_path = tmp_path / "locdata.csv"
+        lc.save_thunderstorm_csv(locdata=locdata_2d, path=file_path)
+        reference = {"file_path": file_path, "file_type": "THUNDERSTORM"}
+        regions = [
+            lc.Rectangle((0, 0), 2, 3, 0),
+            lc.Ellipse((3, 3), 4, 2, 30),
+            lc.Rectangle((1, 1), 5, 5, 0),
+        ]
+        rois = [lc.Roi(reference=reference, region=region) for region in regions]
+        expected = [roi.locdata() for roi in rois]
+
+        smlm_data = SmlmData()
+        roi_specifications = RoiSpecifications(
+            datasets=rois, names=[f"roi_{i}" for i in range(len(rois))]
+        )
+        viewer = make_napari_viewer()
+        my_widget = RoiQWidget(
+            viewer,
+            region_specifications=RegionSpecifications(),
+            roi_specifications=roi_specifications,
+            smlm_data=smlm_data,
+        )
+        my_widget.file_cache = LocDataFileCache(
+            columnar_cache=ColumnarCache(directory=tmp_path / "cache")
+        )
+
+        n_loads = []
+        load = LocDataLoader.load
+
+        def counting_load(self):
+            n_loads.append(self.path)
+            return load(self)
+
+        monkeypatch.setattr(LocDataLoader, "load", counting_load)
+
+        # the file is parsed once for all rois
+        my_widget._apply_all_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == len(rois))
+        assert n_loads == [file_path]
+        assert len(my_widget.file_cache) == 1
+        assert [len(item) for item in smlm_data.locdatas] == [
+            len(item) for item in expected
+        ]
+        assert not smlm_data._spatial_indices
+
+        # the parsed file is taken from cache
+        qtbot.waitUntil(my_widget._apply_roi_button.isEnabled)
+        my_widget._apply_roi_button_on_click()
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == len(rois) + 1)
+        assert n_loads == [file_path]
+        assert len(smlm_data.locdatas[-1]) == len(expected[-1])
+
+        # region labels are not added to shared localization data
+        qtbot.waitUntil(my_widget._apply_all_roi_button.isEnabled)
+        with pytest.raises(ValueError):
+            my_widget._rois_labels(rois=rois, dataset_ids=set())
+
+    def test_RoiQWidget_save_and_load_all_rois(
+        self, make_napari_viewer, qtbot, tmp_path
+    ):
+        reference = {"file_path": tmp_path / "locdata.csv", "file_type": 4}
+        rois = [
+            lc.Roi(reference=reference, region=lc.Rectangle((0, 0), i + 1, 3, 0))
+            for i in range(5)
+        ]
+        names = ["roi_1", "roi_2", "roi_2", "1-Rectangle", "roi_5"]
+        roi_specifications = RoiSpecifications(datasets=rois, names=names)
+        viewer = make_napari_viewer()
+        my_widget = RoiQWidget(
+            viewer,
+            region_specifications=RegionSpecifications(),
+            roi_specifications=roi_specifications,
+            smlm_data=SmlmData(),
+        )
+
+        directory = tmp_path / "rois"
+        directory.mkdir()
+        my_widget._save_all_roi_button_on_click(directory=directory)
+        qtbot.waitUntil(my_widget._save_all_roi_button.isEnabled)
+        assert len(list(directory.glob("*.yaml"))) == len(rois)
+
+        my_widget.roi_specifications.delete_all()
+        n_emissions = []
+        roi_specifications.names_changed_signal.connect(
+            lambda names: n_emissions.append(names)
+        )
+        my_widget._load_all_roi_button_on_click(directory=directory)
+        qtbot.waitUntil(lambda: len(roi_specifications.datasets) == len(rois))
+        assert len(n_emissions) == 1
+        assert my_widget._rois_combobox.count() == len(rois)
+        assert sorted(repr(roi.region) for roi in roi_specifications.datasets) == [
+            repr(roi.region) for roi in rois
+        ]
+        assert all(
+            roi.reference.file.path == str(reference["file_path"])
+            for roi in roi_specifications.datasets
+        )
+
+        # empty directories are ignored
+        qtbot.waitUntil(my_widget._load_all_roi_button.isEnabled)
+        my_widget._load_all_roi_button_on_click(directory=tmp_path)
+        assert len(roi_specifications.datasets) == len(rois)
+
     @pytest.mark.skip("requires user interactions")
     def test_RoiQWidget_reference_file_dialog_and_delete_all(
         self, make_napari_viewer, locdata_2d
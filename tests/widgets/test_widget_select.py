@@ -5,10 +5,11 @@ import pytest
 from napari_locan import SelectQWidget
 from napari_locan.data_model.filter_specifications import FilterSpecifications
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.selection_view import SelectionView
 
 
 class TestSelectQWidget:
-    def test_SelectQWidget_init(self, make_napari_viewer, locdata_2d):
+    def test_SelectQWidget_init(self, make_napari_viewer, qtbot, locdata_2d):
         smlm_data = SmlmData()
         filter_specifications = FilterSpecifications()
         viewer = make_napari_viewer()
@@ -33,6 +34,10 @@ class TestSelectQWidget:
         assert my_widget._upper_bound_spinbox.value() == 5.0
         assert my_widget._apply_checkbox.isChecked() is False
         assert my_widget._condition_text_edit.toPlainText() == ""
+        # statistics for all properties are computed in the background
+        qtbot.waitUntil(
+            lambda: len(smlm_data._property_statistics) == len(locdata_2d.data.columns)
+        )
         viewer.close()
 
         smlm_data = SmlmData(locdatas=[locdata_2d])
@@ -109,7 +114,11 @@ class TestSelectQWidget:
         )
 
         my_widget._loc_property_combobox.setCurrentIndex(0)
+        filter_specifications.mark_clean()
         my_widget._lower_bound_spinbox.setValue(9)
+        # in-place edits of the filter specifications are tracked
+        assert filter_specifications.is_dirty
+        assert filter_specifications.dataset["position_x"].lower_bound == 9
         my_widget._upper_bound_spinbox.setValue(19)
         my_widget._apply_checkbox.setChecked(False)
         assert my_widget._loc_property_combobox.currentIndex() == 0
@@ -139,6 +148,8 @@ class TestSelectQWidget:
         my_widget._select_button_on_click()
         assert len(smlm_data.locdatas) == 2
         assert smlm_data.index == 1
+        assert isinstance(smlm_data.locdata, SelectionView)
+        assert smlm_data.locdata.references is smlm_data.locdatas[0]
 
         my_widget.filter_specifications.set_datasets_and_names(datasets=[])
         assert my_widget._loc_property_combobox.currentIndex() == -1
@@ -148,6 +159,86 @@ class TestSelectQWidget:
 
         my_widget._loc_property_combobox.setCurrentIndex(1)
 
+    def test_SelectQWidget_preview(self, make_napari_viewer, locdata_2d):
+        smlm_data = SmlmData(locdatas=[locdata_2d])
+        selectors = {
+            "position_x": lc.Selector(
+                loc_property="position_x", activate=True, lower_bound=1, upper_bound=5
+            ),
+        }
+        filter_specifications = FilterSpecifications([selectors])
+        viewer = make_napari_viewer()
+        my_widget = SelectQWidget(
+            viewer, smlm_data=smlm_data, filter_specifications=filter_specifications
+        )
+        assert my_widget._preview_label.text() == ""
+        assert my_widget._preview_layer is None
+
+        my_widget._preview_check_box.setChecked(True)
+        assert my_widget._preview_label.text() == "3 of 6 localizations selected"
+        assert my_widget._preview_layer in viewer.layers
+        assert len(my_widget._preview_layer.data) == 3
+
+        my_widget._upper_bound_spinbox.setValue(3.5)
+        assert my_widget._preview_label.text() == "2 of 6 localizations selected"
+        assert len(my_widget._preview_layer.data) == 2
+
+        my_widget._apply_checkbox.setChecked(False)
+        assert my_widget._preview_label.text() == "6 of 6 localizations selected"
+
+        my_widget._preview_check_box.setChecked(False)
+        assert my_widget._preview_label.text() == ""
+        assert len(viewer.layers) == 0
+
+    def test_SelectQWidget_batch(
+        self, make_napari_viewer, qtbot, locdata_2d, locdata_two_cluster_with_noise_2d
+    ):
+        smlm_data = SmlmData(
+            locdatas=[locdata_2d, locdata_two_cluster_with_noise_2d, locdata_2d],
+            locdata_names=["a", "b", "c"],
+        )
+        selectors = {
+            "position_x": lc.Selector(
+                loc_property="position_x", activate=True, lower_bound=1, upper_bound=5
+            ),
+        }
+        filter_specifications = FilterSpecifications([selectors])
+        viewer = make_napari_viewer()
+        my_widget = SelectQWidget(
+            viewer, smlm_data=smlm_data, filter_specifications=filter_specifications
+        )
+        assert my_widget._items_list_widget.isHidden()
+        assert my_widget._items_list_widget.count() == 3
+        my_widget._batch_check_box.setChecked(True)
+        assert not my_widget._items_list_widget.isHidden()
+
+        # no chosen item applies the filter to all items
+        my_widget._select_button_on_click()
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == 6)
+        assert smlm_data.locdata_names[3:] == [
+            "a-selection",
+            "b-selection",
+            "c-selection",
+        ]
+        for new_locdata, locdata in zip(
+            smlm_data.locdatas[3:], smlm_data.locdatas[:3], strict=True
+        ):
+            assert isinstance(new_locdata, SelectionView)
+            assert new_locdata.references is locdata
+            expected = lc.select_by_condition(
+                locdata=locdata, condition="1 < position_x < 5"
+            )
+            assert len(new_locdata) == len(expected)
+        assert my_widget._items_list_widget.count() == 6
+
+        my_widget._items_list_widget.item(1).setSelected(True)
+        my_widget._select_button_on_click()
+        qtbot.waitUntil(lambda: len(smlm_data.locdatas) == 7)
+        assert smlm_data.locdata_names[-1] == "b-selection"
+        assert smlm_data.index == 6
+        qtbot.waitUntil(lambda: my_widget._select_button.isEnabled())
+        viewer.close()
+
 
 @pytest.mark.napari
 def test_run_napari():
@@ -1,3 +1,5 @@
+import numpy as np
+
 from napari_locan import ShowDataQWidget
 from napari_locan.data_model.smlm_data import SmlmData
 from napari_locan.widgets.widget_show_data import TableModel
@@ -12,7 +14,7 @@ class TestTableModel:
 
 
 class TestShowPropertiesQWidget:
-    def test_ShowDataQWidget(self, make_napari_viewer, locdata_2d):
+    def test_ShowDataQWidget(self, make_napari_viewer, qtbot, locdata_2d):
         smlm_data = SmlmData()
         viewer = make_napari_viewer()
         my_widget = ShowDataQWidget(viewer, smlm_data=smlm_data)
@@ -23,4 +25,9 @@ class TestShowPropertiesQWidget:
         viewer = make_napari_viewer()
         my_widget = ShowDataQWidget(viewer, smlm_data=smlm_data)
 
-        assert my_widget._table_view.model() is not None
+        qtbot.waitUntil(lambda: my_widget._table_view.model() is not None)
+        expected = locdata_2d.data.describe()
+        assert np.allclose(my_widget.model._data.to_numpy(), expected.to_numpy())
+        assert list(my_widget.model._data.columns) == list(expected.columns)
+        assert list(my_widget.model._data.index) == list(expected.index)
+        assert len(smlm_data._property_statistics) == len(expected.columns)
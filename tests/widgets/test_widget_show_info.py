@@ -4,6 +4,7 @@ import pytest
 
 from napari_locan import ShowInfoQWidget
 from napari_locan.data_model.smlm_data import SmlmData
+from napari_locan.process.selection_view import SelectionView
 
 
 class TestShowInfoQWidget:
@@ -16,6 +17,7 @@ class TestShowInfoQWidget:
         assert my_widget._information_selection_checkbox.isChecked() is False
         assert my_widget._information_coordinate_dimension_text_edit.text() == ""
         assert my_widget._information_localization_count_text_edit.text() == ""
+        assert my_widget._information_cluster_count_text_edit.text() == ""
 
     def test_ShowInfoQWidget_with_locdata(
         self, make_napari_viewer, locdata_2d, locdata_3d
@@ -42,6 +44,55 @@ class TestShowInfoQWidget:
         assert my_widget._information_coordinate_dimension_text_edit.text() == "3"
         assert my_widget._information_localization_count_text_edit.text() == "6"
 
+    def test_ShowInfoQWidget_selection_view(self, make_napari_viewer, locdata_2d):
+        selection = SelectionView.from_mask(
+            locdata=locdata_2d, mask=locdata_2d.data["position_x"].to_numpy() > 1
+        )
+        smlm_data = SmlmData(locdatas=[locdata_2d, selection])
+        viewer = make_napari_viewer()
+        my_widget = ShowInfoQWidget(viewer, smlm_data=smlm_data)
+
+        smlm_data.index = 0
+        assert my_widget._information_selection_checkbox.isChecked() is False
+        assert my_widget._information_selection_view_text_edit.text() == ""
+
+        smlm_data.index = 1
+        assert my_widget._information_selection_checkbox.isChecked() is True
+        assert (
+            my_widget._information_selection_view_text_edit.text()
+            == "4 of 6 localizations"
+        )
+        assert my_widget._information_localization_count_text_edit.text() == "4"
+
+    def test_ShowInfoQWidget_cluster_count(
+        self, make_napari_viewer, locdata_2d, locdata_two_cluster_with_noise_2d
+    ):
+        _, collection = lc.cluster_dbscan(
+            locdata=locdata_two_cluster_with_noise_2d, eps=2, min_samples=2
+        )
+        smlm_data = SmlmData(
+            locdatas=[locdata_2d, locdata_two_cluster_with_noise_2d, collection]
+        )
+        viewer = make_napari_viewer()
+        my_widget = ShowInfoQWidget(viewer, smlm_data=smlm_data)
+
+        smlm_data.index = 0
+        assert my_widget._information_cluster_count_text_edit.text() == ""
+
+        smlm_data.index = 1
+        assert my_widget._information_cluster_count_text_edit.text() == "2"
+
+        smlm_data.index = 2
+        assert my_widget._information_collection_checkbox.isChecked() is True
+        assert my_widget._information_cluster_count_text_edit.text() == "2"
+
+        labels = locdata_two_cluster_with_noise_2d.data["cluster_label"].to_numpy()
+        selection = SelectionView.from_mask(
+            locdata=locdata_two_cluster_with_noise_2d, mask=labels != labels.max()
+        )
+        smlm_data.append_item(selection)
+        assert my_widget._information_cluster_count_text_edit.text() == "1"
+
 
 @pytest.mark.napari
 def test_run_napari():
@@ -121,6 +121,20 @@ class TestSmlmDataQWidget:
         my_widget._locdatas_combobox.setCurrentIndex(1)
         my_widget._save_button_on_click()
 
+    @pytest.mark.parametrize("file_name", ["locdata", "locdata.asdf"])
+    def test_SmlmDataQWidget_save_thread_worker(
+        self, make_napari_viewer, qtbot, locdata_2d, tmp_path, file_name
+    ):
+        smlm_data = SmlmData(locdatas=[locdata_2d])
+        viewer = make_napari_viewer()
+        my_widget = SmlmDataQWidget(viewer, smlm_data=smlm_data)
+
+        # the suffix is appended if missing
+        my_widget._save_thread_worker(file_path=tmp_path / file_name)
+        qtbot.waitUntil(my_widget._save_button.isEnabled)
+        locdata = lc.load_asdf_file(path=tmp_path / "locdata.asdf")
+        assert len(locdata) == len(locdata_2d)
+
 
 @pytest.mark.napari
 def test_run_napari():